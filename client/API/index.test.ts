@@ -10,16 +10,21 @@ const checkResponse = (game: BaseballGame, strVal: string, numVal: number) => {
   expect(game.seriesGameNumber).toBe(numVal);
   expect(game.seriesGameCount).toBe(numVal);
 };
+//* Normalized responses map each team's id to its team, so here team "foo" is just "foo"
+const createNormalizedResponse = (...ids: string[]) => ({
+  teams: Object.fromEntries(ids.map((id) => [id, id])),
+  games: ids.map((id, index) => ({
+    id, date: id, homeTeamId: id, awayTeamId: id, promos: [], seriesGameNumber: index + 1, seriesGameCount: index + 1
+  }))
+});
 
 describe("provides basic API functions", () => {
   afterEach(() => { vi.restoreAllMocks(); });
   test("to grab the games of the day", async () => {
-    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve([{
-      id: "foo", date: "foo", homeTeam: "foo", awayTeam: "foo", promos: [], seriesGameNumber: 1, seriesGameCount: 1
-    }]));
+    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve(createNormalizedResponse("foo")));
     const response = await getSingleGame("march", "29");
     checkResponse(response!, "foo", 1);
-    expect(fetchSpy).toHaveBeenCalledWith("/api/march/29");
+    expect(fetchSpy).toHaveBeenCalledWith("/api/march/29?format=normalized");
 
     fetchSpy.mockReturnValueOnce(Promise.resolve(undefined));
     const badResponse = await getSingleGame("march", "29");
@@ -27,15 +32,12 @@ describe("provides basic API functions", () => {
     expect(fetchSpy).toHaveBeenCalledTimes(2);
   });
   test("to grab the games for the month", async () => {
-    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve([
-      { id: "foo", date: "foo", homeTeam: "foo", awayTeam: "foo", promos: [], seriesGameNumber: 1, seriesGameCount: 1 },
-      { id: "bar", date: "bar", homeTeam: "bar", awayTeam: "bar", promos: [], seriesGameNumber: 2, seriesGameCount: 2 }
-    ]));
+    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve(createNormalizedResponse("foo", "bar")));
     const response = await getMonthsGames("march");
     expect(response!).toHaveLength(2);
     checkResponse(response![0], "foo", 1);
     checkResponse(response![1], "bar", 2);
-    expect(fetchSpy).toHaveBeenCalledWith("/api/march");
+    expect(fetchSpy).toHaveBeenCalledWith("/api/march?format=normalized");
 
     fetchSpy.mockReturnValueOnce(Promise.resolve(undefined));
     const badResponse = await getMonthsGames("march");
@@ -43,22 +45,19 @@ describe("provides basic API functions", () => {
     expect(fetchSpy).toHaveBeenCalledTimes(2);
   });
   test("to grab the full schedule of games", async () => {
-    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve([
-      { id: "foo", date: "foo", homeTeam: "foo", awayTeam: "foo", promos: [], seriesGameNumber: 1, seriesGameCount: 1 },
-      { id: "bar", date: "bar", homeTeam: "bar", awayTeam: "bar", promos: [], seriesGameNumber: 2, seriesGameCount: 2 }
-    ]));
+    const fetchSpy = vi.spyOn(Utility, "default").mockReturnValueOnce(Promise.resolve(createNormalizedResponse("foo", "bar")));
     const response = await getFullSchedule();
     expect(response).toHaveLength(2);
     checkResponse(response[0], "foo", 1);
     checkResponse(response[1], "bar", 2);
-    expect(fetchSpy).toHaveBeenCalledWith("/api/fullSchedule");
+    expect(fetchSpy).toHaveBeenCalledWith("/api/fullSchedule?format=normalized");
 
     fetchSpy.mockReturnValueOnce(Promise.resolve(undefined));
     const badResponse = await getFullSchedule();
     expect(badResponse).toStrictEqual([]); //* Empty array of games returned, so view can handle unexpectedly empty response
     expect(fetchSpy).toHaveBeenCalledTimes(2);
 
-    fetchSpy.mockReturnValueOnce(Promise.resolve([]));
+    fetchSpy.mockReturnValueOnce(Promise.resolve(createNormalizedResponse()));
     const emptyResponse = await getFullSchedule();
     expect(emptyResponse).toStrictEqual([]);
     expect(fetchSpy).toHaveBeenCalledTimes(3);
@@ -1,38 +1,32 @@
-import BaseballGame from "../Models/DataClasses";
+import BaseballGame, { type NormalizedScheduleProps } from "../Models/DataClasses";
 import getRequest from "./utility";
 
 const BASE_URL = "/api";
+const NORMALIZED_FORMAT = "?format=normalized"; //? Lists each team ONCE rather than in every game
 
 //! GET Requests
 export async function getSingleGame(monthParam: string, dayParam: string) {
   //* Likely will have to update func signature to return array
   const endpoint = `${BASE_URL}/${monthParam.toLowerCase()}/${dayParam}`; //* Ex: "march/29"
-  const response = await getRequest<BaseballGame[]>(endpoint);
+  const response = await getRequest<NormalizedScheduleProps>(endpoint + NORMALIZED_FORMAT);
   if (response === undefined) { return undefined; }
 
-  const gameOne = response[0]; //todo More adapting needed for potential double header days
-  const thisGame = new BaseballGame(
-    gameOne.id, gameOne.date, gameOne.homeTeam, gameOne.awayTeam, gameOne.promos, gameOne.seriesGameNumber, gameOne.seriesGameCount
-  );
+  const thisGame = BaseballGame.fromNormalized(response).at(0); //todo More adapting needed for potential double header days
   return thisGame;
 }
 
 export async function getMonthsGames(monthParam: string) {
-  const response = await getRequest<BaseballGame[]>(`${BASE_URL}/${monthParam.toLowerCase()}`);
+  const response = await getRequest<NormalizedScheduleProps>(`${BASE_URL}/${monthParam.toLowerCase()}${NORMALIZED_FORMAT}`);
   if (response === undefined) { return undefined; } //todo Might be best to just return an empty array and handle in view
 
-  const monthsGames = response.map((game) => new BaseballGame(
-    game.id, game.date, game.homeTeam, game.awayTeam, game.promos, game.seriesGameNumber, game.seriesGameCount
-  ));
+  const monthsGames = BaseballGame.fromNormalized(response);
   return monthsGames;
 }
 
 export async function getFullSchedule() {
-  const response = await getRequest<BaseballGame[]>(`${BASE_URL}/fullSchedule`);
+  const response = await getRequest<NormalizedScheduleProps>(`${BASE_URL}/fullSchedule${NORMALIZED_FORMAT}`);
   if (response === undefined) { return []; }
 
-  const monthsGames = response.map((game) => new BaseballGame(
-    game.id, game.date, game.homeTeam, game.awayTeam, game.promos, game.seriesGameNumber, game.seriesGameCount
-  ));
+  const monthsGames = BaseballGame.fromNormalized(response);
   return monthsGames;
 }
\ No newline at end of file
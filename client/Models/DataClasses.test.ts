@@ -32,6 +32,28 @@ describe("forms the main models of the app like", () => {
       expect(builderGame.seriesGameNumber).toBe(1);
       expect(builderGame.seriesGameCount).toBe(2);
     });
+    test("hydrated from a normalized response", () => {
+      const dodgers = { id: "1", teamLogo: "", teamName: "Dodgers", cityName: "Los Angeles", abbreviation: "LAD", wins: 1, losses: 0 };
+      const yankees = { id: "2", teamLogo: "", teamName: "Yankees", cityName: "New York", abbreviation: "NYY", wins: 0, losses: 1 };
+      const games = [
+        { id: "1", date: "", homeTeamId: "1", awayTeamId: "2", promos: [], seriesGameNumber: 1, seriesGameCount: 2 },
+        { id: "2", date: "", homeTeamId: "2", awayTeamId: "1", promos: [], seriesGameNumber: 2, seriesGameCount: 2 }
+      ];
+
+      const hydratedGames = BaseballGame.fromNormalized({ teams: { "1": dodgers, "2": yankees }, games });
+      //* WHEN hydrated, THEN each game is a BaseballGame with its team ids swapped for the teams they reference
+      expect(hydratedGames).toHaveLength(2);
+      expect(hydratedGames[0]).toBeInstanceOf(BaseballGame);
+      expect(hydratedGames[0].homeTeam).toBe(dodgers);
+      expect(hydratedGames[0].awayTeam).toBe(yankees);
+      expect(hydratedGames[0]).not.toHaveProperty("homeTeamId");
+      //* WHEN a team plays in many games, THEN every game shares that SAME team object
+      expect(hydratedGames[1].awayTeam).toBe(hydratedGames[0].homeTeam);
+      expect(hydratedGames[1].seriesDescription()).toContain("The Last Game");
+
+      //* WHEN the response has no games, THEN no games are hydrated
+      expect(BaseballGame.fromNormalized({ teams: {}, games: [] })).toStrictEqual([]);
+    });
     test("with a series description method", () => {
       const homeTeam = { id: "1", teamLogo: "", teamName: "foo", cityName: "fizz", abbreviation: "", wins: 1, losses: 0 };
       const awayTeam = { id: "1", teamLogo: "", teamName: "bar", cityName: "buzz", abbreviation: "", wins: 0, losses: 1 };
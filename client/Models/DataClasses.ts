@@ -4,6 +4,11 @@ export type BaseballGameProps = {
   homeTeam: BaseballTeam, awayTeam: BaseballTeam,
   promos: Promotion[], seriesGameNumber: number, seriesGameCount: number
 };
+//? Normalized responses list each team ONCE by its id, so games ONLY reference their teams' ids
+export type NormalizedGameProps = Omit<BaseballGameProps, "homeTeam" | "awayTeam"> & {
+  homeTeamId: string, awayTeamId: string
+};
+export type NormalizedScheduleProps = { teams: Record<string, BaseballTeam>, games: NormalizedGameProps[] };
 //? Implementing a TS type treats it like an interface
 export default class BaseballGame implements BaseballGameProps {
   constructor(public id: string, public date: string,
@@ -15,6 +20,13 @@ export default class BaseballGame implements BaseballGameProps {
     return new BaseballGame(id, date, homeTeam, awayTeam, promos, seriesGameNumber, seriesGameCount);
   }
 
+  //* Hydrates a `?format=normalized` response, so every game of the same team references the SAME team object
+  static fromNormalized({ teams, games }: NormalizedScheduleProps) {
+    return games.map(({ homeTeamId, awayTeamId, ...game }) =>
+      BaseballGame.of({ ...game, homeTeam: teams[homeTeamId], awayTeam: teams[awayTeamId] })
+    );
+  }
+
   //? JS can have weird behavior related to the `this` keyword where it'll unexpectedly change in the wrong context
   //? An arrow func version of below would ensure expected usage BUT every instance would get its own using WAY MORE memory
   //? TS provides `this` params to avoid the wasted memory, throwing if the context tries to change `this`
@@ -17,6 +17,12 @@ scheduler = APScheduler()
 def create_app(test_config = None):
     #? Adding export FLASK_ENV=development and FLASK_DEBUG=True can improve debugging
     app = Flask(__name__, static_folder="dist")
+    from .utility.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app) #? Uses `orjson` if installed, else the stdlib
+
+    from .utility.compression import sendPrecompressedStatic
+    #? Serves any `.br` OR `.gz` copy `vite build` wrote alongside each static asset
+    app.view_functions["static"] = sendPrecompressedStatic
 
     configure_app(app, test_config)
     scheduler.init_app(app)
@@ -32,8 +38,8 @@ def create_app(test_config = None):
     db.init_app(app)
     migrate.init_app(app, db)
 
-    from . import scheduled_jobs  #? Importing this ensures its tasks run
-    scheduler.start() #? AFTER BOTH scheduler.start() and app.run() were called
+    #? Scheduled jobs ONLY run in the `flask scheduler run` process, so web workers
+    #? never start any APScheduler threads
 
     from . import api
     app.register_blueprint(api.bp)
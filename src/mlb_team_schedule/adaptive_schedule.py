@@ -0,0 +1,172 @@
+from . import db, scheduler
+from .commands.update_promotions import updateAllPromotions
+from .commands.update_standings import updateAllTeamRecords
+from .models import BaseballGame, BaseballTeam
+from .utility.api_helpers import popSentRequests
+from .utility.datetime_helpers import utcToLocalDatetime
+from .utility.refresh_tracking import queryStaleness, utcNow
+from .utility.team_map import getTrackedTeamIDs
+from .utility.team_registry import mlbTeamId
+
+from datetime import UTC, timedelta
+from threading import Lock
+from zoneinfo import ZoneInfo
+
+#! Adaptive Refresh Scheduling
+#? Rather than refreshing everything every 7 days, each day's refreshes are planned
+#? from the games already in the DB: standings right after each game should end, AND
+#? promos a few times in the days before each tracked team's home game. Off days cost
+#? no requests, and a daily cap keeps a packed slate from flooding the MLB API
+
+STANDINGS_JOB = "standings"
+PROMOTIONS_JOB = "promotions"
+REFRESH_COMMANDS = { STANDINGS_JOB: updateAllTeamRecords,
+                     PROMOTIONS_JOB: updateAllPromotions }
+#? Most games take ~2h40m, so this leaves room for extra innings + rain delays
+GAME_LENGTH = timedelta(hours=3, minutes=30)
+PROMO_LEAD_TIMES = (timedelta(days=3), timedelta(days=1), timedelta(hours=3))
+#? Runs this close together are merged, i.e. both games of a double header ending
+COALESCE_WINDOW = timedelta(minutes=30)
+PLAN_HORIZON = timedelta(days=1) #? The planner itself runs daily
+PLANNER_JOB_ID = "plan refreshes"
+WEEKLY_JOB_IDS = ("update team records", "update promotions")
+SCHEDULER_TIMEZONE = ZoneInfo("America/Los_Angeles") #? Same as the weekly jobs
+
+
+def useAdaptiveSchedule(app):
+    """Swaps the weekly jobs for a daily planner, run right away AND every midnight,
+    that schedules the next day's refreshes
+    """
+    for jobId in WEEKLY_JOB_IDS:
+        if scheduler.get_job(jobId) is not None:
+            scheduler.remove_job(jobId)
+    budget = RequestBudget(app.config["SCHEDULER_MAX_DAILY_REQUESTS"])
+    scheduler.add_job(PLANNER_JOB_ID, planRefreshJobs, args=[budget], trigger="cron",
+                      hour=0, minute=5, timezone=SCHEDULER_TIMEZONE,
+                      next_run_time=utcNow().replace(tzinfo=UTC),
+                      misfire_grace_time=60, coalesce=True)
+
+
+def planRefreshJobs(budget):
+    with scheduler.app.app_context():
+        now = utcNow()
+        runs = planRefreshes(queryUpcomingGames(now), now, budget.maxDailyRequests)
+        for runAt, jobName in runs:
+            #? Named by job + time, so replanning the same run just replaces it
+            scheduler.add_job(f"{jobName} at {runAt:%Y-%m-%d %H:%M}Z", runRefresh,
+                              args=[jobName, budget], trigger="date",
+                              run_date=runAt.replace(tzinfo=UTC), replace_existing=True,
+                              misfire_grace_time=600)
+        print(f"Planned {len(runs)} refreshes until {now + PLAN_HORIZON:%Y-%m-%d %H:%M}Z")
+        printStaleness()
+
+
+def runRefresh(jobName, budget):
+    if not budget.hasRequestsLeft(utcNow()):
+        print(f"Reached the daily MLB API request cap, so skipping the {jobName} refresh")
+        return
+    with scheduler.app.app_context():
+        print(f"Running the adaptive '{jobName}' refresh")
+        try:
+            REFRESH_COMMANDS[jobName]()
+        finally:
+            #? ONLY requests actually sent are charged, so a run skipped because
+            #? another job holds its tables' locks costs nothing
+            budget.use(utcNow(), popSentRequests())
+        printStaleness()
+
+
+def queryUpcomingGames(now):
+    """Loads the start time + home team of every game that could need a refresh
+    planned within the horizon, in 1 query using the `(date, id)` index
+    Returns: A list of `(UTC start datetime, isTrackedHomeGame)` tuples
+    """
+    trackedTeamIds = getTrackedTeamIDs()
+    rows = db.session.execute(
+        db.select(BaseballGame.date, BaseballTeam)
+        .join(BaseballTeam, BaseballGame.home_team_id == BaseballTeam.id)
+        .where(BaseballGame.date >= now - GAME_LENGTH,
+               BaseballGame.date < now + PLAN_HORIZON + max(PROMO_LEAD_TIMES))
+    ).all()
+    return [(startsAt, mlbTeamId(homeTeam) in trackedTeamIds)
+            for startsAt, homeTeam in rows]
+
+
+def planRefreshes(games, now, maxDailyRequests, horizon = PLAN_HORIZON):
+    """Params: games - `(UTC start datetime, isTrackedHomeGame)` tuples
+    Returns: A time ordered list of `(UTC run datetime, job name)` tuples from `now`
+    until `now + horizon`, with at most `maxDailyRequests` runs per day since each run
+    sends at least 1 request. `RequestBudget` enforces the cap on the requests sent
+    """
+    runTimes = { STANDINGS_JOB: [], PROMOTIONS_JOB: [] }
+    for startsAt, isTrackedHomeGame in games:
+        runTimes[STANDINGS_JOB].append(startsAt + GAME_LENGTH)
+        if isTrackedHomeGame: #? Promos are ONLY saved for the tracked home games
+            runTimes[PROMOTIONS_JOB].extend(startsAt - lead for lead in PROMO_LEAD_TIMES)
+    runs = [(runAt, jobName) for jobName, jobRunTimes in runTimes.items()
+            for runAt in coalesceRunTimes(jobRunTimes) if now <= runAt < now + horizon]
+    return capDailyRuns(runs, maxDailyRequests)
+
+
+def coalesceRunTimes(runTimes):
+    """Merges run times within COALESCE_WINDOW of a later one into that later run"""
+    coalesced = []
+    for runAt in sorted(runTimes, reverse=True):
+        if not coalesced or coalesced[-1] - runAt > COALESCE_WINDOW:
+            coalesced.append(runAt)
+    return coalesced
+
+
+def capDailyRuns(runs, maxDailyRequests):
+    """Keeps at most `maxDailyRequests` runs per day, dropping promos runs 1st since
+    promos rarely change, THEN the earliest standings runs since later ones catch up
+    """
+    runsByDay = {}
+    for run in runs:
+        runsByDay.setdefault(localDay(run[0]), []).append(run)
+    keptRuns = []
+    for dayRuns in runsByDay.values():
+        rankedRuns = sorted(dayRuns, key=lambda run: (run[1] == STANDINGS_JOB, run[0]),
+                            reverse=True)
+        keptRuns.extend(rankedRuns[:maxDailyRequests])
+    return sorted(keptRuns)
+
+
+def localDay(utcDatetime):
+    return utcToLocalDatetime(utcDatetime, SCHEDULER_TIMEZONE).date()
+
+
+def printStaleness():
+    for tableName, staleness in queryStaleness().items():
+        print(f"The {tableName} table was last refreshed {staleness['staleSeconds']}"
+              f" seconds ago at {staleness['refreshedAt']}")
+
+
+class RequestBudget:
+    """Counts the MLB API requests the refreshes send each day, refusing to start any
+    run once the cap is reached, so even replanned runs can't go over it. A run that
+    starts with requests left is charged every request it sends, so 1 that sends many,
+    i.e. a promotions refresh retrying, can end the day a little over the cap
+    """
+    def __init__(self, maxDailyRequests):
+        self.maxDailyRequests = maxDailyRequests
+        self.day, self.used = None, 0
+        self.lock = Lock() #? Jobs run in APScheduler's thread pool
+
+
+    def hasRequestsLeft(self, now):
+        with self.lock:
+            self.resetIfNewDay(now)
+            return self.used < self.maxDailyRequests
+
+
+    def use(self, now, requestCount):
+        with self.lock:
+            self.resetIfNewDay(now)
+            self.used += requestCount
+
+
+    def resetIfNewDay(self, now):
+        today = localDay(now)
+        if today != self.day:
+            self.day, self.used = today, 0
@@ -1,9 +1,20 @@
-from . import db
-from .models import BaseballGame
-
-from flask import Blueprint, abort, jsonify, redirect, request, url_for
+from .utility.compression import negotiateEncoding, setContentEncoding
+from .utility.datetime_helpers import YMD_FORMAT, strToDatetime
+from .utility.json_provider import PreEncodedJSON
+from .utility.refresh_tracking import queryStaleness
+from .utility.schedule_snapshot import (
+    FULL_SCHEDULE_KEY, currentScheduleSnapshot, dayPayloadKey, monthPayloadKey,
+    normalizedPayloadKey, teamPayloadKey,
+)
+
+from .utility.schedule_serializer import normalizeGames, serializeGamesPage
+
+from flask import Blueprint, abort, current_app, jsonify, redirect, request, url_for
+from werkzeug.http import is_resource_modified
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
 from calendar import monthrange
-from datetime import date
+from datetime import date, datetime
 
 bp = Blueprint("api", __name__, url_prefix="/api")
 
@@ -13,6 +24,8 @@ MONTH_SWITCH = {
     "march": 3, "april": 4, "may": 5, "june": 6,
     "july": 7, "august": 8, "september": 9, "october": 10
 }
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
 
 
 #? All routes prepended with '/api' thanks to prefix param in Blueprint constructor
@@ -21,8 +34,7 @@ def apiFullSchedule():
     if len(request.accept_mimetypes) > 1 or not request.accept_mimetypes.accept_json:
         return redirect(url_for("home"))
 
-    allGames = db.session.scalars(db.select(BaseballGame))
-    return jsonify([game.asDict for game in allGames])
+    return snapshotResponse(scopedPayloadKey(FULL_SCHEDULE_KEY))
 
 
 @bp.route("/<string:month>")
@@ -36,16 +48,8 @@ def apiSingleMonthSchedule(month):
     except KeyError:
         abort(404, "Invalid month")
 
-    year = date.today().year
-    start = date(year=year, month=monthNum, day=1)
-    end = date(year=year, month=monthNum+1, day=1)
-
-    # COULDN'T get game on month's last day, so `end` must = next month's 1st day
-    baseballGames = db.session.scalars(
-        db.select(BaseballGame).where(BaseballGame.readableDateTime < end) \
-            .where(BaseballGame.readableDateTime >= start)
-    )
-    return jsonify([game.asDict for game in baseballGames])
+    monthKey = monthPayloadKey(date.today().year, monthNum)
+    return snapshotResponse(scopedPayloadKey(monthKey))
 
 
 @bp.route("/<string:month>/<int:day>")
@@ -65,16 +69,127 @@ def apiSingleDaySchedule(month, day):
     if (day <= 0 or day > lastDayOfMonth):
         abort(404, "Invalid day of the month")
 
-    start = date(year=year, month=monthNum, day=day)
-    endMonth = monthNum if (day != lastDayOfMonth) else monthNum + 1
-    endDay = day + 1 if (day != lastDayOfMonth) else 1
-    end = date(year=year, month=endMonth, day=endDay)
+    return snapshotResponse(scopedPayloadKey(dayPayloadKey(year, monthNum, day)))
 
-    baseballGames = db.session.scalars( #? `scalars()` returns an iterable `ScalarResult`
-        db.select(BaseballGame).where(BaseballGame.readableDateTime < end) \
-            .where(BaseballGame.readableDateTime >= start)
-    ) #? SO if a basic List is needed, add the suffix `.all()`
-    return jsonify([game.asDict for game in baseballGames])
+
+#? Unlike the routes above, any date range in any season can be requested, i.e.
+#? `/api/games?start=2024-04-01&end=2024-05-01&limit=50`, so clients fetch only the
+#? games they render. Since ranges are endless, they're queried live, NOT snapshotted
+@bp.route("/games")
+def apiGames():
+    if len(request.accept_mimetypes) > 1 or not request.accept_mimetypes.accept_json:
+        return redirect(url_for("home"))
+
+    start = parseDateParam("start") #? Inclusive local date
+    end = parseDateParam("end") #? Exclusive local date
+    limit = parseLimitParam()
+    after = decodeCursor(request.args["after"]) if "after" in request.args else None
+    team = parseTeamParam(invalidStatus=400) #? Same `?team=LAD` as the routes above
+    isNormalized = isNormalizedFormat() #? Checked 1st so a bad format never queries
+
+    games, nextAfter = serializeGamesPage(start, end, after, limit, team)
+    body = normalizeGames(games) if isNormalized else { "games": games }
+    #? Sent back as `?after=` to get the next page, OR null on the last page
+    body["nextCursor"] = encodeCursor(nextAfter) if nextAfter is not None else None
+    return jsonify(body)
+
+
+#? How long ago each table was last synced with the MLB API, i.e. for uptime monitors
+@bp.route("/freshness")
+def apiFreshness():
+    return jsonify(queryStaleness())
+
+
+def parseDateParam(name):
+    dateParam = request.args.get(name)
+    if dateParam is None:
+        return None
+    try:
+        return strToDatetime(dateParam, YMD_FORMAT).date()
+    except ValueError:
+        abort(400, f"Invalid {name} date, expected YYYY-MM-DD")
+
+
+def parseLimitParam():
+    limit = request.args.get("limit", str(DEFAULT_PAGE_SIZE))
+    if not limit.isdigit() or not 1 <= int(limit) <= MAX_PAGE_SIZE:
+        abort(400, f"Invalid limit, expected 1 to {MAX_PAGE_SIZE}")
+    return int(limit)
+
+
+#? Cursors are the last sent game's `(date, id)` keyset, base64 encoded so clients
+#? treat them as opaque tokens rather than building their own
+def encodeCursor(keyset):
+    gameDate, gameId = keyset
+    return urlsafe_b64encode(f"{gameDate.isoformat()}|{gameId}".encode()).decode()
+
+
+def decodeCursor(cursor):
+    try:
+        gameDate, gameId = urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return (datetime.fromisoformat(gameDate), int(gameId))
+    except (Base64Error, UnicodeDecodeError, ValueError):
+        abort(400, "Invalid cursor")
+
+
+#? Picks the prebuilt payload matching the request's optional query params
+def scopedPayloadKey(payloadKey):
+    return formatScopedKey(teamScopedKey(payloadKey))
+
+
+#? Every route accepts an optional `?team=LAD` abbreviation, narrowing its games to
+#? the ones that team plays, home OR away. Each team's payloads are prebuilt too
+def teamScopedKey(payloadKey):
+    team = parseTeamParam()
+    return payloadKey if team is None else teamPayloadKey(team, payloadKey)
+
+
+def parseTeamParam(invalidStatus = 404):
+    team = request.args.get("team")
+    if team is None:
+        return None
+    if not team.isalpha() or not 2 <= len(team) <= 3: # i.e. LA, LAD, NYY, SF or SFG
+        abort(invalidStatus, "Invalid team")
+    return team.upper()
+
+
+#? Every route ALSO accepts `?format=normalized`, sending `{ teams, games }` where each
+#? team is listed once by id and games only reference their teams' ids
+def formatScopedKey(payloadKey):
+    return normalizedPayloadKey(payloadKey) if isNormalizedFormat() else payloadKey
+
+
+def isNormalizedFormat():
+    payloadFormat = request.args.get("format")
+    if payloadFormat not in (None, "normalized"):
+        abort(404, "Invalid format")
+    return payloadFormat == "normalized"
+
+
+#? Every route serves the pre-encoded bytes of the latest snapshot, so only 1 lookup of
+#? its published version runs per request, NOT any game queries OR `asDict` calls.
+#? Compression is negotiated too, sending the payload's precompressed bytes if accepted
+def snapshotResponse(payloadKey):
+    snapshot = currentScheduleSnapshot()
+    encoding = negotiateEncoding(request.accept_encodings, snapshot.encodings(payloadKey))
+    etag = snapshot.etag(payloadKey, encoding)
+    #? Checks `If-None-Match` 1st, THEN `If-Modified-Since` if no ETags were sent
+    if not is_resource_modified(request.environ, etag=etag,
+                                last_modified=snapshot.builtAt):
+        response = current_app.response_class(status=304) # Never reads the payload
+    else:
+        #? Already encoded, so the JSON provider sends the bytes without re-encoding
+        payload = snapshot.payload(payloadKey, encoding)
+        response = current_app.json.response(PreEncodedJSON(payload))
+        setContentEncoding(response, encoding)
+    response.vary.add("Accept-Encoding") #? Even 304s, so caches key by the encoding
+    response.set_etag(etag) #? Strong ETag by default, since snapshot bytes never change
+    response.last_modified = snapshot.builtAt
+    #? `no-cache` DOESN'T mean "don't cache". It means "revalidate before reusing", so
+    #? browsers keep the JSON BUT must ask with `If-None-Match` every time, getting a 304
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response
 
 
 #? Flask Exceptions generally subclass the Werkzeug base Exception for ease of use
@@ -99,3 +214,7 @@ def apiSingleDaySchedule(month, day):
 def notFound(e):
     return jsonify(error=str(e)), 404
 
+@bp.errorhandler(400)
+def badRequest(e):
+    return jsonify(error=str(e)), 400
+
@@ -1,6 +1,7 @@
 from .database_seed import seedDB
 from .update_promotions import updateAllPromotions
 from .update_standings import updateAllTeamRecords
+from ..utility.team_map import getTeamIdFromName
 
 import click
 from flask import Blueprint
@@ -9,9 +10,11 @@ bp = Blueprint("commands", __name__)
 
 @bp.cli.command("seed")
 @click.argument("db")
-def seedDb(db):
+@click.option("--team", "teams", multiple=True, help="Full name of a team to seed")
+def seedDb(db, teams):
+    #? Ex: `flask seed db --team "New York Mets" --team "New York Yankees"`
     if (db == "db"):
-        seedDB() #? Seeds AND updates full schedule
+        seedDB(teamIds=getTeamIDsFromNames(teams)) #? Seeds AND updates full schedule
     else:
         print("Not valid argument")
 
@@ -27,3 +30,22 @@ def update(table):
     else:
         print("Not valid argument")
 
+@bp.cli.group("scheduler")
+def schedulerCommands():
+    """Runs the weekly standings + promotions jobs"""
+
+@schedulerCommands.command("run") #? Ex: `flask scheduler run`
+def runSchedulerCommand():
+    #? Imported here so ONLY this process registers the jobs, never the web workers
+    from ..scheduled_jobs import runScheduler
+    runScheduler()
+
+
+def getTeamIDsFromNames(teamNames):
+    """Returns None if no names are given, so the seeder uses `TRACKED_TEAMS` instead"""
+    teamIds = set()
+    for teamName in teamNames:
+        if (teamId := getTeamIdFromName(teamName)) is None:
+            raise click.BadParameter(f"Unknown team: {teamName}", param_hint="--team")
+        teamIds.add(teamId)
+    return frozenset(teamIds) or None
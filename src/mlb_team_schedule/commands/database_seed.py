@@ -1,53 +1,78 @@
 from .. import db
 from ..models import BaseballGame, BaseballTeam, Promo
-from ..utility.database_helpers import deleteFromDb, saveToDb
+from .schedule_diff import GameIndex, ScheduleDiff, gameContentDigest
+from ..utility.database_queries import whereLocalDateBetween
 from ..utility.datetime_helpers import ISO_FORMAT, YMD_FORMAT, dateToStr, strToDatetime
 from ..utility.endpoint_constants import BASE_MLB_LOGO_URL
-from ..utility.mlb_api import fetchRemainingSchedule, fetchThisYearsSchedule
-from ..utility.utc_to_pt_converters import utcStrToPacificDatetime
+from ..utility.job_runs import runsAsJob
+from ..utility.mlb_api import fetchSeasonData
+from ..utility.refresh_tracking import recordsRefreshOf
+from ..utility.response_cache import processesResponses
+from ..utility.schedule_snapshot import refreshesScheduleSnapshot
+from ..utility.team_map import getTeamTimezone, getTrackedTeamIDs
+from ..utility.team_registry import TeamRegistry
 
-from flask import current_app as app
-from datetime import timedelta
+from sqlalchemy import or_
 
 
 #! Main CLI Command
-def seedDB(updateMode = False):
+@runsAsJob("seed", (BaseballGame.__tablename__, Promo.__tablename__,
+                   BaseballTeam.__tablename__))
+@recordsRefreshOf(BaseballGame.__tablename__, Promo.__tablename__)
+@refreshesScheduleSnapshot
+@processesResponses
+def seedDB(updateMode = False, teamIds = None):
     print("Running the Database Seeder")
-    (totalGames, teamGameDates, startDate) = fetchRemainingSchedule() if updateMode \
-        else fetchThisYearsSchedule()
-    if totalGames is None or teamGameDates is None:
-        return # Getting None means likely issue with MLB-Stats endpoint
+    #? Every tracked team's games come from 1 schedule, so shared games are seeded ONCE
+    trackedTeamIds = frozenset(teamIds or getTrackedTeamIDs())
+    #? Schedule + standings are fetched at the same time, rather than 1 after the other
+    #? A full seed always runs since the DB may have been reset since the last one
+    #? The schedule is streamed, so each date is processed as it's parsed
+    seasonData = fetchSeasonData(updateMode=updateMode, skipUnchanged=updateMode,
+                                 streamSchedule=True, teamIds=trackedTeamIds)
+    #? A streamed schedule's `totalGames` may not be parsed until every date is read
+    (_, teamGameDates, startDate) = seasonData["schedule"]
 
-    #? Query for all games in DB after `startDate` (today's date if in updateMode)
-    startDateTime = utcStrToPacificDatetime(startDate, YMD_FORMAT)
-    gamesInDb = db.session.scalars( # Checks if a save, update, or skip + print done later
-        db.select(BaseballGame).where(BaseballGame.readableDateTime >= startDateTime) \
-                                   .order_by(BaseballGame.date)
-    ).all()
+    from . import updateAllTeamRecords  #? Avoid initPromotions circular ref
+    if teamGameDates is None:
+        #? Getting None means an unchanged schedule OR likely an MLB-Stats endpoint issue
+        updateAllTeamRecords(standings=seasonData["standings"])
+        return
 
-    startingDateStr = dateToStr(startDateTime, YMD_FORMAT) # In PDT
+    #? Query for all games in DB after `startDate` (today's date if in updateMode)
+    startDateTime = strToDatetime(startDate, YMD_FORMAT) # Compared to the local dates
+    teamRegistry = TeamRegistry() # Loads all teams in 1 query rather than 2 per day
+    #? Each game's content digest decides if it changed, so its teams + promos are
+    #? never needed, and the 1 query only loads the games' own columns
+    gameIndex = GameIndex(db.session.scalars(whereTrackedTeamsPlay(
+        whereLocalDateBetween(db.select(BaseballGame), start=startDateTime),
+        trackedTeamIds, teamRegistry
+    )).all())
+
+    startingDateStr = dateToStr(startDateTime, YMD_FORMAT)
     print("Beginning to add Baseball Games to Schedule\n")
-    seriesTotal, currentSeriesGame, seasonGameNum = 0, 0, 0
+    scheduleDiff = ScheduleDiff() # Collects every change to apply in 1 transaction
+    seriesTotal, currentSeriesGame = 0, 0
     for dayNum, gameDate in enumerate(teamGameDates):
         gameList = gameDate.get("games", [])
         if len(gameList) == 0:
             print("Date without any games found, skipping!")
             continue # Skip if date has no games (unsure if possible)
-        print(f"Day #{dayNum+1} that {app.config.get('TEAM_FULL_NAME')}" \
-            f" have played since {startingDateStr}")
+        print(f"Day #{dayNum+1} that the tracked teams have played" \
+            f" since {startingDateStr}")
 
         firstGameOfDay = gameList[0]
         currentSeriesGame = gameList[1]["seriesGameNumber"] if len(gameList) > 1 \
             else firstGameOfDay["seriesGameNumber"]
 
         gameStr = f"On {gameDate['date']} is "
-        gameStr += "a double header " if len(gameList) > 1 \
+        #? With many tracked teams, many games on 1 date doesn't mean a double header
+        gameStr += "a double header " if len(gameList) > 1 and len(trackedTeamIds) == 1 \
             else f"game #{currentSeriesGame} "
         gameStr += "in a series "
 
-        (seasonGameNum, gameStr) = createGamesOfTheDay(
-            gameList, gamesInDb, seasonGameNum, gameStr
-        )
+        gameStr = createGamesOfTheDay(gameList, gameIndex, gameStr, scheduleDiff,
+                                      teamRegistry, trackedTeamIds)
 
         seriesTotal = firstGameOfDay["gamesInSeries"]
         if currentSeriesGame == seriesTotal: # This condition will group games by series
@@ -58,136 +83,117 @@ def seedDB(updateMode = False):
 
         print(gameStr)
 
-    from . import updateAllTeamRecords  #? Avoid initPromotions circular ref
-    updateAllTeamRecords()
+    #? Any DB game the API never listed must have been removed from the schedule
+    for staleGame in gameIndex.unmatchedGames():
+        print(f"Game from DB = {staleGame} no longer in the schedule so deleting it")
+        scheduleDiff.deleteGame(staleGame)
+
+    scheduleSummary = scheduleDiff.apply() # Commits any new teams alongside the games
+
+    updateAllTeamRecords(teamRegistry, standings=seasonData["standings"])
 
     print("Finishing seeding process. \n")
+    return scheduleSummary
+
+
+def whereTrackedTeamsPlay(query, trackedTeamIds, teamRegistry):
+    """Limits a BaseballGame query to games the tracked teams play in, since ONLY their
+    games are in the API's response, so only they can have been removed from it. That
+    way seeding 1 team never deletes another team's games
+    """
+    teamIds = [team.id for mlbId in trackedTeamIds
+               if (team := teamRegistry.find(mlbId)) is not None]
+    return query.where(or_(BaseballGame.home_team_id.in_(teamIds),
+                           BaseballGame.away_team_id.in_(teamIds)))
 
 #! Model Creation Methods - GameDay, Team, and GameDayPromotions
-def createGamesOfTheDay(todaysGames, gamesInDb, seasonGameNum, gameStr):
+def createGamesOfTheDay(todaysGames, gameIndex, gameStr, scheduleDiff, teamRegistry,
+                        trackedTeamIds = None):
+    trackedTeamIds = trackedTeamIds or getTrackedTeamIDs()
     # Perform this string manipulation ONCE, not twice if a double header
-    awayTeam = createOrGrabTeam(todaysGames[0], "away")
+    awayTeam = createOrGrabTeam(todaysGames[0], "away", teamRegistry)
     gameStr += f"where the visiting, {awayTeam.city_name} {awayTeam.team_name}, "
-    homeTeam = createOrGrabTeam(todaysGames[0], "home")
+    homeTeam = createOrGrabTeam(todaysGames[0], "home", teamRegistry)
     gameStr += f"will take on the {homeTeam.team_name} at home in {homeTeam.city_name}"
+    if len(todaysGames) > 1 and len(trackedTeamIds) > 1:
+        gameStr += f" among {len(todaysGames)} games"
 
-    for game in todaysGames: # In case of double headers
+    for game in todaysGames: # In case of double headers OR multiple tracked teams
+        #? Each game may be a different matchup, BUT the registry skips any extra queries
+        awayTeam = createOrGrabTeam(game, "away", teamRegistry)
+        homeTeam = createOrGrabTeam(game, "home", teamRegistry)
         gamePk, gameDate = game["gamePk"], game["gameDate"]
         gameSeriesNumber, gamesInSeries = game["seriesGameNumber"], game["gamesInSeries"]
 
-        # Using a list sorted oldest to most recent date to get any game based on season #
-        # based on what # game of the full season it is, i.e.
-        # Ex: 10th game in season must = index 9 with all expected attributes
-        gameExpectedFromDb: BaseballGame = gamesInDb[seasonGameNum] \
-            if seasonGameNum < len(gamesInDb) else None
+        # Suspended games are listed on BOTH their original + resumed dates with the
+        # SAME `gamePk` (the copy has a `resumedFrom` key), so only keep the 1st listing
+        if gameIndex.alreadyReconciled(gamePk):
+            print("Found a suspended game so skipping!\n")
+            continue
 
-        # Create Game Model so promos can be associated later
         newGame = BaseballGame(gameKey=gamePk, date=strToDatetime(gameDate, ISO_FORMAT),
                                seriesGameNumber=gameSeriesNumber,
                                seriesGameCount=gamesInSeries,
                                home_team_id=homeTeam.id, away_team_id=awayTeam.id)
+        homeTeamId = game["teams"]["home"]["team"]["id"]
+        newGame.localize(getTeamTimezone(homeTeamId)) # In the home ballpark's timezone
+        # Check the home team's MLB ID for when city has multiple teams, i.e. LA or NY
+        newPromos = initPromotionsForGame(game.get("promotions", [])) \
+            if homeTeamId in trackedTeamIds else []
+        newGame.content_digest = gameContentDigest(game, newPromos)
 
-        # If `resumedFrom` key found, game was suspended from day before, & may be a copy
-        originalDate = game.get("resumedFrom", "") # Default to '' to falsy check ternary
-        originalPstDate = (strToDatetime(originalDate, ISO_FORMAT) - timedelta(hours=7)) \
-            if originalDate else None # Avoids poorly formatted datetime
-        # Games rarely added since 163rd tiebreakers can't happen with extended playoffs
-        suspendedGame = originalPstDate and \
-            originalPstDate.day + 1 == newGame.readableDateTime.day
-        if seasonGameNum > 0 and suspendedGame: # Prevents copy from being saved into DB
-            print("Found a suspended game so skipping!\n")
+        gameFromDb = gameIndex.match(newGame)
+        if gameFromDb is None: # Likely running seeder so save all as normal
+            print("No game from the DB found so save the game and its promos!")
+            scheduleDiff.upsertGame(newGame, newPromos)
             continue
 
-        # Check team abbreviation for when city has multiple teams, i.e. LA or NY
-        newPromos = initPromotionsForGame(game.get("promotions", [])) \
-            if homeTeam.abbreviation == "LAD" else []
-        if gameExpectedFromDb is None: # Likely running seeder so save all as normal
-            print("No game from the DB found so save the game and its promos!")
-            createNewGame(newGame, newPromos)
-            seasonGameNum += 1 # Increment to make sure to keep up with future checks
+        if gameFromDb.gameKey != newGame.gameKey: # Only matched by date + teams
+            print(f"Game from DB = {gameFromDb} has an outdated gameKey, replacing it")
+            scheduleDiff.deleteGame(gameFromDb)
+            scheduleDiff.upsertGame(newGame, newPromos)
             continue
 
-        # Compare datetime objs to get correct ordering, not string versions
-        if newGame.date < gameExpectedFromDb.date:
-            print("Seems a game moved up")
-            if gameExpectedFromDb.seriesGameNumber == gameExpectedFromDb.seriesGameCount:
-                print("Seems the game just made their start time earlier")
-            # Away games track changes by comparing the API game to the current DB game
-            # Home games track identity by promo set (so different than __eq__)
-            #TODO: `gamePk` probably a better choice for both since it rarely changes
-            if homeTeam.abbreviation == "LAD":
-                findOriginalGameByPromos(
-                    gamesInDb, seasonGameNum, newGame, newPromos, replaceOldGame
-                )
-        elif newGame.date > gameExpectedFromDb.date:
-            print("Game likely suspended or postponed")
-            if gameExpectedFromDb.seriesGameNumber == gameExpectedFromDb.seriesGameCount:
-                print("Game likely later start time")
-            if gameExpectedFromDb.seriesGameCount > newGame.seriesGameCount:
-                print("Game likely full rescheduled, since total games in series reduced")
-            if homeTeam.abbreviation == "LAD":
-                findOriginalGameByPromos( # `replaceOldGame` helps keep db list ordered
-                    gamesInDb, seasonGameNum, newGame, newPromos, replaceOldGame
-                )
-
-        print(f"Game from DB List = {gameExpectedFromDb}" \
-            f" which is game #{gameExpectedFromDb.seriesGameNumber}" \
-            f" in a series of {gameExpectedFromDb.seriesGameCount}"
-        )
-        print(f"Game from API = {newGame}" \
-            f" which is game #{newGame.seriesGameNumber}" \
-            f" in a series of {newGame.seriesGameCount}"
-        )
-        print(f"Game from DB List after changes = {gamesInDb[seasonGameNum]}" \
-            f" which is game #{gamesInDb[seasonGameNum].seriesGameNumber}" \
-            f" in a series of {gamesInDb[seasonGameNum].seriesGameCount}"
-        )
-
-        if gameExpectedFromDb == gamesInDb[seasonGameNum]:
-            print("Game from DB List still still matches original in DB")
-            if newGame == gameExpectedFromDb:
-                if not comparePromoLists(gameExpectedFromDb.promos, newPromos):
-                    print("Promo lists don't match, replacing old ones with new ones!")
-                    replaceOldPromos(gameExpectedFromDb, newPromos)
-            else:
-                replaceOldGame(gamesInDb, seasonGameNum, newGame)
-                print(f"API Game changed. Use {gamesInDb[seasonGameNum]} & delete other")
-                createNewGame(newGame, newPromos)
-            print("")
-        elif newGame == gamesInDb[seasonGameNum]: # New game likely put into `gamesInDb`
-            createNewGame(newGame, newPromos) # so save into actual DB now
-            print("Game from DB list now matches API game\n")
-
-        seasonGameNum += 1 # On to next game in the season so future checks work
-
-    return (seasonGameNum, gameStr) #TODO: Get rid of OR consolidate `gameStr`
-
-def findOriginalGameByPromos(gamesInDb, seasonGameNum, newGame, newPromos, matchCallback):
-    searchIndex = seasonGameNum + 1
-    while searchIndex < len(gamesInDb) and gamesInDb[searchIndex].seriesGameNumber != 1:
-        potentialGame: BaseballGame = gamesInDb[searchIndex]
-        print(f"Potential game = {potentialGame} is #{potentialGame.seriesGameNumber}")
-        matchingPromos = comparePromoLists(potentialGame.promos, newPromos)
-        if matchingPromos:
-            matchCallback(gamesInDb, seasonGameNum, newGame, searchIndex)
-            break
-        searchIndex += 1
-
-def replaceOldGame(gamesInDb, seasonGameNum, newGame, searchIndex=None):
-    deleteIndex = searchIndex or seasonGameNum
-    print(f"Deleting a matching outdated game at index = {deleteIndex}")
-    originalGame = gamesInDb.pop(deleteIndex)
-    [deleteFromDb(promo) for promo in originalGame.promos]
-    deleteFromDb(originalGame)
-    # Inserts `newGame` at expected date/index. Save to the DB later.
-    gamesInDb.insert(seasonGameNum, newGame)
-
-def createOrGrabTeam(game, teamKey=""):
+        if gameFromDb.content_digest == newGame.content_digest:
+            continue #? Same date, series, teams AND promos, so nothing to compare
+
+        if gameChanged(gameFromDb, newGame):
+            describeGameChange(gameFromDb, newGame)
+            #? The digest can't say if its promos ALSO changed, so they're replaced too
+            scheduleDiff.upsertGame(newGame, newPromos)
+        else:
+            print("Promo lists don't match, replacing old ones with new ones!")
+            replaceOldPromos(gameFromDb, newPromos, scheduleDiff)
+            scheduleDiff.updateDigest(gameFromDb, newGame.content_digest)
+
+    return gameStr #TODO: Get rid of OR consolidate `gameStr`
+
+def gameChanged(gameFromDb, newGame):
+    return gameFromDb.date != newGame.date \
+        or gameFromDb.seriesGameNumber != newGame.seriesGameNumber \
+        or gameFromDb.seriesGameCount != newGame.seriesGameCount \
+        or gameFromDb.home_team_id != newGame.home_team_id \
+        or gameFromDb.away_team_id != newGame.away_team_id
+
+def describeGameChange(gameFromDb, newGame):
+    # Compare datetime objs to get correct ordering, not string versions
+    if newGame.date < gameFromDb.date:
+        print("Seems a game moved up")
+    elif newGame.date > gameFromDb.date:
+        print("Game likely suspended or postponed")
+    if gameFromDb.seriesGameCount > newGame.seriesGameCount:
+        print("Game likely fully rescheduled, since total games in series reduced")
+    print(f"Game from DB = {gameFromDb} which is game #{gameFromDb.seriesGameNumber}" \
+        f" in a series of {gameFromDb.seriesGameCount}")
+    print(f"Game from API = {newGame} which is game #{newGame.seriesGameNumber}" \
+        f" in a series of {newGame.seriesGameCount}\n")
+
+def createOrGrabTeam(game, teamKey, teamRegistry):
     team = game["teams"][teamKey]["team"]
 
     teamInDb = None
     #? MUST return model so set fetched model var in walrus conditional OR create and save
-    if (teamInDb := queryTeamByName(team["clubName"])) is not None:
+    if (teamInDb := teamRegistry.find(team["id"], team["clubName"])) is not None:
         print(f"Found a matching team: {teamInDb} -> Won't double save. Set record later")
     else:
         teamRecord = game["teams"][teamKey]["leagueRecord"]
@@ -198,17 +204,13 @@ def createOrGrabTeam(game, teamKey=""):
                                 team_logo=BASE_MLB_LOGO_URL.format(espnID=team["id"]),
                                 abbreviation=team["abbreviation"],
                                 wins=teamRecord["wins"], losses=teamRecord["losses"])
-        saveToDb(teamInDb)
+        #? Flush rather than commit so the new team gets an ID for its games BUT still
+        db.session.add(teamInDb) #? rolls back with the rest of the schedule on failure
+        db.session.flush()
+        teamRegistry.add(teamInDb) # So the next game day finds it without a query
 
     return teamInDb
 
-def queryTeamByName(name):
-    return db.session.scalars(db.select(BaseballTeam).filter_by(team_name=name)).first()
-
-def createNewGame(newGame, newPromos):
-    saveToDb(newGame)
-    linkPromosToGame(newGame, newPromos)
-
 def initPromotionsForGame(promotions):
     newPromos = []
     for promo in promotions:
@@ -219,33 +221,11 @@ def initPromotionsForGame(promotions):
         newPromos.append(newPromo)
     return newPromos # Return the list of promos to save
 
-def linkPromosToGame(newGame, newPromos):
-    for newPromo in newPromos:
-        newPromo.baseball_game_id = newGame.id
-        saveToDb(newPromo)
-
-def replaceOldPromos(oldGame, newPromos):
-    [deleteFromDb(promo) for promo in oldGame.promos]
-    linkPromosToGame(oldGame, newPromos)
-
-#TODO: Could do `newPromoSet - dbPromoSet`, reliably leaving only new + changed promos
-#TODO: THEN could iterate through the new promos, save and link them to the game
-def comparePromoLists(dbPromos, newPromos):
-    COMMON_SET = {
-        Promo(name="Fireworks Show"),
-        Promo(name="Taco Tuesdays"),
-        Promo(name="Kids Run the Bases")
-    }
-    #? For sets obj hash & equals must BOTH = True so `dbPromoSet` drops all in COMMON_SET
-    dbPromoSet = set(dbPromos) - COMMON_SET
-    newPromoSet = set(newPromos) - COMMON_SET
-    if len(dbPromoSet) != len(newPromoSet): # Easy quick guard check
-        print("Promo length DOESN'T match")
-        return False
-    # If SAME HOME GAME, THEN promo set should match EXCEPT for date change
-    if dbPromoSet != newPromoSet:
-        print("Promo sets DON'T match")
-        return False
-    print("Promo sets match!")
-    return True
-
+def replaceOldPromos(oldGame, newPromos, scheduleDiff=None):
+    """Queues the promo swap in the given ScheduleDiff, OR if none is given, applies
+    the swap immediately in its own transaction
+    """
+    diff = scheduleDiff or ScheduleDiff()
+    diff.replacePromos(oldGame, newPromos)
+    if scheduleDiff is None:
+        diff.apply()
@@ -0,0 +1,306 @@
+from .. import db
+from ..models import BaseballGame, Promo
+
+from sqlalchemy import delete, insert, literal_column, update
+from sqlalchemy.dialects.postgresql import insert as upsert
+from hashlib import blake2b
+import json
+
+#! Bulk Schedule Reconciliation
+#? Rather than committing every single game + promo save or delete as the seeder
+#? finds them, it records each change into a ScheduleDiff, THEN applies the whole diff
+#? as a handful of batched statements inside 1 transaction that rolls back on failure
+
+#? Columns updated on a `gameKey` conflict, i.e. every column except the IDs
+GAME_UPSERT_COLUMNS = ("date", "local_datetime", "local_date", "seriesGameNumber",
+                       "seriesGameCount", "home_team_id", "away_team_id",
+                       "content_digest")
+
+
+#! Content Digests
+#? Each game row stores a hash of the API fields it was saved from, so finding out if
+#? a game changed costs 1 string comparison rather than loading + comparing its promos
+def gameContentDigest(game, promos):
+    """Hashes an API game's date, series numbers, MLB team IDs + the promos saved for it
+    Params: game - The API game JSON, promos - The Promo models saved for that game
+    Returns: A 32 character hex string OR None if the JSON is missing any of those fields
+    """
+    try:
+        fields = [game["gameDate"], game["seriesGameNumber"], game["gamesInSeries"],
+                  game["teams"]["home"]["team"]["id"],
+                  game["teams"]["away"]["team"]["id"]]
+    except KeyError:
+        return None
+    #? Sorted so the API listing the same promos in a new order isn't a change
+    fields.append(sorted([promo.name, promo.thumbnail_url, promo.offer_type]
+                         for promo in promos))
+    canonicalJSON = json.dumps(fields, separators=(",", ":"))
+    return blake2b(canonicalJSON.encode(), digest_size=16).hexdigest()
+
+
+class GameIndex:
+    """Hash indexes of the DB's games so each API game is matched in O(1), keeping the
+    whole reconciliation pass linear in the size of the season
+    """
+    def __init__(self, gamesInDb):
+        #? `gameKey` is MLB's `gamePk`, which stays the same even if a game is moved
+        self.gamesByKey = { game.gameKey: game for game in gamesInDb }
+        #? BUT a game saved without its `gamePk` can still be found by its date + teams
+        self.gamesByDateAndTeams = { dateAndTeamsKey(game): game for game in gamesInDb }
+        self.reconciledGameKeys = set()
+
+
+    def alreadyReconciled(self, gameKey):
+        """Returns True if an API game with this `gameKey` was already matched,
+        otherwise marks it as reconciled for any later duplicates
+        """
+        if gameKey in self.reconciledGameKeys:
+            return True
+        self.reconciledGameKeys.add(gameKey)
+        return False
+
+
+    def match(self, newGame):
+        """Pops the DB game matching the API game by `gameKey` OR by date + teams"""
+        gameFromDb = self.gamesByKey.pop(newGame.gameKey, None) \
+            or self.gamesByDateAndTeams.get(dateAndTeamsKey(newGame))
+        if gameFromDb is None:
+            return None
+        #? Remove from BOTH indexes so no other API game can match it again
+        self.gamesByKey.pop(gameFromDb.gameKey, None)
+        fallbackKey = dateAndTeamsKey(gameFromDb)
+        if self.gamesByDateAndTeams.get(fallbackKey) is gameFromDb:
+            del self.gamesByDateAndTeams[fallbackKey]
+        return gameFromDb
+
+
+    def unmatchedGames(self):
+        """Returns the DB games that no API game has matched"""
+        return list(self.gamesByKey.values())
+
+
+def dateAndTeamsKey(game): #? `seriesGameNumber` splits up double headers
+    return (game.local_date, game.home_team_id, game.away_team_id,
+            game.seriesGameNumber)
+
+
+class ScheduleDiff:
+    """Collects the games to create or update, games to delete, and promo lists to
+    replace so they can all be applied at once by `apply()`
+    """
+    def __init__(self):
+        self.gameUpserts = {} # gameKey -> BaseballGame to insert OR update in place
+        self.promoUpserts = {} # gameKey -> List[Promo] replacing upserted game's promos
+        self.promoReplacements = {} # DB game id -> List[Promo] replacing its promos
+        self.gameDeletes = {} # DB game id -> BaseballGame to delete with its promos
+        self.digestUpdates = {} # DB game id -> Its new content digest
+
+
+    def upsertGame(self, game, promos):
+        """Creates the game OR updates the DB game sharing its `gameKey`, then replaces
+        that game's promos with the given list. `None` leaves its promos untouched
+        """
+        self.gameUpserts[game.gameKey] = game
+        if promos is not None:
+            self.promoUpserts[game.gameKey] = promos
+
+
+    def replacePromos(self, game, promos):
+        """Replaces the promos of a game already found in the DB"""
+        if game.id not in self.gameDeletes:
+            self.promoReplacements[game.id] = promos
+
+
+    def updateDigest(self, game, digest):
+        """Sets the content digest of a game already found in the DB, leaving its other
+        columns untouched since only its promos changed
+        """
+        if game.id not in self.gameDeletes:
+            self.digestUpdates[game.id] = digest
+
+
+    def deleteGame(self, game):
+        """Deletes a game already found in the DB and all of its promos"""
+        if game.id is not None: # Unsaved games don't need to be deleted
+            self.gameDeletes[game.id] = game
+            self.promoReplacements.pop(game.id, None)
+            self.digestUpdates.pop(game.id, None)
+
+
+    def isEmpty(self):
+        return not (self.gameUpserts or self.promoReplacements or self.gameDeletes
+                    or self.digestUpdates)
+
+
+    def apply(self):
+        """Applies every change in 1 transaction, rolling back if any statement fails
+        Returns: A dict summarizing the number of created, updated + deleted rows
+        """
+        summary = { "created": 0, "updated": 0, "deleted": 0,
+                    "promosCreated": 0, "promosDeleted": 0 }
+        if self.isEmpty():
+            print("No schedule changes found to apply")
+            return summary
+
+        try:
+            self.applyGameDeletes(summary)
+            upsertedGameIds = self.applyGameUpserts(summary)
+            self.applyPromoReplacements(upsertedGameIds, summary)
+            self.applyDigestUpdates()
+            db.session.commit()
+        except Exception:
+            print("Failed to apply schedule changes, so rolling them all back")
+            db.session.rollback()
+            raise
+
+        print(f"Schedule changes applied: {summary['created']} games created, "
+              f"{summary['updated']} updated, {summary['deleted']} deleted, "
+              f"{summary['promosCreated']} promos created, "
+              f"{summary['promosDeleted']} deleted")
+        return summary
+
+
+    def applyGameDeletes(self, summary):
+        #? A game deleted AND re-added with the same `gameKey` is just updated in place
+        deleteIds = [gameId for gameId, game in self.gameDeletes.items()
+                     if game.gameKey not in self.gameUpserts]
+        if not deleteIds:
+            return
+        summary["promosDeleted"] += db.session.execute(
+            delete(Promo).where(Promo.baseball_game_id.in_(deleteIds))
+        ).rowcount
+        summary["deleted"] += db.session.execute(
+            delete(BaseballGame).where(BaseballGame.id.in_(deleteIds))
+        ).rowcount
+
+
+    def applyGameUpserts(self, summary):
+        if not self.gameUpserts:
+            return {}
+        gameRows = [
+            { "gameKey": game.gameKey,
+              **{ column: getattr(game, column) for column in GAME_UPSERT_COLUMNS } }
+            for game in self.gameUpserts.values()
+        ]
+        #? Runs `INSERT ... ON CONFLICT ("gameKey") DO UPDATE` as 1 multi-row statement
+        statement = upsert(BaseballGame).values(gameRows)
+        statement = statement.on_conflict_do_update(
+            index_elements=[BaseballGame.gameKey],
+            set_={ column: statement.excluded[column] for column in GAME_UPSERT_COLUMNS }
+        ).returning( #? Postgres sets system column `xmax` to 0 on freshly inserted rows
+            BaseballGame.id, BaseballGame.gameKey,
+            literal_column("(xmax = 0)").label("inserted")
+        )
+
+        upsertedGameIds = {}
+        for gameId, gameKey, inserted in db.session.execute(statement):
+            upsertedGameIds[gameKey] = gameId
+            summary["created" if inserted else "updated"] += 1
+        return upsertedGameIds
+
+
+    def applyPromoReplacements(self, upsertedGameIds, summary):
+        replacements = dict(self.promoReplacements)
+        for gameKey, promos in self.promoUpserts.items():
+            replacements[upsertedGameIds[gameKey]] = promos
+        if not replacements:
+            return
+
+        summary["promosDeleted"] += db.session.execute(
+            delete(Promo).where(Promo.baseball_game_id.in_(list(replacements.keys())))
+        ).rowcount
+        promoRows = [
+            { "name": promo.name, "thumbnail_url": promo.thumbnail_url,
+              "offer_type": promo.offer_type, "baseball_game_id": gameId }
+            for gameId, promos in replacements.items() for promo in promos
+        ]
+        if promoRows: #? A list of dicts runs as 1 batched `executemany` INSERT
+            db.session.execute(insert(Promo), promoRows)
+            summary["promosCreated"] += len(promoRows)
+
+
+    def applyDigestUpdates(self):
+        if self.digestUpdates: #? Rows with a primary key run as 1 `executemany` UPDATE
+            db.session.execute(update(BaseballGame), [
+                { "id": gameId, "content_digest": digest }
+                for gameId, digest in self.digestUpdates.items()
+            ])
+
+
+class PromoDiff:
+    """Collects ONLY the promos to add, remove OR change across many games, rather than
+    replacing every game's promos wholesale, so `apply()` writes nothing if none changed
+    """
+    def __init__(self):
+        self.promoInserts = [] # Rows for promos new to their game
+        self.promoUpdates = [] # Rows for promos with a new thumbnail OR offer type
+        self.promoDeleteIds = [] # IDs of promos no longer listed for their game
+        self.digestUpdates = [] # Rows for games with a new content digest
+
+
+    def diffGame(self, gameFromDb, newPromos):
+        """Compares a DB game's loaded promos to its latest promos, matching by name"""
+        unmatchedPromos = {} # name -> DB promos, to handle any duplicate names in order
+        for promo in gameFromDb.promos:
+            unmatchedPromos.setdefault(promo.name, []).append(promo)
+
+        for newPromo in newPromos:
+            sameNamedPromos = unmatchedPromos.get(newPromo.name)
+            if not sameNamedPromos:
+                self.promoInserts.append({
+                    "name": newPromo.name, "thumbnail_url": newPromo.thumbnail_url,
+                    "offer_type": newPromo.offer_type, "baseball_game_id": gameFromDb.id
+                })
+                continue
+            promoFromDb = sameNamedPromos.pop(0)
+            if (promoFromDb.thumbnail_url, promoFromDb.offer_type) \
+                    != (newPromo.thumbnail_url, newPromo.offer_type):
+                self.promoUpdates.append({
+                    "id": promoFromDb.id, "thumbnail_url": newPromo.thumbnail_url,
+                    "offer_type": newPromo.offer_type
+                })
+        self.promoDeleteIds.extend(promo.id for promos in unmatchedPromos.values()
+                                   for promo in promos)
+
+
+    def updateDigest(self, gameFromDb, digest):
+        if gameFromDb.content_digest != digest:
+            self.digestUpdates.append({ "id": gameFromDb.id, "content_digest": digest })
+
+
+    def isEmpty(self):
+        return not (self.promoInserts or self.promoUpdates or self.promoDeleteIds
+                    or self.digestUpdates)
+
+
+    def apply(self):
+        """Applies every promo change in 1 transaction, rolling back if any fails
+        Returns: A dict summarizing the number of created, updated + deleted promos
+        """
+        summary = { "promosCreated": 0, "promosUpdated": 0, "promosDeleted": 0 }
+        if self.isEmpty():
+            print("No promo changes found to apply")
+            return summary
+
+        try:
+            if self.promoDeleteIds:
+                summary["promosDeleted"] = db.session.execute(
+                    delete(Promo).where(Promo.id.in_(self.promoDeleteIds))
+                ).rowcount
+            if self.promoUpdates: #? Rows with a primary key run as 1 `executemany` UPDATE
+                db.session.execute(update(Promo), self.promoUpdates)
+                summary["promosUpdated"] = len(self.promoUpdates)
+            if self.promoInserts:
+                db.session.execute(insert(Promo), self.promoInserts)
+                summary["promosCreated"] = len(self.promoInserts)
+            if self.digestUpdates:
+                db.session.execute(update(BaseballGame), self.digestUpdates)
+            db.session.commit()
+        except Exception:
+            print("Failed to apply promo changes, so rolling them all back")
+            db.session.rollback()
+            raise
+
+        print(f"Promo changes applied: {summary['promosCreated']} created, "
+              f"{summary['promosUpdated']} updated, {summary['promosDeleted']} deleted")
+        return summary
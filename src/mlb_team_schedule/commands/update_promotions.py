@@ -1,43 +1,144 @@
-from .database_seed import comparePromoLists, initPromotionsForGame, replaceOldPromos
+from .database_seed import initPromotionsForGame
+from .schedule_diff import PromoDiff, gameContentDigest
 from .. import db
-from ..models import BaseballGame
+from ..models import BaseballGame, Promo
 from ..utility.datetime_helpers import ISO_FORMAT, strToDatetime
+from ..utility.job_runs import runsAsJob
 from ..utility.mlb_api import fetchRemainingSchedule
+from ..utility.refresh_tracking import recordsRefreshOf
+from ..utility.response_cache import processesResponses
+from ..utility.schedule_snapshot import refreshesScheduleSnapshot
+from ..utility.team_map import getTeamIdFromName, getTrackedTeamIDs
 
-from flask import current_app as app  #? Main method of accessing App's Config.py env vars
-from sqlalchemy.exc import NoResultFound
+from sqlalchemy.orm import selectinload
 
+GAME_LOOKUP_KEYS = ("gamePk", "gameDate", "seriesGameNumber", "gamesInSeries")
 
-def updateAllPromotions():
+
+@runsAsJob("promotions", (Promo.__tablename__,))
+@recordsRefreshOf(Promo.__tablename__)
+@refreshesScheduleSnapshot
+@processesResponses
+def updateAllPromotions(teamIds = None):
     print("Going to update all promotions")
+    trackedTeamIds = frozenset(teamIds or getTrackedTeamIDs())
+
+    # Get `gameDates`, not `gameTotal` or `todaysDate`, streamed 1 date at a time
+    gameDateList = fetchRemainingSchedule(skipUnchangedFor="promotions", stream=True,
+                                          teamIds=trackedTeamIds)[1] or []
+    #? If a date has no games, the inner loop won't run and the outer loop continues
+    #? A generator, so each date is dropped once its home games' lookup fields are kept
+    games = (game for gameDate in gameDateList for game in gameDate.get("games", []))
+    return updateHomeGamesPromotions(games, trackedTeamIds)
+
+
+def updateEachGamesPromotions(game, trackedTeamIds = None):
+    """Updates a single game's promos in its own transaction"""
+    return updateHomeGamesPromotions([game], trackedTeamIds or getTrackedTeamIDs())
+
 
-    # Get `gameDates`, not `gameTotal` or `todaysDate`
-    gameDateList = fetchRemainingSchedule()[1] or []
-    for gameDate in gameDateList:
-        gameList = gameDate.get("games", [])
-        #? If a date has no games, the list comprehension won't run and for loop continues
-        [updateEachGamesPromotions(game) for game in gameList]
+def updateHomeGamesPromotions(games, trackedTeamIds):
+    """Skips each tracked team's home game whose content digest matches the DB's, THEN
+    diffs the promos of the rest, loading those games + promos in 1 query, applying
+    ONLY the added, removed OR changed promos in 1 transaction, so an unchanged
+    schedule costs 1 light query + writes nothing
+    Params: games - Any iterable of API games, i.e. a streamed schedule's, since ONLY
+            each tracked home game's lookup fields + promos are kept while iterating
+    Returns: A dict summarizing the number of created, updated + deleted promos
+    """
+    homeGames = [] # (API game's lookup fields, its promos, its digest)
+    #? Catching errors per game lets the loop finish diffing the rest of the games
+    for game in games:
+        if not isTrackedHomeGame(game, trackedTeamIds):
+            continue
+        try:
+            newPromos = initPromotionsForGame(game.get("promotions", []))
+        except KeyError:
+            print("When updating Game Promotions: No promotion name found in JSON")
+            continue
+        homeGames.append((gameLookupFields(game), newPromos,
+                          gameContentDigest(game, newPromos)))
+
+    savedDigests = queryContentDigests([game for game, _, _ in homeGames]) \
+        if homeGames else {}
+    changedGames = [(game, newPromos, digest) for game, newPromos, digest in homeGames
+                    if digest is None or savedDigests.get(game.get("gamePk")) != digest]
+
+    gameIndex = HomeGameIndex(queryHomeGames([game for game, _, _ in changedGames])) \
+        if changedGames else None
+    promoDiff = PromoDiff()
+    for game, newPromos, digest in changedGames:
+        gameInDb = gameIndex.match(game)
+        if gameInDb is None:
+            print("When updating Game Promotions: No game with gamePk: "
+                  f"{game.get('gamePk')}")
+            continue
+        promoDiff.diffGame(gameInDb, newPromos)
+        #? ONLY the seeder updates a game's other columns, so a moved game keeps its old
+        #? digest until the seeder sees the mismatch + saves the new date
+        if digest is not None and not savedGameChanged(gameInDb, game):
+            promoDiff.updateDigest(gameInDb, digest)
+    return promoDiff.apply()
 
 
-def updateEachGamesPromotions(game):
+def isTrackedHomeGame(game, trackedTeamIds):
     #? Since `homeTeamName` is deeply nested, catching the KeyError if it's `None`
-    #? helps so the comprehension finishes the rest of the games and dates lists
+    #? helps so the rest of the games and dates are still checked
     try:
-        # Running `lower()` on these names helps with comparison
-        homeTeamName = game["teams"]["home"]["team"].get("name", "").lower()
-        expectedTeamName = app.config.get("TEAM_FULL_NAME").lower()
-        if (homeTeamName == expectedTeamName): # ONLY add promos if it's a home game
-            dateForGame = strToDatetime(game["gameDate"], ISO_FORMAT)
-            gameInDb = db.session.scalars(
-                db.select(BaseballGame).filter_by(date=dateForGame)
-            ).one()
-            newPromos = initPromotionsForGame(game.get("promotions", []))
-            if not comparePromoLists(gameInDb.promos, newPromos):
-                replaceOldPromos(gameInDb, newPromos)
+        # `getTeamIdFromName()` lowercases the name, so any casing compares the same
+        homeTeamName = game["teams"]["home"]["team"].get("name", "")
+        strToDatetime(game["gameDate"], ISO_FORMAT) #? Compared to its DB game's date
     except KeyError:
         print("When updating Game Promotions: No game home team or date found in JSON")
-    except NoResultFound:
-        print(f"When updating Game Promotions: No game with UTC date: {game['gameDate']}")
-    except Exception as exception:
-        print(f"When updating Game Promotions: Encountered {type(exception)} encountered")
+        return False
+    except ValueError:
+        print(f"When updating Game Promotions: Invalid game date {game['gameDate']}")
+        return False
+    #? ONLY add promos if it's a home game for one of the tracked teams
+    return getTeamIdFromName(homeTeamName) in trackedTeamIds
+
+
+def gameLookupFields(game):
+    """Returns ONLY the API game's fields used to find + compare its DB game"""
+    return { key: game[key] for key in GAME_LOOKUP_KEYS if key in game }
+
+
+def queryContentDigests(games):
+    """Loads ONLY the `gameKey` + content digest of the DB games matching the API games
+    Returns: A dict of `gameKey` to that game's digest
+    """
+    gameKeys = [game["gamePk"] for game in games if "gamePk" in game]
+    return dict(db.session.execute(
+        db.select(BaseballGame.gameKey, BaseballGame.content_digest)
+        .where(BaseballGame.gameKey.in_(gameKeys))
+    ).all())
+
+
+def savedGameChanged(gameInDb, game):
+    return gameInDb.date != strToDatetime(game["gameDate"], ISO_FORMAT) \
+        or gameInDb.seriesGameNumber != game["seriesGameNumber"] \
+        or gameInDb.seriesGameCount != game["gamesInSeries"]
+
+
+def queryHomeGames(games):
+    """Loads the DB games matching the API games by `gameKey`, along with all of their
+    promos, in 1 query + 1 `WHERE IN` promo query, whatever the game count
+    """
+    gameKeys = [game["gamePk"] for game in games if "gamePk" in game]
+    return db.session.scalars(
+        db.select(BaseballGame).options(selectinload(BaseballGame.promos))
+        .where(BaseballGame.gameKey.in_(gameKeys))
+    ).all()
+
+
+class HomeGameIndex:
+    """Indexes the DB's games by `gameKey` ONLY. The API always sends a `gamePk`, AND a
+    UTC date can be shared by another team's game, so a game never receives its promos
+    """
+    def __init__(self, gamesInDb):
+        #? `gameKey` is MLB's `gamePk`, which stays the same even if a game is moved
+        self.gamesByKey = { game.gameKey: game for game in gamesInDb }
+
 
+    def match(self, game):
+        return self.gamesByKey.get(game.get("gamePk"))
@@ -1,7 +1,13 @@
 from .. import db
 from ..models import BaseballTeam
-from ..utility.database_helpers import finalizeDbUpdate
+from ..utility.job_runs import runsAsJob
 from ..utility.mlb_api import fetchTeamRecords
+from ..utility.refresh_tracking import recordsRefreshOf
+from ..utility.response_cache import processesResponses
+from ..utility.schedule_snapshot import refreshesScheduleSnapshot
+from ..utility.team_registry import TeamRegistry
+
+from sqlalchemy import Integer, column, or_, update, values
 
 #! DIVISION NAME CONSTANT
 MLB_DIVISIONS = {
@@ -15,37 +21,58 @@ MLB_DIVISIONS = {
 
 
 #! Main Standings Update Function
-def updateAllTeamRecords():
+@runsAsJob("standings", (BaseballTeam.__tablename__,))
+@recordsRefreshOf(BaseballTeam.__tablename__)
+@refreshesScheduleSnapshot
+@processesResponses
+def updateAllTeamRecords(teamRegistry = None, standings = None):
+    """Params: standings - Records already fetched, i.e. by the seeder, else they're
+    fetched here, skipping them if unchanged since the last time they were applied
+    """
     print("Updating all team records in Db")
 
-    standings = fetchTeamRecords()
+    if standings is None:
+        standings = fetchTeamRecords(skipUnchangedFor="standings")
     if len(standings) == 0:
         print("No team records found")
 
-    [updateEachDivision(division) for division in standings]
+    #? Reuse the seeder's registry if given, otherwise all 30 teams load in 1 query
+    teamRegistry = teamRegistry or TeamRegistry()
+    teamRecords = [record for division in standings
+                   for record in updateEachDivision(division, teamRegistry)]
+    return applyTeamRecords(teamRecords)
 
 
-def updateEachDivision(division):
+def updateEachDivision(division, teamRegistry = None):
+    """Returns: A list of the division's changed team records to apply"""
     divisionInfo = division.get("division", None)
     if divisionInfo is None:
         print("No division info found")
-        return
+        return []
 
     divisionID = divisionInfo.get("id", None)
     if divisionID is None:
         print("No division ID found. Not possible to update standings")
-        return
+        return []
 
     divisionName = MLB_DIVISIONS.get(divisionID, "")
     print(f"Updating the {divisionName} division" if bool(divisionName) \
           else "Unknown division being updated")
 
     teamRecords = division.get("teamRecords", [])
-    [updateTeamRecord(team) for team in teamRecords] #? Comprehension won't run if empty
+    teamRegistry = teamRegistry or TeamRegistry()
+    #? Comprehension won't run if empty
+    changedRecords = [record for team in teamRecords
+                      if (record := updateTeamRecord(team, teamRegistry)) is not None]
     print("DIVISION DONE\n\n")
+    return changedRecords
 
 
-def updateTeamRecord(team):
+def updateTeamRecord(team, teamRegistry = None):
+    """Finds the team's latest win-loss record WITHOUT writing it to the DB
+    Returns: A `(teamId, wins, losses)` tuple for `applyTeamRecords()` if the record
+    changed, otherwise None
+    """
     teamInfo = team.get("team", None)
     if teamInfo is None:
         print("No team found. Unable to update standings")
@@ -63,16 +90,51 @@ def updateTeamRecord(team):
         print("API returned JSON missing wins or losses. Must update later")
         return
 
-    #? first() returns None if no Game is found whereas one() raises an exception
-    thisTeam = db.session.scalars(
-        db.select(BaseballTeam).filter_by(fullName=teamName)
-    ).first()
+    #? Look up by MLB's team ID 1st, falling back to the name for older logo URLs
+    teamRegistry = teamRegistry or TeamRegistry()
+    thisTeam = teamRegistry.find(teamInfo.get("id"), fullName=teamName)
     if thisTeam is None:
         print(f"No team found in the DB with the name: {teamName}")
         return
     print(f"Found team = {thisTeam} with record = {thisTeam.wins}-{thisTeam.losses}")
-    print(f"Updating to a win-loss of {teamWins}-{teamLosses}\n")
+    if (thisTeam.wins, thisTeam.losses) == (teamWins, teamLosses):
+        print("Win-loss record hasn't changed, so skipping it\n")
+        return None
 
-    thisTeam.wins, thisTeam.losses = teamWins, teamLosses
-    finalizeDbUpdate()
+    print(f"Updating to a win-loss of {teamWins}-{teamLosses}\n")
+    return (thisTeam.id, teamWins, teamLosses)
+
+
+def applyTeamRecords(teamRecords):
+    """Writes every changed win-loss record in 1 UPDATE statement + 1 commit
+    Params: teamRecords - A list of `(teamId, wins, losses)` tuples
+    Returns: The number of team rows that actually changed
+    """
+    if not teamRecords:
+        print("No team records changed")
+        return 0
+
+    #? Runs `UPDATE baseball_team SET ... FROM (VALUES (...), (...)) AS team_records`
+    recordValues = values(
+        column("id", Integer), column("wins", Integer), column("losses", Integer),
+        name="team_records"
+    ).data(teamRecords)
+    teamTable = BaseballTeam.__table__ #? Core table so the session isn't synced per row
+    statement = update(teamTable).where(
+        teamTable.c.id == recordValues.c.id,
+        #? Skips rows already matching, i.e. if another process updated them 1st
+        or_(teamTable.c.wins.is_distinct_from(recordValues.c.wins),
+            teamTable.c.losses.is_distinct_from(recordValues.c.losses))
+    ).values(wins=recordValues.c.wins, losses=recordValues.c.losses)
+
+    try:
+        changedCount = db.session.execute(statement).rowcount
+        db.session.commit() #? Also expires loaded teams so they reload their new records
+    except Exception:
+        print("Failed to update team records, so rolling them all back")
+        db.session.rollback()
+        raise
+
+    print(f"Updated the win-loss records of {changedCount} teams")
+    return changedCount
 
@@ -13,6 +13,33 @@ class Config(object):
     CSRF_ENABLED = True
     SECRET_KEY = os.environ["SECRET_KEY"] # MUST set or app can't run, don't add a default
     TEAM_FULL_NAME = os.getenv("VITE_TEAM_FULL_NAME", "Los Angeles Dodgers")
+    #? Comma separated team full names, OR "all", to seed. Defaults to `TEAM_FULL_NAME`
+    TRACKED_TEAMS = os.getenv("TRACKED_TEAMS", "")
+    #? Timezone every game's readable date + time is shown in, whatever its ballpark's
+    DISPLAY_TIMEZONE = os.getenv("DISPLAY_TIMEZONE", "America/Los_Angeles")
+    #? Where pre-encoded API payloads get written. Defaults to the Flask instance folder
+    SCHEDULE_SNAPSHOT_DIR = os.getenv("SCHEDULE_SNAPSHOT_DIR", "")
+    #? Lock snapshot builds across gunicorn workers via a lock file in the snapshot dir
+    SCHEDULE_SNAPSHOT_FILE_LOCK = os.getenv("SCHEDULE_SNAPSHOT_FILE_LOCK", "True") \
+        == "True"
+    #? MLB Stats API client settings. Timeouts + backoff are in seconds
+    MLB_API_CONNECT_TIMEOUT = float(os.getenv("MLB_API_CONNECT_TIMEOUT", "3.05"))
+    MLB_API_READ_TIMEOUT = float(os.getenv("MLB_API_READ_TIMEOUT", "30"))
+    MLB_API_MAX_RETRIES = int(os.getenv("MLB_API_MAX_RETRIES", "3"))
+    MLB_API_BACKOFF_SECONDS = float(os.getenv("MLB_API_BACKOFF_SECONDS", "0.5"))
+    MLB_API_POOL_SIZE = int(os.getenv("MLB_API_POOL_SIZE", "4"))
+    #? Max number of MLB API requests sent at the same time during a full refresh
+    MLB_API_MAX_CONCURRENCY = int(os.getenv("MLB_API_MAX_CONCURRENCY", "4"))
+    #? Where MLB API responses get cached. Defaults to the Flask instance folder
+    MLB_API_CACHE_DIR = os.getenv("MLB_API_CACHE_DIR", "")
+    #? Seconds a cached response is reused before revalidating it w/ a conditional GET
+    MLB_API_SCHEDULE_MAX_AGE = int(os.getenv("MLB_API_SCHEDULE_MAX_AGE", "900"))
+    MLB_API_STANDINGS_MAX_AGE = int(os.getenv("MLB_API_STANDINGS_MAX_AGE", "300"))
+    #? "weekly" runs each scheduled job every 7 days. "adaptive" plans them from the
+    #? stored schedule, i.e. standings as games end + promos before each home game
+    SCHEDULER_MODE = os.getenv("SCHEDULER_MODE", "weekly")
+    #? Max MLB API requests the adaptive jobs send per day, so no job starts once used up
+    SCHEDULER_MAX_DAILY_REQUESTS = int(os.getenv("SCHEDULER_MAX_DAILY_REQUESTS", "12"))
 
 class ProductionConfig(Config): #TODO: Probably don't need `replace` for Railway
     SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "").replace("://", "ql://", 1)
@@ -25,5 +52,7 @@ class DevelopmentConfig(Config):
 
 class TestingConfig(Config):
     TESTING = True
+    MLB_API_SCHEDULE_MAX_AGE = 0 #? Always revalidate so each test sees its mock data
+    MLB_API_STANDINGS_MAX_AGE = 0
     SQLALCHEMY_DATABASE_URI = os.getenv("TEST_DATABASE_URL", "")
 
@@ -3,3 +3,6 @@ from .baseball_game import BaseballGame
 from .baseball_team import BaseballTeam
 from .promotion import Promo
 
+from .table_refresh import TableRefresh
+from .job_run import JobRun
+from .schedule_version import ScheduleVersion
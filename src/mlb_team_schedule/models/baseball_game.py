@@ -1,9 +1,13 @@
 from .. import db
 
+from ..utility.datetime_helpers import READABLE_FORMAT, utcToLocalDatetime
+from ..utility.team_map import getDisplayTimezone
+
+from sqlalchemy import event, inspect, select
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from datetime import datetime, timedelta
-from typing import List
+from datetime import date as Date, datetime
+from typing import List, Optional
 
 #? With particularly small projects, this can be kept in the main app file
 #? BUT when splitting models into own file, you'd end up with a circular import and crash
@@ -11,6 +15,9 @@ from typing import List
 
 class BaseballGame(db.Model):
     __tablename__ = "baseball_games" #? Without override, tablename = 'baseball_game'
+    #? `(date, id)` is the keyset paginated queries order by + compare against, AND
+    #? its leading `date` still serves the promotions updater's lookups by UTC datetime
+    __table_args__ = (db.Index("ix_baseball_games_date_id", "date", "id"),)
 
 
     # MLB API Json Parent Key = dates.games.
@@ -18,22 +25,32 @@ class BaseballGame(db.Model):
     # MLB API Json Key = 'gamePk', seemingly only consistent ID. Is 'Pk' = 'primary key'?
     gameKey: Mapped[int] = mapped_column(unique=True)
     # MLB API Json Key = 'gameDate', format: 2021-07-05T22:40:00Z
-    date: Mapped[datetime]
+    date: Mapped[datetime] # Indexed alongside `id` via `__table_args__`
+    #? Computed ONCE when saved via `localize()` from `date` in the home team's timezone
+    local_datetime: Mapped[datetime] # Wall-clock time at the ballpark, i.e. 15:40
+    #? Indexed so day + month range queries compare a stored column, never an expression
+    local_date: Mapped[Date] = mapped_column(index=True) # The ballpark's calendar date
     # MLB API Json Key = 'seriesGameNumber', e.g. Game # 2 of 3
     seriesGameNumber: Mapped[int]
     # MLB API Json Key = 'gamesInSeries', e.g. 3 games in series
     seriesGameCount: Mapped[int]
+    #? A hash of the API fields + promos this game was saved from, so the seeder and
+    #? promotions updater can skip an unchanged game by comparing 1 string
+    content_digest: Mapped[Optional[str]] = mapped_column(db.String(32))
 
 
     #? `ForeignKey` sets up 1 Team to Many Games relationship via "tablename.columnkey"
-    home_team_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_teams.id"))
+    #? Postgres DOESN'T index foreign keys itself, so index them for JOINs + team lookups
+    home_team_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_teams.id"),
+                                              index=True)
     #? If 2 tables can be reached through multiple paths/attributes,
     #? Set `foreign_keys` in `relationship()` using the specific key path
     baseballTeamMapName = "BaseballTeam"
     home_team: Mapped[baseballTeamMapName] = relationship(
         back_populates="homeGames", foreign_keys=[home_team_id]
     )
-    away_team_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_teams.id"))
+    away_team_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_teams.id"),
+                                              index=True)
     away_team: Mapped[baseballTeamMapName] = relationship(
         back_populates="awayGames", foreign_keys=[away_team_id]
     )
@@ -45,12 +62,19 @@ class BaseballGame(db.Model):
 
     @hybrid_property
     def readableDateTime(self): # Used to query/filter specific rows by date
-        return self.date - timedelta(hours=7)
+        return self.local_datetime
 
 
     @hybrid_property
-    def readableDate(self): # timedelta hours = 7 since that's PDT offset from UTC
-        return (self.date - timedelta(hours=7)).strftime("%a %B %d %Y at %I:%M %p")
+    def readableDate(self): #? Always the display timezone, NOT the ballpark's local time
+        displayDatetime = utcToLocalDatetime(self.date, getDisplayTimezone())
+        return displayDatetime.strftime(READABLE_FORMAT)
+
+
+    def localize(self, timezone):
+        """Sets the local date + time columns from the UTC `date` in the given timezone"""
+        self.local_datetime = utcToLocalDatetime(self.date, timezone)
+        self.local_date = self.local_datetime.date()
 
 
     @hybrid_property
@@ -83,3 +107,24 @@ class BaseballGame(db.Model):
             return idCheck or (dateCheck and (sameHomeTeam and sameAwayTeam))
         return False
 
+
+
+#? The seeder localizes every game itself, BUT any game saved without its local date,
+#? i.e. via `saveToDb()`, OR whose `date` OR home team changed is localized before it's
+#? written. Each is checked alone since an autoflush can write 1 change before the other
+@event.listens_for(BaseballGame, "before_insert")
+@event.listens_for(BaseballGame, "before_update")
+def localizeGameDate(mapper, connection, game):
+    gameState = inspect(game)
+    dateChanged = gameState.attrs.date.history.has_changes()
+    homeTeamChanged = gameState.attrs.home_team_id.history.has_changes()
+    localChanged = gameState.attrs.local_datetime.history.has_changes()
+    if game.local_datetime is not None \
+            and (localChanged or not (dateChanged or homeTeamChanged)):
+        return
+    from .baseball_team import BaseballTeam, logoTimezone #? Avoid circular import
+    #? The flush's connection is used since the Session can't query mid-flush
+    teamLogo = connection.scalar(
+        select(BaseballTeam.team_logo).where(BaseballTeam.id == game.home_team_id)
+    )
+    game.localize(logoTimezone(teamLogo))
@@ -1,4 +1,5 @@
 from .. import db
+from ..utility.team_map import getTeamTimezone
 
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column, relationship
@@ -48,6 +49,11 @@ class BaseballTeam(db.Model):
         return splitLogoUrl.split(".")[0] # Split on "." to get '123' from [123, svg]
 
 
+    @property
+    def timezone(self): # The home ballpark's timezone, defaulting to Pacific Time
+        return logoTimezone(self.team_logo)
+
+
     @hybrid_property
     def percentage(self):
         return self.wins / (self.wins + self.losses)
@@ -74,3 +80,12 @@ class BaseballTeam(db.Model):
             return idCheck or (sameCity and sameTeamName)
         return False
 
+
+
+def logoTimezone(teamLogo):
+    """Gets a team's home timezone via the MLB team ID in its logo URL, i.e. '119.svg'"""
+    try:
+        teamId = int(teamLogo.split("/")[4].split(".")[0])
+    except (AttributeError, IndexError, ValueError): # Logo URL isn't the expected format
+        teamId = None
+    return getTeamTimezone(teamId)
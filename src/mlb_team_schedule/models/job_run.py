@@ -0,0 +1,32 @@
+from .. import db
+
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+from typing import Optional
+
+
+class JobRun(db.Model):
+    __tablename__ = "job_runs"
+    #? Latency trends are read per job over time, i.e. the seeder's runs this season
+    __table_args__ = (
+        db.Index("ix_job_runs_job_name_started_at", "job_name", "started_at"),
+    )
+
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # The job's name, i.e. 'seed', 'promotions' OR 'standings'
+    job_name: Mapped[str] = mapped_column(db.String(64))
+    # 'running', 'succeeded', 'failed' OR 'skipped' if another job held its tables
+    status: Mapped[str] = mapped_column(db.String(16))
+    # UTC datetimes, where `finished_at` stays NULL until the job ends
+    started_at: Mapped[datetime]
+    finished_at: Mapped[Optional[datetime]]
+    duration_ms: Mapped[Optional[int]]
+    # Rows the job created, updated OR deleted, from its command's summary
+    rows_touched: Mapped[Optional[int]]
+    # Bytes downloaded from the MLB API, so 0 if every response was cached
+    bytes_fetched: Mapped[Optional[int]]
+
+
+    def __repr__(self): #? String representation on queries
+        return f"<JobRun {self.job_name} {self.status} at {self.started_at}>"
@@ -19,7 +19,8 @@ class Promo(db.Model):
 
 
     #? SQLAlchemy easily finds model foreign keys if there's 1 quick path like game-promos
-    baseball_game_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_games.id"))
+    baseball_game_id: Mapped[int] = mapped_column(db.ForeignKey("baseball_games.id"),
+                                                  index=True) # Speeds up loading promos
     #? ONLY need to save ForeignKey on Child/BelongsTo side of 1-Many or 1-1 relationship
     baseballGameMapName = "BaseballGame" #? SO a promo BELONGS TO ONLY 1 game
     game: Mapped[baseballGameMapName] = relationship(back_populates="promos")
@@ -0,0 +1,20 @@
+from .. import db
+
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+
+class ScheduleVersion(db.Model):
+    __tablename__ = "schedule_versions"
+
+
+    # Only 1 row, since just the latest published snapshot version is needed
+    id: Mapped[int] = mapped_column(primary_key=True)
+    # Bumped every time a command commits a change to the schedule's tables
+    version: Mapped[int]
+    # The UTC datetime it was bumped, sent as every snapshot payload's `Last-Modified`
+    changed_at: Mapped[datetime]
+
+
+    def __repr__(self): #? String representation on queries
+        return f"<ScheduleVersion {self.version} at {self.changed_at}>"
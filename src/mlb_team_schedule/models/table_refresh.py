@@ -0,0 +1,18 @@
+from .. import db
+
+from sqlalchemy.orm import Mapped, mapped_column
+from datetime import datetime
+
+
+class TableRefresh(db.Model):
+    __tablename__ = "table_refreshes"
+
+
+    # The synced table's name, i.e. 'baseball_teams'
+    table_name: Mapped[str] = mapped_column(db.String(64), primary_key=True)
+    # The UTC datetime a command last finished syncing the table with the MLB API
+    refreshed_at: Mapped[datetime]
+
+
+    def __repr__(self): #? String representation on queries
+        return f"<TableRefresh {self.table_name} at {self.refreshed_at}>"
@@ -1,8 +1,11 @@
 from . import scheduler
 from .commands.update_promotions import updateAllPromotions
 from .commands.update_standings import updateAllTeamRecords
+from .utility.advisory_lock import advisoryLock
 
 from datetime import date
+from threading import Event
+import signal
 #? Concrete implementation of datetime.tzinfo that uses IANA timezone names
 from zoneinfo import ZoneInfo
 
@@ -43,3 +46,39 @@ def updateAllPromotionsTask():
         updateAllPromotions()
         print("'Update Promotion List' Task Complete")
 
+
+#! Standalone Scheduler Process
+#? Web workers never start the scheduler, since with N gunicorn workers each job would
+#? run N times at once. Instead `flask scheduler run` runs them in its own process,
+#? AND holds an advisory lock so a 2nd scheduler process, i.e. a replica, just exits
+SCHEDULER_LOCK_NAME = "mlb_team_schedule.scheduler"
+
+def runScheduler(stopEvent = None):
+    """Runs the scheduled jobs until SIGTERM, Ctrl+C OR `stopEvent` is set, BUT ONLY if
+    no other process is already running them
+    Returns: True once stopped, OR False if another process holds the scheduler lock
+    """
+    with advisoryLock(SCHEDULER_LOCK_NAME) as acquired:
+        if not acquired:
+            print("Another process is already running the scheduled jobs, so exiting")
+            return False
+
+        if scheduler.app.config.get("SCHEDULER_MODE") == "adaptive":
+            from .adaptive_schedule import useAdaptiveSchedule
+            useAdaptiveSchedule(scheduler.app)
+
+        stopEvent = stopEvent or Event()
+        previousHandler = signal.signal(signal.SIGTERM, lambda *args: stopEvent.set())
+        #? Flask-APScheduler's `start()` does nothing in debug mode outside the reloader,
+        #? BUT this process is never reloaded, so start APScheduler's scheduler directly
+        scheduler.scheduler.start()
+        print("Scheduler started, waiting for its jobs to run")
+        try:
+            stopEvent.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scheduler.shutdown() #? Waits for any running job to finish first
+            signal.signal(signal.SIGTERM, previousHandler)
+    print("Scheduler stopped")
+    return True
@@ -0,0 +1,51 @@
+from .. import db
+
+from contextlib import contextmanager
+from hashlib import blake2b
+from sqlalchemy import text
+
+#! Cross-Process Locks
+#? Unlike `fileLock()`, which only guards processes on 1 machine, a Postgres advisory
+#? lock is shared by EVERY process connected to the same DB, i.e. each Railway replica.
+#? A session-level lock is also released by Postgres itself if its connection drops,
+#? so a crashed process never leaves it held
+
+
+def advisoryLockKey(name):
+    """Advisory locks are keyed by a signed 64-bit int, so hashes the name into one"""
+    digest = blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def advisoryLock(*names):
+    """Tries to take every named advisory lock on its own connection WITHOUT waiting,
+    holding them until the `with` block exits
+    Yields: True if this process got ALL of the locks, OR False if another process holds
+    any of them, in which case none of them are kept
+    """
+    #? Sorted so every process takes overlapping locks in the same order
+    keys = sorted({ advisoryLockKey(name) for name in names })
+    with db.engine.connect() as connection:
+        heldKeys = []
+        for key in keys:
+            if not connection.execute(text("SELECT pg_try_advisory_lock(:key)"),
+                                      { "key": key }).scalar():
+                break
+            heldKeys.append(key)
+        acquired = len(heldKeys) == len(keys)
+        if not acquired:
+            heldKeys = unlockAll(connection, heldKeys)
+        #? The locks outlive the transaction, so commit to not sit idle in one
+        connection.commit()
+        try:
+            yield acquired
+        finally:
+            unlockAll(connection, heldKeys)
+            connection.commit()
+
+
+def unlockAll(connection, keys):
+    for key in keys:
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), { "key": key })
+    return []
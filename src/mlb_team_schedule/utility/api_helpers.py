@@ -1,28 +1,245 @@
+from .json_stream import JSONArrayStream
+from .response_cache import markPendingProcessed, responseCache
+
 import requests
+from flask import current_app, g, has_app_context
+from requests.adapters import HTTPAdapter
+from random import uniform
+from time import sleep
+import json
+
+#! MLB Stats API Client Defaults
+#? Each can be overridden via `config.py`, i.e. by setting the matching Env var
+DEFAULT_CLIENT_CONFIG = {
+    "MLB_API_CONNECT_TIMEOUT": 3.05, #? Seconds, just over TCP's 3 second retransmit
+    "MLB_API_READ_TIMEOUT": 30.0, #? The full season's schedule can take a while
+    "MLB_API_MAX_RETRIES": 3,
+    "MLB_API_BACKOFF_SECONDS": 0.5, #? Base delay, doubled on every retry
+    "MLB_API_POOL_SIZE": 4, #? Keep-alive connections held open per host
+}
+STREAM_CHUNK_SIZE = 64 * 1024 #? Bytes read at a time when streaming a response body
+FETCHED_BYTES_KEY = "fetchedBytes" #? App context `g` key counting downloaded bytes
+SENT_REQUESTS_KEY = "sentRequests" #? App context `g` key counting MLB API requests
 
 
-def fetch(url):
+def fetch(url, maxAge = 0, skipUnchangedFor = None):
+    """Fetches the URL's JSON, reusing the on-disk response cache in an app context
+    Params: maxAge - Seconds a cached body is reused WITHOUT revalidating it
+            skipUnchangedFor - A command name, i.e. "standings", that already processed
+                               this URL's body, so if unchanged, None is returned instead
+    """
     print(f"Fetching a response from {url}")
 
-    response = requests.get(url)
+    cache = responseCache()
+    cachedResponse = cache.lookup(url) if cache is not None else None
+    if cachedResponse is not None and cachedResponse.isFresh(maxAge):
+        print(f"Using the cached response from {url}")
+        return cachedJSON(cachedResponse, skipUnchangedFor)
 
-    if response.status_code == 200:
+    conditionalHeaders = cachedResponse.validators() if cachedResponse else None
+    response = apiClient().get(url, headers=conditionalHeaders)
+
+    if response.status_code == 304 and cachedResponse is not None:
+        print(f"Response from {url} not modified", "Sending back cached JSON")
+        return cachedJSON(cache.revalidate(cachedResponse), skipUnchangedFor)
+    elif response.status_code == 200 and cache is not None:
+        print(f"Received a response from {url}", "Caching it + sending back JSON")
+        addFetchedBytes(len(response.content))
+        return cachedJSON(cache.store(url, response.content, response.headers),
+                          skipUnchangedFor)
+    elif response.status_code == 200:
         print(f"Received a response from {url}", "Sending back JSON")
+        addFetchedBytes(len(response.content))
         return response.json()
-    elif 400 <= response.status_code <= 499:
+    raiseStatusCodeException(url, response.status_code)
+
+
+def fetchJSONStream(url, arrayKey, maxAge = 0, skipUnchangedFor = None):
+    """Like `fetch()` BUT parses the JSON body as it arrives rather than all at once
+    Returns: A JSONArrayStream whose `header` holds the keys found before `arrayKey`
+    that yields each of that array's items when iterated. A new 200 response can't be
+    known to be unchanged until fully read, so only cached bodies are ever skipped
+    """
+    print(f"Streaming a response from {url}")
+
+    cache = responseCache()
+    cachedResponse = cache.lookup(url) if cache is not None else None
+    if cachedResponse is not None and cachedResponse.isFresh(maxAge):
+        print(f"Streaming the cached response from {url}")
+        return cachedJSONStream(cachedResponse, arrayKey, skipUnchangedFor)
+
+    conditionalHeaders = cachedResponse.validators() if cachedResponse else None
+    response = apiClient().get(url, headers=conditionalHeaders, stream=True)
+
+    if response.status_code == 304 and cachedResponse is not None:
+        print(f"Response from {url} not modified", "Streaming cached JSON")
+        response.close()
+        return cachedJSONStream(cache.revalidate(cachedResponse), arrayKey,
+                                skipUnchangedFor)
+    elif response.status_code == 200:
+        print(f"Receiving a response from {url}", "Streaming back JSON")
+        chunks = countFetchedBytes(response.iter_content(STREAM_CHUNK_SIZE))
+        if cache is not None: #? Tee the body into the cache as it's parsed
+            onStored = (lambda entry: markPendingProcessed(entry, skipUnchangedFor)) \
+                if skipUnchangedFor is not None else None
+            chunks = cache.storeStreamed(url, chunks, response.headers, onStored)
+        return JSONArrayStream(chunks, arrayKey)
+    response.close()
+    raiseStatusCodeException(url, response.status_code)
+
+
+#! Downloaded Byte + Sent Request Counting
+#? Lets a job record how many bytes it pulled from the MLB API. Cached + 304 bodies
+#? count as 0, and streamed bodies are counted as each chunk is actually read
+def addFetchedBytes(byteCount):
+    if has_app_context():
+        setattr(g, FETCHED_BYTES_KEY, g.get(FETCHED_BYTES_KEY, 0) + byteCount)
+
+
+def popFetchedBytes():
+    """Returns + resets the bytes downloaded in this app context"""
+    return g.pop(FETCHED_BYTES_KEY, 0) if has_app_context() else 0
+
+
+#? Lets the adaptive scheduler charge its daily cap for the requests a job really sent,
+#? counting every retry, while a fresh cached body costs none
+def addSentRequests(requestCount):
+    if has_app_context():
+        setattr(g, SENT_REQUESTS_KEY, g.get(SENT_REQUESTS_KEY, 0) + requestCount)
+
+
+def popSentRequests():
+    """Returns + resets the MLB API requests sent in this app context"""
+    return g.pop(SENT_REQUESTS_KEY, 0) if has_app_context() else 0
+
+
+def countFetchedBytes(chunks):
+    for chunk in chunks:
+        addFetchedBytes(len(chunk))
+        yield chunk
+
+
+def raiseStatusCodeException(url, statusCode):
+    if 400 <= statusCode <= 499:
         raise ClientErrorStatusCodeException(
-            f"When Fetching from {url}: Got a {response.status_code} Client Error Code"
+            f"When Fetching from {url}: Got a {statusCode} Client Error Code"
         )
-    elif 500 <= response.status_code <= 599:
+    elif 500 <= statusCode <= 599:
         raise ServerErrorStatusCodeException(
-            f"When Fetching from {url}: Got a {response.status_code} Server Error Code"
+            f"When Fetching from {url}: Got a {statusCode} Server Error Code"
         )
     else:
         raise UnexpectedHttpResponseStatusCodeException(
-            f"When Fetching from {url}: Got a {response.status_code} Status Code"
+            f"When Fetching from {url}: Got a {statusCode} Status Code"
         )
 
 
+def cachedJSON(cachedResponse, skipUnchangedFor):
+    if skipUnchangedFor is not None:
+        if cachedResponse.alreadyProcessedBy(skipUnchangedFor):
+            print(f"Response from {cachedResponse.url} is identical to the last one "
+                  f"processed by {skipUnchangedFor}, so skipping it")
+            return None
+        markPendingProcessed(cachedResponse, skipUnchangedFor)
+    return json.loads(cachedResponse.body())
+
+
+def cachedJSONStream(cachedResponse, arrayKey, skipUnchangedFor):
+    if skipUnchangedFor is not None:
+        if cachedResponse.alreadyProcessedBy(skipUnchangedFor):
+            print(f"Response from {cachedResponse.url} is identical to the last one "
+                  f"processed by {skipUnchangedFor}, so skipping it")
+            return None
+        markPendingProcessed(cachedResponse, skipUnchangedFor)
+    return JSONArrayStream(cachedResponse.iterBody(STREAM_CHUNK_SIZE), arrayKey)
+
+
+#! Reusable HTTP Client
+class ApiClient:
+    """Wraps a `requests.Session` so every fetch reuses pooled keep-alive connections
+    rather than paying for a new TLS handshake, while also applying timeouts and
+    retrying 5xx responses + connection errors with jittered exponential backoff
+    """
+    def __init__(self, connectTimeout, readTimeout, maxRetries, backoffSeconds, poolSize):
+        self.timeout = (connectTimeout, readTimeout)
+        self.maxRetries = maxRetries
+        self.backoffSeconds = backoffSeconds
+
+        self.session = requests.Session()
+        #? Retries are handled in `get()` so they can back off, so the adapter never does
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=poolSize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        #? Requests transparently decompresses any gzipped response body
+        self.session.headers.update({ "Accept": "application/json",
+                                      "Accept-Encoding": "gzip, deflate" })
+
+
+    @classmethod
+    def fromConfig(cls, config):
+        settings = { key: config.get(key, default)
+                     for key, default in DEFAULT_CLIENT_CONFIG.items() }
+        return cls(connectTimeout=float(settings["MLB_API_CONNECT_TIMEOUT"]),
+                   readTimeout=float(settings["MLB_API_READ_TIMEOUT"]),
+                   maxRetries=int(settings["MLB_API_MAX_RETRIES"]),
+                   backoffSeconds=float(settings["MLB_API_BACKOFF_SECONDS"]),
+                   poolSize=int(settings["MLB_API_POOL_SIZE"]))
+
+
+    def get(self, url, headers = None, stream = False):
+        """Returns the response, retrying if it's a 5xx OR the connection fails
+        Raises: ServerUnreachableException if the last retry still can't connect
+        """
+        for attempt in range(self.maxRetries + 1):
+            isLastAttempt = attempt == self.maxRetries
+            addSentRequests(1)
+            try:
+                response = self.session.get(url, headers=headers, stream=stream,
+                                            timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if isLastAttempt:
+                    raise ServerUnreachableException(
+                        f"When Fetching from {url}: Failed to connect due to {error}"
+                    ) from error
+                print(f"Failed to connect to {url} due to {error}")
+            else:
+                if not 500 <= response.status_code <= 599 or isLastAttempt:
+                    return response
+                print(f"Got a {response.status_code} from {url}")
+                response.close() #? Frees up the pooled connection before retrying
+
+            delay = self.backoffDelay(attempt)
+            print(f"Retrying in {delay:.2f} seconds")
+            sleep(delay)
+
+
+    def backoffDelay(self, attempt):
+        """Uses "full jitter", a random delay up to the exponential backoff, so many
+        clients retrying at once don't all hit the API again at the same moment
+        """
+        return uniform(0, self.backoffSeconds * (2 ** attempt))
+
+
+CLIENT_EXTENSION_KEY = "mlbApiClient"
+_defaultClient = None
+
+def apiClient():
+    """Returns the app's shared client, built from its config on 1st use, OR a
+    shared client using the defaults if no app context is active
+    """
+    global _defaultClient
+    if has_app_context():
+        client = current_app.extensions.get(CLIENT_EXTENSION_KEY)
+        if client is None:
+            client = ApiClient.fromConfig(current_app.config)
+            current_app.extensions[CLIENT_EXTENSION_KEY] = client
+        return client
+
+    if _defaultClient is None:
+        _defaultClient = ApiClient.fromConfig(DEFAULT_CLIENT_CONFIG)
+    return _defaultClient
+
+
 #! Status Code Exceptions
 class UnexpectedHttpResponseStatusCodeException(Exception):
     """Raise when encountering an unexpected status code that is not between 400 and 599
@@ -37,3 +254,5 @@ class ClientErrorStatusCodeException(UnexpectedHttpResponseStatusCodeException):
 class ServerErrorStatusCodeException(UnexpectedHttpResponseStatusCodeException):
     """Raise when receiving HTTP Responses that have a 500-599 status code"""
 
+class ServerUnreachableException(ServerErrorStatusCodeException):
+    """Raise when the server can't be reached at all, i.e. connection errors + timeouts"""
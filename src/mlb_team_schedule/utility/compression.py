@@ -0,0 +1,90 @@
+from flask import current_app, request, send_from_directory
+from werkzeug.utils import safe_join
+import gzip
+import mimetypes
+import os
+try: #? `brotli` is an optional speedup, i.e. `pip install .[speedups]`
+    import brotli
+except ImportError:
+    brotli = None
+
+#! Precompressed Responses
+#? The schedule JSON repeats the same team objects + thumbnail URLs, so it shrinks ~10x
+#? BUT compressing it every request would cost more CPU than encoding it. Instead, the
+#? snapshot builder + `vite build` write `.br` and `.gz` copies ONCE, and each request
+#? only picks which of those already compressed files to send. `vite build` runs ahead of
+#? time so uses the max levels, BUT a snapshot can be built while a request waits, so it
+#? uses fast levels that still get most of the size savings
+
+#? Ordered by preference, so Brotli wins when a client accepts both equally
+ENCODING_EXTENSIONS = { "br": ".br", "gzip": ".gz" }
+MIN_COMPRESS_SIZE = 1024 #? Smaller payloads already fit in 1 packet, so not worth it
+#? Brotli's top qualities are many times slower for a few % smaller output, and each
+#? snapshot compresses thousands of per-team + normalized payloads
+SNAPSHOT_GZIP_LEVEL = 6
+SNAPSHOT_BROTLI_QUALITY = 5
+
+
+def compressVariants(data, gzipLevel = SNAPSHOT_GZIP_LEVEL,
+                     brotliQuality = SNAPSHOT_BROTLI_QUALITY):
+    """Compresses bytes with every available encoding at the given levels, skipping any
+    encoding that doesn't actually shrink it
+    Returns: A dict of encoding name to compressed bytes, i.e. { "gzip": b"..." }
+    """
+    if len(data) < MIN_COMPRESS_SIZE:
+        return {}
+    #? `mtime=0` keeps the gzip header, and so the bytes, the same for the same data
+    variants = { "gzip": gzip.compress(data, compresslevel=gzipLevel, mtime=0) }
+    if brotli is not None:
+        variants["br"] = brotli.compress(data, mode=brotli.MODE_TEXT,
+                                         quality=brotliQuality)
+    return { encoding: compressed for encoding, compressed in variants.items()
+             if len(compressed) < len(data) }
+
+
+def negotiateEncoding(acceptEncodings, availableEncodings):
+    """Picks the encoding the client prefers most out of those available, using the
+    request's parsed `Accept-Encoding` header, i.e. `request.accept_encodings`
+    Returns: 'br', 'gzip' OR None if the uncompressed bytes should be sent
+    """
+    bestEncoding, bestQuality = None, 0
+    for encoding in ENCODING_EXTENSIONS:
+        if encoding not in availableEncodings:
+            continue
+        quality = acceptEncodings[encoding] #? Also matches a `*` wildcard
+        if quality > bestQuality:
+            bestEncoding, bestQuality = encoding, quality
+    return bestEncoding
+
+
+def setContentEncoding(response, encoding):
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    #? Tells caches the body depends on `Accept-Encoding`, even if sent uncompressed
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def sendPrecompressedStatic(filename):
+    """Replaces Flask's `static` view, serving a static file's precompressed sibling,
+    i.e. `assets/index.js.br`, IF `vite build` wrote one AND the client accepts it
+    """
+    staticFolder = current_app.static_folder
+    availableEncodings = [encoding for encoding, extension in ENCODING_EXTENSIONS.items()
+                          if isFileIn(staticFolder, filename + extension)]
+    encoding = negotiateEncoding(request.accept_encodings, availableEncodings)
+    if encoding is None:
+        return setContentEncoding(current_app.send_static_file(filename), None)
+
+    #? The Content-Type must stay the original file's, NOT `application/gzip`
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = send_from_directory(
+        staticFolder, filename + ENCODING_EXTENSIONS[encoding], mimetype=mimetype,
+        max_age=current_app.get_send_file_max_age(filename)
+    )
+    return setContentEncoding(response, encoding)
+
+
+def isFileIn(directory, filename): #? `safe_join` returns None for paths like `../x.py`
+    path = safe_join(directory, filename)
+    return path is not None and os.path.isfile(path)
@@ -0,0 +1,46 @@
+from .. import db
+from ..models import BaseballGame
+from .datetime_helpers import isDatetime
+
+from sqlalchemy.orm import joinedload, selectinload
+
+#! Common Database queries shared by the API routes and commands
+
+
+def selectScheduledGames(start = None, end = None):
+    """Builds a date-ordered `select()` of BaseballGames that eagerly loads both teams
+    and every promo, so serializing each game via `asDict` never lazy loads a relationship
+    Params:
+        start : date - Optional inclusive lower bound of the game's local date
+        end : date - Optional exclusive upper bound of the game's local date
+    Returns: A `Select` that always costs 2 statements, no matter how many games are found
+    """
+    #? `joinedload` adds the 2 Many-to-1 teams into the main query via LEFT OUTER JOINs
+    #? BUT `selectinload` is better for 1-to-Many promos, running 1 `WHERE IN` query
+    #? rather than JOINing in duplicate game rows for every promo that game has
+    query = db.select(BaseballGame).options(
+        joinedload(BaseballGame.home_team), joinedload(BaseballGame.away_team),
+        selectinload(BaseballGame.promos)
+    ).order_by(BaseballGame.date, BaseballGame.id)
+
+    return whereLocalDateBetween(query, start, end)
+
+
+def whereLocalDateBetween(query, start = None, end = None):
+    """Limits a BaseballGame query to games with a local date in `[start, end)`"""
+    #? Comparing the stored `local_date` column, rather than converting each row's UTC
+    #? `date`, keeps the WHERE clause sargable so Postgres range scans its index
+    if start is not None:
+        query = query.where(BaseballGame.local_date >= toDate(start))
+    if end is not None:
+        query = query.where(BaseballGame.local_date < toDate(end))
+    return query
+
+
+def toDate(dateOrDatetime): #? A datetime's time is dropped, i.e. midnight
+    return dateOrDatetime.date() if isDatetime(dateOrDatetime) else dateOrDatetime
+
+
+def queryScheduledGames(start = None, end = None):
+    """Runs `selectScheduledGames()`, returning a list of fully loaded BaseballGames"""
+    return db.session.scalars(selectScheduledGames(start, end)).all()
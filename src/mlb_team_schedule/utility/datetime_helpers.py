@@ -1,4 +1,4 @@
-from datetime import date, datetime
+from datetime import UTC, date, datetime, time
 
 #! Common Format constants
 YMD_FORMAT = "%Y-%m-%d" #? YYYY-MM-DD
@@ -25,3 +25,13 @@ def strToDatetime(date_str: str, format_str: str):
     """Accepts a date string of the given format and converts it into a datetime obj"""
     return datetime.strptime(date_str, format_str)
 
+
+
+def utcToLocalDatetime(utc_datetime: datetime, timezone):
+    """Converts a naive UTC datetime into the naive wall-clock time of the timezone,
+    i.e. `ZoneInfo("America/Los_Angeles")`, using the offset in effect on that date.
+    A plain date is treated as midnight UTC on that date
+    """
+    if not isinstance(utc_datetime, datetime):
+        utc_datetime = datetime.combine(utc_datetime, time())
+    return utc_datetime.replace(tzinfo=UTC).astimezone(timezone).replace(tzinfo=None)
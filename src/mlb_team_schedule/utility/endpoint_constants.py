@@ -6,6 +6,11 @@
 SCHEDULE_ENDPOINT = ("https://statsapi.mlb.com/api/v1/schedule?lang=en&sportId=1&hydrate=team"
                     ",game(promotions)&season={seasonYear}&startDate={startDate}&endDate={endDate}"
                     "&teamId={teamId}&gameType=R&scheduleTypes=games")
+#? The same regular season schedule BUT for every team, listing each game ONCE
+LEAGUE_SCHEDULE_ENDPOINT = ("https://statsapi.mlb.com/api/v1/schedule?lang=en&sportId=1"
+                            "&hydrate=team,game(promotions)&season={seasonYear}"
+                            "&startDate={startDate}&endDate={endDate}"
+                            "&gameType=R&scheduleTypes=games")
 #? The following URL grabs latest game (useful to grab a team's win-loss record)
 LATEST_GAME_URL = "https://statsapi.mlb.com/api/v1/schedule?lang=en&sportId=1&teamId={espnID}"
 #? Above URL grabs the most recent game up until 6-8AM PST the next day
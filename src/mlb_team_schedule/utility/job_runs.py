@@ -0,0 +1,87 @@
+from .. import db
+from ..models import JobRun
+from .advisory_lock import advisoryLock
+from .api_helpers import popFetchedBytes
+from .refresh_tracking import utcNow
+
+from flask import g, has_app_context
+from sqlalchemy import insert, update
+from functools import wraps
+from time import perf_counter
+
+#! Job Coordination + Run History
+#? A manual `flask update schedule` could otherwise run alongside a scheduled job
+#? writing the same tables. Each job takes an advisory lock per table it writes, so a
+#? 2nd job touching any of those tables is skipped rather than interleaving its
+#? writes, and every run, skipped or not, is recorded in `job_runs`
+
+JOB_DEPTH_KEY = "jobRunDepth" #? App context `g` key so nested jobs join the outer one
+TABLE_LOCK_PREFIX = "mlb_team_schedule.table."
+
+
+def runsAsJob(jobName, lockedTables):
+    """Decorates a command so it ONLY runs if no other job holds a lock on its tables,
+    recording its duration, rows touched + bytes downloaded. Nested jobs, like the
+    seeder running the standings updater, run as part of the outermost job
+    Returns: The command's result, OR None if it was skipped
+    """
+    def decorator(command):
+        @wraps(command)
+        def wrapper(*args, **kwargs):
+            if not has_app_context() or g.get(JOB_DEPTH_KEY, 0) > 0:
+                return command(*args, **kwargs)
+
+            lockNames = [TABLE_LOCK_PREFIX + tableName for tableName in lockedTables]
+            with advisoryLock(*lockNames) as acquired:
+                if not acquired:
+                    print(f"Another job is writing to {', '.join(lockedTables)}, "
+                          f"so skipping the '{jobName}' job")
+                    now = utcNow()
+                    insertJobRun(job_name=jobName, status="skipped", started_at=now,
+                                 finished_at=now, duration_ms=0)
+                    return None
+                return runAndRecord(jobName, command, args, kwargs)
+        return wrapper
+    return decorator
+
+
+def runAndRecord(jobName, command, args, kwargs):
+    #? Inserted up front so a run that hangs OR crashes the process still shows up
+    jobRunId = insertJobRun(job_name=jobName, status="running", started_at=utcNow())
+    startTime = perf_counter() #? Monotonic, so clock changes can't skew durations
+    popFetchedBytes() #? Drops any bytes fetched before this job started
+    setattr(g, JOB_DEPTH_KEY, 1)
+    status, result = "failed", None
+    try:
+        result = command(*args, **kwargs)
+        status = "succeeded"
+        return result
+    finally:
+        setattr(g, JOB_DEPTH_KEY, 0)
+        finishJobRun(jobRunId, status=status, finished_at=utcNow(),
+                     duration_ms=round((perf_counter() - startTime) * 1000),
+                     rows_touched=countRowsTouched(result),
+                     bytes_fetched=popFetchedBytes())
+
+
+def countRowsTouched(result):
+    """Commands return either a changed row count OR a summary dict of counts"""
+    if isinstance(result, dict):
+        return sum(count for count in result.values() if isinstance(count, int))
+    return result if isinstance(result, int) else 0
+
+
+#? Each write gets its own connection + transaction, so a run is still recorded if the
+#? job's session rolls back, AND the snapshot's session write tracking never sees it
+def insertJobRun(**columns):
+    with db.engine.begin() as connection:
+        return connection.execute(
+            insert(JobRun.__table__).values(**columns).returning(JobRun.__table__.c.id)
+        ).scalar_one()
+
+
+def finishJobRun(jobRunId, **columns):
+    jobRuns = JobRun.__table__
+    with db.engine.begin() as connection:
+        connection.execute(update(jobRuns).where(jobRuns.c.id == jobRunId)
+                           .values(**columns))
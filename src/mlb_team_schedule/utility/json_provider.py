@@ -0,0 +1,73 @@
+from flask.json.provider import DefaultJSONProvider
+try: #? `orjson` is an optional speedup, i.e. `pip install .[speedups]`
+    import orjson
+except ImportError:
+    orjson = None
+
+#! Pluggable JSON Encoding
+#? Flask's default provider runs the stdlib `json` encoder, which is pure Python for
+#? `sort_keys` + `default` calls, on the schedule's big nested lists of dicts. This
+#? provider swaps in `orjson`, a Rust encoder, when it's installed, falling back to the
+#? stdlib otherwise. Since `orjson` ONLY emits UTF-8 + compact OR 2-space indented
+#? JSON, any other `dumps()` options, like the stdlib's spaced default, fall back too
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+class PreEncodedJSON:
+    """Wraps JSON bytes that were already encoded, i.e. a cached snapshot payload, so
+    `jsonify()` sends them as is rather than decoding + re-encoding them
+    """
+    def __init__(self, payload: bytes):
+        self.payload = payload
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    #? Non-ASCII characters aren't escaped since `orjson` can't, so BOTH encoders match
+    ensure_ascii = False
+
+
+    def dumps(self, obj, **kwargs):
+        options = self.orjsonOptions(**kwargs)
+        if options is None:
+            return super().dumps(obj, **kwargs)
+        default = kwargs.get("default", self.default)
+        return orjson.dumps(obj, default=default, option=options).decode()
+
+
+    def dumpBytes(self, obj):
+        """Encodes compact UTF-8 JSON bytes, skipping the str round trip with `orjson`"""
+        options = self.orjsonOptions(separators=COMPACT_SEPARATORS)
+        if options is None:
+            return super().dumps(obj, separators=COMPACT_SEPARATORS).encode()
+        return orjson.dumps(obj, default=self.default, option=options)
+
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+    def response(self, *args, **kwargs):
+        if len(args) == 1 and not kwargs and isinstance(args[0], PreEncodedJSON):
+            return self._app.response_class(args[0].payload, mimetype=self.mimetype)
+        return super().response(*args, **kwargs)
+
+
+    def orjsonOptions(self, indent = None, separators = None, **kwargs):
+        """Returns the `orjson` options matching the `json.dumps()` kwargs, OR None if
+        `orjson` isn't installed or can't produce the same output
+        """
+        isCompact = indent is None and separators == COMPACT_SEPARATORS
+        isIndented = indent == 2 and separators is None
+        if orjson is None or kwargs.keys() - { "default" } \
+                or not (isCompact or isIndented):
+            return None
+        #? Datetimes go through `default` like the stdlib, so they're HTTP dates, NOT ISO
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent == 2:
+            options |= orjson.OPT_INDENT_2
+        return options
@@ -0,0 +1,143 @@
+from codecs import getincrementaldecoder
+from json import JSONDecodeError, JSONDecoder
+
+#! Incremental JSON Parsing
+#? The hydrated schedule nests both teams + every promo inside each game, so decoding
+#? the whole body at once holds the entire season in memory as nested dicts. Instead,
+#? this parses 1 top-level object's keys as the bytes arrive, yielding each item of 1
+#? array key, i.e. "dates", so only a single item is ever decoded in memory at a time
+
+WHITESPACE = " \t\n\r"
+decoder = JSONDecoder()
+
+
+class JSONStreamError(ValueError):
+    """Raise when the streamed body isn't the expected JSON object"""
+
+
+class JSONArrayStream:
+    """Parses a JSON object from byte chunks, keeping every key before `arrayKey` in
+    `header` THEN yielding its array's items one by one when iterated
+    """
+    def __init__(self, chunks, arrayKey):
+        self.chunks = iter(chunks)
+        self.arrayKey = arrayKey
+        self.header = {}
+        self.buffer = ""
+        self.position = 0
+        self.finished = False
+        self.textDecoder = getincrementaldecoder("utf-8")()
+        self.foundArray = self.readHeader()
+
+
+    def __iter__(self):
+        if not self.foundArray:
+            self.readToEnd()
+            return
+        if self.nextChar() != "]": # Not an empty array
+            self.position -= 1
+            while True:
+                yield self.decodeValue()
+                self.trimBuffer() #? Drop the parsed item's text so memory stays bounded
+                if not self.readSeparator("]"):
+                    break
+        if self.readSeparator("}"): # Any keys after the array are kept in the header
+            self.readKeys(stopAtArray=False)
+        self.readToEnd()
+
+
+    def readToEnd(self):
+        """Reads any chunks left after the object closes, so a source that finishes
+        its work once exhausted, like the response cache's writer, can do so
+        """
+        while not self.finished:
+            self.readChunk()
+        self.trimBuffer()
+        if self.buffer.strip(WHITESPACE):
+            raise JSONStreamError("Found extra data after the JSON object")
+
+
+    def readHeader(self):
+        """Reads keys until reaching the array, returning False if it's not present"""
+        if self.nextChar() != "{":
+            raise JSONStreamError("Expected the body to be a JSON object")
+        if self.nextChar() == "}":
+            return False
+        self.position -= 1
+        return self.readKeys(stopAtArray=True)
+
+
+    def readKeys(self, stopAtArray):
+        """Reads `"key": value` pairs until the object ends OR the array is reached"""
+        while True:
+            key = self.decodeValue()
+            if self.nextChar() != ":":
+                raise JSONStreamError(f"Expected ':' after the '{key}' key")
+            if key == self.arrayKey and stopAtArray:
+                if self.nextChar() != "[":
+                    raise JSONStreamError(f"Expected '{key}' to be a JSON array")
+                return True
+            self.header[key] = self.decodeValue()
+            self.trimBuffer()
+            if not self.readSeparator("}"):
+                return False
+
+
+    def readSeparator(self, closingChar):
+        """Returns True if a comma is next OR False if the object/array is closing"""
+        char = self.nextChar()
+        if char == closingChar:
+            return False
+        elif char != ",":
+            raise JSONStreamError(f"Expected ',' or '{closingChar}', found '{char}'")
+        return True
+
+
+    def decodeValue(self):
+        """Decodes the next complete JSON value, reading more chunks as needed"""
+        self.skipWhitespace()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+                #? A number at the very end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.finished:
+                    self.position = end
+                    return value
+            except JSONDecodeError:
+                if self.finished:
+                    raise
+            self.readChunk()
+
+
+    def nextChar(self):
+        """Returns the next non-whitespace character, consuming it"""
+        self.skipWhitespace()
+        char = self.buffer[self.position]
+        self.position += 1
+        return char
+
+
+    def skipWhitespace(self):
+        while True:
+            while self.position < len(self.buffer) \
+                    and self.buffer[self.position] in WHITESPACE:
+                self.position += 1
+            if self.position < len(self.buffer):
+                return
+            if self.finished:
+                raise JSONStreamError("Unexpected end of the JSON body")
+            self.readChunk()
+
+
+    def readChunk(self):
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            self.finished = True
+            self.buffer += self.textDecoder.decode(b"", final=True)
+        else:
+            self.buffer += self.textDecoder.decode(chunk)
+
+
+    def trimBuffer(self):
+        self.buffer = self.buffer[self.position:]
+        self.position = 0
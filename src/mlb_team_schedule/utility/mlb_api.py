@@ -1,33 +1,112 @@
-from .api_helpers import fetch
+from .api_helpers import (
+    addFetchedBytes, addSentRequests, fetch, fetchJSONStream, popFetchedBytes,
+    popSentRequests,
+)
 from .datetime_helpers import YMD_FORMAT, dateToday, dateToStr
-from .endpoint_constants import LEAGUE_STANDINGS_URL, SCHEDULE_ENDPOINT
+from .endpoint_constants import (
+    ALL_STAR_GAME_URL, LEAGUE_SCHEDULE_ENDPOINT, LEAGUE_STANDINGS_URL, PLAYOFFS_URL,
+    SCHEDULE_ENDPOINT, SPRING_TRAINING_URL,
+)
+from .response_cache import addPendingProcessed, popPendingProcessed
 from .team_map import getTeamID
 
+from flask import current_app as app, has_app_context
+from concurrent.futures import ThreadPoolExecutor
 
-def fetchTeamRecords():
-    standingsJSON = fetch(LEAGUE_STANDINGS_URL)
-    return standingsJSON.get("records", [])
+DEFAULT_MAX_CONCURRENCY = 4 #? Matches the API client's default connection pool size
 
+#? `skipUnchangedFor` names the command processing the response, so if its body is
+#? identical to the last one that command processed, the fetch returns nothing to do
 
-def fetchThisYearsSchedule():
+
+def fetchTeamRecords(skipUnchangedFor = None):
+    standingsJSON = fetch(LEAGUE_STANDINGS_URL, skipUnchangedFor=skipUnchangedFor,
+                          maxAge=cacheMaxAge("MLB_API_STANDINGS_MAX_AGE"))
+    return (standingsJSON or {}).get("records", [])
+
+
+#? `teamIds` is a set of teams' MLB IDs. Defaults to the `TEAM_FULL_NAME` team's ID
+def fetchThisYearsSchedule(skipUnchangedFor = None, stream = False, teamIds = None):
     (seasonStart, seasonEnd, thisYear) = scheduleDates()
-    scheduleJSON = fetch(createEndpoint(seasonStart, seasonEnd, thisYear))
+    endpoint = createScheduleEndpoint(seasonStart, seasonEnd, thisYear, teamIds)
 
     # Since start date varies, include it w/ the schedule JSON tuple in a new tuple!
-    return (*getScheduleTotals(scheduleJSON), seasonStart)
+    return (*fetchScheduleTotals(endpoint, skipUnchangedFor, stream, teamIds),
+            seasonStart)
 
 
-def fetchRemainingSchedule():
+def fetchRemainingSchedule(skipUnchangedFor = None, stream = False, teamIds = None):
     (today, seasonEnd, thisYear) = scheduleDates(startingToday=True)
-    scheduleJSON = fetch(createEndpoint(
-        startDate=today, endDate=seasonEnd, seasonYear=thisYear
-    ))
+    endpoint = createScheduleEndpoint(startDate=today, endDate=seasonEnd,
+                                      seasonYear=thisYear, teamIds=teamIds)
+
+    return (*fetchScheduleTotals(endpoint, skipUnchangedFor, stream, teamIds), today)
+
+
+def fetchScheduleTotals(endpoint, skipUnchangedFor = None, stream = False,
+                        teamIds = None):
+    """Returns a `(totalGames, gameDates)` tuple. If streamed, `gameDates` is an iterator
+    yielding each date as it's parsed from the response, keeping memory use bounded,
+    AND `totalGames` is None if the body lists it after the dates
+    """
+    (totalGames, gameDates) = fetchScheduleResponse(endpoint, skipUnchangedFor, stream)
+    if gameDates is None or not teamIds or len(teamIds) <= 1:
+        return (totalGames, gameDates)
+    #? The league-wide schedule lists every team, so only keep the tracked teams' games
+    trackedGameDates = filterTrackedGames(gameDates, teamIds)
+    return (totalGames, trackedGameDates if stream else list(trackedGameDates))
+
+
+def fetchScheduleResponse(endpoint, skipUnchangedFor, stream):
+    maxAge = cacheMaxAge("MLB_API_SCHEDULE_MAX_AGE")
+    if not stream:
+        return getScheduleTotals(fetch(endpoint, maxAge=maxAge,
+                                       skipUnchangedFor=skipUnchangedFor))
+
+    scheduleStream = fetchJSONStream(endpoint, "dates", maxAge=maxAge,
+                                     skipUnchangedFor=skipUnchangedFor)
+    if scheduleStream is None:
+        return (None, None)
+    if not scheduleStream.foundArray:
+        scheduleStream.readToEnd() #? Drains the body so the connection is released
+        return (None, None)
+    #? JSON keys are unordered, so `totalGames` may only be parsed after every date
+    totalGames = scheduleStream.header.get("totalGames", None)
+    print("Streaming each date as it arrives")
+    return (totalGames, streamGameDates(scheduleStream))
+
+
+def streamGameDates(scheduleStream):
+    yield from scheduleStream
+    print(f"Total Games = {scheduleStream.header.get('totalGames', None)}")
+
+
+def filterTrackedGames(gameDates, teamIds):
+    """Yields each date with ONLY the games played by a tracked team, skipping any date
+    left without games. Since every game is listed once, no game is ever duplicated
+    """
+    for gameDate in gameDates:
+        trackedGames = [game for game in gameDate.get("games", [])
+                        if gameTeamIds(game) & teamIds]
+        if trackedGames:
+            yield { **gameDate, "games": trackedGames }
 
-    return (*getScheduleTotals(scheduleJSON), today)
+
+def gameTeamIds(game):
+    teams = game.get("teams", {})
+    return { teams.get(teamKey, {}).get("team", {}).get("id")
+             for teamKey in ("home", "away") }
+
+
+def cacheMaxAge(configKey):
+    """Seconds a cached response for the endpoint is reused without revalidating it"""
+    return configValue(configKey, 0)
 
 
 def getScheduleTotals(scheduleJSON):
     """Gets value data from endpoint's JSON response + Logs the values"""
+    if scheduleJSON is None: # Unchanged since it was last processed
+        return (None, None)
     totalGames = scheduleJSON.get("totalGames", None)
     teamGameDates = scheduleJSON.get("dates", None)
     if totalGames is None or teamGameDates is None:
@@ -37,6 +116,92 @@ def getScheduleTotals(scheduleJSON):
     return (totalGames, teamGameDates)
 
 
+#! Other Game Types - Each returns a `(totalGames, gameDates)` tuple
+def fetchSpringTrainingSchedule():
+    thisYear = dateToday().year
+    return getScheduleTotals(fetch(
+        SPRING_TRAINING_URL.format(seasonYear=thisYear, teamId=getTeamID() or 119),
+        maxAge=cacheMaxAge("MLB_API_SCHEDULE_MAX_AGE")
+    ))
+
+
+def fetchAllStarGame():
+    return getScheduleTotals(fetch(ALL_STAR_GAME_URL.format(seasonYear=dateToday().year),
+                                   maxAge=cacheMaxAge("MLB_API_SCHEDULE_MAX_AGE")))
+
+
+def fetchPlayoffsSchedule():
+    return getScheduleTotals(fetch(PLAYOFFS_URL.format(seasonYear=dateToday().year),
+                                   maxAge=cacheMaxAge("MLB_API_SCHEDULE_MAX_AGE")))
+
+
+#! Concurrent Fetching
+#? Optional extras that `fetchSeasonData()` can include alongside the main 2 requests
+EXTRA_SEASON_FETCHERS = {
+    "springTraining": fetchSpringTrainingSchedule,
+    "allStarGame": fetchAllStarGame,
+    "playoffs": fetchPlayoffsSchedule,
+}
+
+def fetchSeasonData(updateMode = False, skipUnchanged = False, extras = (),
+                    streamSchedule = False, teamIds = None):
+    """Concurrently fetches the schedule + standings, plus any extras by name, i.e.
+    "playoffs", so a full refresh waits on 1 round trip rather than the sum of them
+    Returns: A dict with the "schedule" tuple, the "standings" records + each extra
+    """
+    scheduleFetcher = fetchRemainingSchedule if updateMode else fetchThisYearsSchedule
+    fetchers = {
+        "schedule": lambda: scheduleFetcher(
+            skipUnchangedFor="scheduleUpdater" if skipUnchanged else None,
+            stream=streamSchedule, teamIds=teamIds
+        ),
+        "standings": lambda: fetchTeamRecords(
+            skipUnchangedFor="standings" if skipUnchanged else None
+        ),
+        **{ name: EXTRA_SEASON_FETCHERS[name] for name in extras }
+    }
+    return fetchConcurrently(fetchers)
+
+
+def fetchConcurrently(fetchers, maxConcurrency = None):
+    """Runs each fetcher on a bounded thread pool, re-raising the 1st error found
+    Params: fetchers - A dict of names to funcs, i.e. { "standings": fetchTeamRecords }
+    Returns: A dict of the same names to each fetcher's result
+    """
+    if not fetchers:
+        return {}
+    maxConcurrency = maxConcurrency or configValue("MLB_API_MAX_CONCURRENCY",
+                                                   DEFAULT_MAX_CONCURRENCY)
+    flaskApp = app._get_current_object() if has_app_context() else None
+    with ThreadPoolExecutor(max_workers=min(maxConcurrency, len(fetchers)),
+                            thread_name_prefix="mlb-api") as executor:
+        futures = { name: executor.submit(runFetcher, flaskApp, fetcher)
+                    for name, fetcher in fetchers.items() }
+    #? Leaving the `with` block waits for every fetch, THEN `result()` re-raises errors
+    results = {}
+    for name, future in futures.items():
+        results[name], pendingResponses, fetchedBytes, sentRequests = future.result()
+        addPendingProcessed(pendingResponses)
+        addFetchedBytes(fetchedBytes)
+        addSentRequests(sentRequests)
+    return results
+
+
+def runFetcher(flaskApp, fetcher):
+    """Gives each thread its own app context so `fetch()` can read the config + cache,
+    handing back any responses it fetched so the calling command can mark them processed
+    AND the bytes + requests it used so the calling job can record them
+    """
+    if flaskApp is None:
+        return (fetcher(), [], 0, 0)
+    with flaskApp.app_context():
+        return (fetcher(), popPendingProcessed(), popFetchedBytes(), popSentRequests())
+
+
+def configValue(configKey, default):
+    return app.config.get(configKey, default) if has_app_context() else default
+
+
 #! Schedule Endpoint Creation Methods
 #? Return an unpackable tuple useful to create the schedule endpoint
 def scheduleDates(startingToday = False):
@@ -50,6 +215,21 @@ def scheduleDates(startingToday = False):
     return (startDate, endDate, thisYear) # Most Pythonic way to pack data is a tuple!
 
 
+def createScheduleEndpoint(startDate = None, endDate = None, seasonYear = None,
+                           teamIds = None):
+    """A single team uses its own schedule endpoint, BUT multiple teams share 1
+    league-wide request rather than 1 request per team with many duplicate games
+    """
+    if not teamIds or len(teamIds) == 1:
+        teamId = next(iter(teamIds or []), None)
+        return createEndpoint(startDate, endDate, seasonYear, teamId)
+    if startDate is None or endDate is None or seasonYear is None:
+        return None
+    return LEAGUE_SCHEDULE_ENDPOINT.format(
+        startDate=startDate, endDate=endDate, seasonYear=seasonYear
+    )
+
+
 def createEndpoint(startDate = None, endDate = None, seasonYear = None, teamId = None):
     if startDate is None or endDate is None or seasonYear is None:
         return None
@@ -0,0 +1,63 @@
+from .. import db
+from ..models import TableRefresh
+
+from flask import has_app_context
+from sqlalchemy.dialects.postgresql import insert as upsert
+from datetime import UTC, datetime
+from functools import wraps
+
+#! Table Staleness Tracking
+#? The scheduler runs in its own process, so each command records in the DB when it
+#? last finished syncing its tables with the MLB API. That way how stale the standings,
+#? schedule + promos are can be checked from any process, i.e. a web worker
+
+
+def recordsRefreshOf(*tableNames):
+    """Decorates a command so its tables are marked refreshed once it finishes without
+    raising, even if the MLB API had nothing new, since the tables are still in sync
+    """
+    def decorator(command):
+        @wraps(command)
+        def wrapper(*args, **kwargs):
+            result = command(*args, **kwargs)
+            if has_app_context():
+                markRefreshed(tableNames)
+            return result
+        return wrapper
+    return decorator
+
+
+def markRefreshed(tableNames, refreshedAt = None):
+    refreshedAt = refreshedAt or utcNow()
+    statement = upsert(TableRefresh.__table__).values([
+        { "table_name": tableName, "refreshed_at": refreshedAt }
+        for tableName in tableNames
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=["table_name"],
+        set_={ "refreshed_at": statement.excluded.refreshed_at }
+    )
+    #? Its own connection + transaction, so the session never sees this write, AND so
+    #? the snapshot isn't rebuilt just because a command checked for changes
+    with db.engine.begin() as connection:
+        connection.execute(statement)
+
+
+def queryStaleness(now = None):
+    """Returns: A dict of table name to its last refresh's UTC ISO datetime + how many
+    seconds ago that was, i.e. `{ "promos": { "refreshedAt": ..., "staleSeconds": 60 } }`
+    """
+    now = now or utcNow()
+    refreshes = db.session.scalars(
+        db.select(TableRefresh).order_by(TableRefresh.table_name)
+    )
+    return {
+        refresh.table_name: {
+            "refreshedAt": refresh.refreshed_at.isoformat() + "Z",
+            "staleSeconds": int((now - refresh.refreshed_at).total_seconds())
+        } for refresh in refreshes
+    }
+
+
+def utcNow(): #? Naive, like every UTC datetime column in the DB
+    return datetime.now(UTC).replace(tzinfo=None)
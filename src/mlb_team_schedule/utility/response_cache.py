@@ -0,0 +1,248 @@
+from flask import current_app as app, g, has_app_context
+from functools import wraps
+from hashlib import sha256
+import json
+import os
+import time
+
+#! On-Disk MLB API Response Cache
+#? The hydrated schedule is a big payload that rarely changes between runs, SO each
+#? URL's last body is kept on disk alongside its `ETag` + `Last-Modified` validators.
+#? Fresh entries skip the request entirely, stale ones are revalidated with a
+#? conditional request, and each command remembers the digest of the last body it
+#? successfully processed so it can skip re-processing a byte-identical payload
+
+PRUNE_AFTER_SECONDS = 7 * 24 * 60 * 60 #? i.e. the daily "remaining schedule" URLs
+#? App context `g` keys tracking the bodies handed to the currently running command
+PENDING_PROCESSED_KEY = "pendingProcessedResponses"
+COMMAND_DEPTH_KEY = "processedResponsesCommandDepth"
+
+
+class CachedResponse:
+    """The metadata of a single cached URL. Its body is only read when needed"""
+    def __init__(self, bodyPath, metadata):
+        self.bodyPath = bodyPath
+        self.url = metadata["url"]
+        self.etag = metadata.get("etag")
+        self.lastModified = metadata.get("lastModified")
+        self.fetchedAt = metadata["fetchedAt"]
+        self.digest = metadata["digest"]
+        self.processedDigests = metadata.get("processedDigests", {})
+
+
+    def isFresh(self, maxAge):
+        return maxAge > 0 and time.time() - self.fetchedAt < maxAge
+
+
+    def validators(self):
+        """Returns the headers that turn a GET into a conditional request"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.lastModified:
+            headers["If-Modified-Since"] = self.lastModified
+        return headers
+
+
+    def body(self):
+        with open(self.bodyPath, "rb") as file:
+            return file.read()
+
+
+    def iterBody(self, chunkSize):
+        with open(self.bodyPath, "rb") as file:
+            while chunk := file.read(chunkSize):
+                yield chunk
+
+
+    def alreadyProcessedBy(self, consumer):
+        return self.processedDigests.get(consumer) == self.digest
+
+
+    def asDict(self):
+        return { "url": self.url, "etag": self.etag, "lastModified": self.lastModified,
+                 "fetchedAt": self.fetchedAt, "digest": self.digest,
+                 "processedDigests": self.processedDigests }
+
+
+class ResponseCache:
+    """Each URL is stored as a `<hash>.json` metadata file + a `<hash>.body` file"""
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+
+    def entryPaths(self, url):
+        urlHash = sha256(url.encode()).hexdigest()
+        basePath = os.path.join(self.directory, urlHash)
+        return (f"{basePath}.json", f"{basePath}.body")
+
+
+    def lookup(self, url):
+        """Returns the URL's CachedResponse OR None if it was never cached"""
+        metadataPath, bodyPath = self.entryPaths(url)
+        try:
+            with open(metadataPath) as file:
+                metadata = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if metadata.get("url") != url or not os.path.exists(bodyPath):
+            return None
+        return CachedResponse(bodyPath, metadata)
+
+
+    def store(self, url, body, headers):
+        """Saves a 200 response's body + validators, keeping any processed digests
+        so an unchanged body is still recognized as already processed
+        """
+        bodyPath = self.entryPaths(url)[1]
+        writeAtomically(bodyPath, body)
+        return self.saveEntry(url, headers, sha256(body).hexdigest())
+
+
+    def storeStreamed(self, url, chunks, headers, onStored = None):
+        """Yields each chunk of a 200 response's body while writing it to the cache,
+        ONLY saving the entry, THEN calling `onStored(entry)`, once the whole body arrives
+        """
+        bodyPath = self.entryPaths(url)[1]
+        digest = sha256()
+        with open(f"{bodyPath}.tmp", "wb") as file:
+            for chunk in chunks:
+                file.write(chunk)
+                digest.update(chunk)
+                yield chunk
+        os.replace(f"{bodyPath}.tmp", bodyPath)
+        entry = self.saveEntry(url, headers, digest.hexdigest())
+        if onStored is not None:
+            onStored(entry)
+
+
+    def saveEntry(self, url, headers, digest):
+        previousEntry = self.lookup(url)
+        entry = CachedResponse(self.entryPaths(url)[1], {
+            "url": url, "etag": headers.get("ETag"),
+            "lastModified": headers.get("Last-Modified"),
+            "fetchedAt": time.time(), "digest": digest,
+            "processedDigests": previousEntry.processedDigests if previousEntry else {}
+        })
+        self.saveMetadata(entry)
+        self.prune()
+        return entry
+
+
+    def revalidate(self, entry):
+        """Marks an entry as fresh again after a 304 Not Modified response"""
+        entry.fetchedAt = time.time()
+        self.saveMetadata(entry)
+        return entry
+
+
+    def markProcessed(self, url, consumer, digest):
+        entry = self.lookup(url)
+        if entry is None:
+            return
+        entry.processedDigests[consumer] = digest
+        self.saveMetadata(entry)
+
+
+    def saveMetadata(self, entry):
+        metadataPath = self.entryPaths(entry.url)[0]
+        writeAtomically(metadataPath, json.dumps(entry.asDict()).encode())
+
+
+    def prune(self):
+        """Removes entries that haven't been fetched OR revalidated in a while, going by
+        their metadata's `fetchedAt` since a 304 only rewrites the metadata, so a body
+        kept valid by revalidations is never pruned + an entry's files go together
+        """
+        cutoff = time.time() - PRUNE_AFTER_SECONDS
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            basePath, extension = os.path.splitext(path)
+            try:
+                if extension == ".json":
+                    if entryFetchedAt(path) < cutoff:
+                        removeFiles(path, f"{basePath}.body")
+                elif not os.path.exists(f"{basePath}.json") \
+                        and os.path.getmtime(path) < cutoff:
+                    os.remove(path) #? i.e. a leftover `.tmp` file OR an orphaned body
+            except FileNotFoundError: # Already pruned by another process
+                continue
+
+
+def entryFetchedAt(metadataPath):
+    try:
+        with open(metadataPath) as file:
+            return json.load(file)["fetchedAt"]
+    except (json.JSONDecodeError, KeyError): # Unreadable, so only its age is known
+        return os.path.getmtime(metadataPath)
+
+
+def removeFiles(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+
+
+def writeAtomically(path, content):
+    with open(f"{path}.tmp", "wb") as file:
+        file.write(content)
+    os.replace(f"{path}.tmp", path) #? Readers never see a half-written file
+
+
+def responseCache():
+    """Returns the app's ResponseCache OR None if no app context is active"""
+    if not has_app_context():
+        return None
+    cacheDir = app.config.get("MLB_API_CACHE_DIR") \
+        or os.path.join(app.instance_path, "mlb_api_cache")
+    return ResponseCache(cacheDir)
+
+
+#! Processed Payload Tracking
+def markPendingProcessed(entry, consumer):
+    """Records a cached body handed to a command, THEN `processesResponses` saves it as
+    processed only if the command finishes without raising
+    """
+    addPendingProcessed([(entry.url, consumer, entry.digest)])
+
+
+def addPendingProcessed(pendingResponses):
+    if has_app_context() and pendingResponses:
+        g.setdefault(PENDING_PROCESSED_KEY, []).extend(pendingResponses)
+
+
+def popPendingProcessed():
+    """Returns + clears the responses handed out in this app context, i.e. so a worker
+    thread can pass them back to the command that started it
+    """
+    return g.pop(PENDING_PROCESSED_KEY, []) if has_app_context() else []
+
+
+def processesResponses(command):
+    """Decorates a command that processes fetched payloads so the bodies it received
+    are only marked as processed once it succeeds. Nested commands, like the seeder
+    running the standings updater, wait for the outermost command to finish
+    """
+    @wraps(command)
+    def wrapper(*args, **kwargs):
+        if not has_app_context():
+            return command(*args, **kwargs)
+
+        depth = g.get(COMMAND_DEPTH_KEY, 0)
+        setattr(g, COMMAND_DEPTH_KEY, depth + 1)
+        succeeded = False
+        try:
+            result = command(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            setattr(g, COMMAND_DEPTH_KEY, depth)
+            if depth == 0:
+                pendingResponses = popPendingProcessed()
+                if succeeded:
+                    cache = responseCache()
+                    [cache.markProcessed(*pending) for pending in pendingResponses]
+    return wrapper
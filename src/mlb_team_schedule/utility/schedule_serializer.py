@@ -0,0 +1,159 @@
+from .. import db
+from ..models import BaseballGame, BaseballTeam, Promo
+from .database_queries import whereLocalDateBetween
+from .datetime_helpers import READABLE_FORMAT, utcToLocalDatetime
+from .team_map import getDisplayTimezone
+
+from sqlalchemy import or_, tuple_
+from sqlalchemy.orm import aliased
+
+#! Column-Projected Schedule Serialization
+#? `asDict` needs fully hydrated ORM objects, so every game, both its teams AND each of
+#? its promos get built, identity mapped + tracked before being turned into dicts. Since
+#? the schedule's JSON is read-only, this path instead selects ONLY the columns the
+#? JSON needs as plain Rows, THEN builds the exact same dicts straight from them
+
+HomeTeam = aliased(BaseballTeam, name="home_team")
+AwayTeam = aliased(BaseballTeam, name="away_team")
+TEAM_COLUMNS = ("id", "team_logo", "team_name", "city_name", "abbreviation",
+                "wins", "losses")
+GAME_COLUMN_COUNT = 5 #? The game's own columns come 1st in each row, THEN both teams'
+
+
+def selectGameRows(start = None, end = None, after = None, limit = None, team = None):
+    """Builds a `select()` of each game's columns + both teams' columns, ordered by the
+    `(date, id)` keyset. `after` is the `(date, id)` of the last game already sent, AND
+    `team` is an optional abbreviation, i.e. 'LAD', that plays each game home OR away
+    """
+    teamColumns = [getattr(team, column) for team in (HomeTeam, AwayTeam)
+                   for column in TEAM_COLUMNS]
+    query = db.select(
+        BaseballGame.id, BaseballGame.date, BaseballGame.local_date,
+        BaseballGame.seriesGameNumber, BaseballGame.seriesGameCount, *teamColumns
+    ).join(HomeTeam, HomeTeam.id == BaseballGame.home_team_id) \
+        .join(AwayTeam, AwayTeam.id == BaseballGame.away_team_id) \
+        .order_by(BaseballGame.date, BaseballGame.id)
+    if after is not None: #? Unlike OFFSET, the Nth page costs the same as the 1st
+        query = query.where(tuple_(BaseballGame.date, BaseballGame.id) > tuple_(*after))
+    if team is not None:
+        query = query.where(or_(HomeTeam.abbreviation == team,
+                                AwayTeam.abbreviation == team))
+    query = whereLocalDateBetween(query, start, end)
+    return query if limit is None else query.limit(limit)
+
+
+def selectPromoRows(start = None, end = None, after = None, limit = None, team = None):
+    """Builds a `select()` of every promo's columns for the games in the date range"""
+    if after is None and limit is None and team is None:
+        gameIds = whereLocalDateBetween(db.select(BaseballGame.id), start, end)
+    else: #? A page's games depend on their order, limit + teams, so reuse the game query
+        gameIds = selectGameRows(start, end, after, limit, team) \
+            .with_only_columns(BaseballGame.id)
+    return db.select(
+        Promo.baseball_game_id, Promo.id, Promo.name, Promo.thumbnail_url
+    ).where(Promo.baseball_game_id.in_(gameIds.scalar_subquery())).order_by(Promo.id)
+
+
+def serializeGamesWithDates(start = None, end = None):
+    """Serializes the games in the date range in 2 statements without any ORM objects
+    Returns: A list of `(localDate, gameDict)` tuples, where each `gameDict` matches the
+    game's `asDict` exactly
+    """
+    return [(row[2], gameDict) for row, gameDict in serializeGameRows(start, end)]
+
+
+def serializeGamesPage(start = None, end = None, after = None, limit = 100, team = None):
+    """Serializes 1 page of up to `limit` games that come after the `after` keyset, ONLY
+    including `team`'s games if an abbreviation is given
+    Returns: A tuple of the page's game dicts AND the `(date, id)` keyset of its last
+    game to request the next page with, OR None if no games come after this page
+    """
+    #? 1 extra game is fetched ONLY to find out if another page follows this one
+    serializedRows = serializeGameRows(start, end, after, limit + 1, team)
+    pageRows = serializedRows[:limit]
+    nextAfter = None
+    if len(serializedRows) > limit:
+        lastRow = pageRows[-1][0]
+        nextAfter = (lastRow[1], lastRow[0])
+    return ([gameDict for _, gameDict in pageRows], nextAfter)
+
+
+def serializeGameRows(start = None, end = None, after = None, limit = None,
+                      team = None):
+    """Returns a list of `(gameRow, gameDict)` tuples for the selected games"""
+    promosByGameId = {}
+    for gameId, promoId, name, thumbnailUrl in db.session.execute(
+        selectPromoRows(start, end, after, limit, team)
+    ):
+        promosByGameId.setdefault(gameId, []).append(
+            { "id": promoId, "name": name, "thumbnailUrl": thumbnailUrl }
+        )
+
+    gameRows = db.session.execute(selectGameRows(start, end, after, limit, team)).all()
+    readableDates = formatReadableDates(row[1] for row in gameRows)
+    teamDicts = {} #? Only 30 teams, so each team's dict is built ONCE then reused
+    awayTeamStart = GAME_COLUMN_COUNT + len(TEAM_COLUMNS)
+    serializedRows = []
+    for row, readableDate in zip(gameRows, readableDates):
+        homeTeamRow = row[GAME_COLUMN_COUNT:awayTeamStart]
+        awayTeamRow = row[awayTeamStart:]
+        serializedRows.append((row, {
+            "id": row[0], "date": readableDate,
+            "promos": promosByGameId.get(row[0], []),
+            "seriesGameNumber": row[3], "seriesGameCount": row[4],
+            "homeTeam": teamDict(homeTeamRow, teamDicts),
+            "awayTeam": teamDict(awayTeamRow, teamDicts),
+        }))
+    return serializedRows
+
+
+def serializeScheduledGames(start = None, end = None):
+    """Returns the list of game dicts, the same as `asDict` on `queryScheduledGames()`"""
+    return [gameDict for _, gameDict in serializeGamesWithDates(start, end)]
+
+
+def normalizeGames(gameDicts):
+    """Reshapes `asDict` games so each team is listed ONCE in a `teams` map keyed by its
+    id, while each game references its teams by `homeTeamId` + `awayTeamId`, rather than
+    repeating the same 30 team dicts in every game of the season
+    Returns: A dict like `{ "teams": { "1": teamDict }, "games": [normalizedGameDict] }`
+    """
+    teams, games = {}, []
+    for gameDict in gameDicts:
+        homeTeam, awayTeam = gameDict["homeTeam"], gameDict["awayTeam"]
+        #? String keys since JSON objects only have string keys anyway
+        teams[str(homeTeam["id"])] = homeTeam
+        teams[str(awayTeam["id"])] = awayTeam
+        games.append({
+            "id": gameDict["id"], "date": gameDict["date"], "promos": gameDict["promos"],
+            "seriesGameNumber": gameDict["seriesGameNumber"],
+            "seriesGameCount": gameDict["seriesGameCount"],
+            "homeTeamId": homeTeam["id"], "awayTeamId": awayTeam["id"],
+        })
+    return { "teams": teams, "games": games }
+
+
+def teamDict(teamRow, teamDicts):
+    if (team := teamDicts.get(teamRow[0])) is None:
+        team = teamDicts[teamRow[0]] = {
+            "id": teamRow[0], "teamLogo": teamRow[1], "teamName": teamRow[2],
+            "cityName": teamRow[3], "abbreviation": teamRow[4],
+            "wins": teamRow[5], "losses": teamRow[6]
+        }
+    return team
+
+
+def formatReadableDates(utcDatetimes):
+    """Formats each UTC datetime like `readableDate` BUT only converts + formats each
+    unique datetime once, since many games start at the same few times on the same dates
+    """
+    displayTimezone = getDisplayTimezone()
+    formatted = {}
+    readableDates = []
+    for utcDatetime in utcDatetimes:
+        if (readableDate := formatted.get(utcDatetime)) is None:
+            displayDatetime = utcToLocalDatetime(utcDatetime, displayTimezone)
+            readableDate = displayDatetime.strftime(READABLE_FORMAT)
+            formatted[utcDatetime] = readableDate
+        readableDates.append(readableDate)
+    return readableDates
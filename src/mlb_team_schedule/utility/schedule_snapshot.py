@@ -0,0 +1,347 @@
+from .. import db
+from ..models import ScheduleVersion
+from .compression import ENCODING_EXTENSIONS, compressVariants
+from .refresh_tracking import utcNow
+from .schedule_serializer import normalizeGames, serializeGamesWithDates
+from .single_flight import SingleFlight, fileLock
+
+from flask import current_app as app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as upsert
+from sqlalchemy.orm import Session
+from calendar import month_name
+from contextlib import nullcontext
+from datetime import UTC, datetime
+from functools import wraps
+import json
+import os
+import shutil
+
+#! Precomputed Schedule Snapshots
+#? Schedule data ONLY changes when the seeder or updater commands run, SO rather than
+#? re-querying + re-serializing every request, each command that commits a write
+#? materializes every API payload to disk ONCE as pre-encoded JSON bytes under a new
+#? version number. Since the version lives in Postgres, every gunicorn worker AND any
+#? separate `flask` CLI OR scheduler process, even in another container with its own
+#? disk, agree on the latest snapshot without any TTL, each rebuilding its local copy
+#? once it's behind. Each payload is ALSO precompressed, so compressed requests cost
+#? no CPU either
+
+FULL_SCHEDULE_KEY = "fullSchedule"
+NORMALIZED_KEY_PREFIX = "normalized"
+VERSION_FILENAME = "VERSION"
+BUILD_LOCK_FILENAME = "BUILD.lock"
+SNAPSHOT_EXTENSION_KEY = "scheduleSnapshot"
+SCHEDULE_VERSION_ID = 1 #? The `schedule_versions` table's only row
+#? Session `info` keys used to track whether a command actually committed any writes
+PENDING_WRITES_KEY = "scheduleSnapshotPendingWrites"
+COMMITTED_WRITES_KEY = "scheduleSnapshotCommittedWrites"
+#? Coalesces a worker's concurrent cold builds into 1 per snapshot dir
+buildFlight = SingleFlight()
+
+
+class ScheduleSnapshot:
+    """A single published version of the schedule's pre-encoded JSON payloads.
+    Payloads are lazily read from disk on first use, then kept in memory
+    """
+    def __init__(self, directory, version, builtAt):
+        self.directory = directory
+        self.version = version
+        self.builtAt = builtAt
+        self._payloads = {}
+        self.loadFlight = SingleFlight() # So concurrent requests read each file ONCE
+
+
+    def etag(self, key, encoding = None):
+        """Returns an ETag unique to this version's payload for the given key"""
+        #? Versions restart at 1 if the DB is reset, SO including the published time
+        #? prevents any old ETag from matching the new data. Both come from the DB, so
+        #? every container sends the same ETag for the same version
+        buildId = int(self.builtAt.timestamp())
+        etag = f"schedule-v{self.version}-{buildId}-{key.replace('/', '-')}"
+        #? Strong ETags promise identical bytes, so each encoding needs its own
+        return etag if encoding is None else f"{etag}-{encoding}"
+
+
+    def payload(self, key, encoding = None):
+        """Returns the pre-encoded JSON bytes for a payload key, i.e. 'fullSchedule',
+        '2025/april' or '2025/april/3', falling back to an empty JSON list if the key
+        was never materialized (like a month or day without any games).
+        With an `encoding`, i.e. 'gzip', returns its precompressed bytes instead,
+        OR None if that key was too small to be worth compressing
+        """
+        cacheKey = (key, encoding)
+        if cacheKey not in self._payloads:
+            self.loadFlight.do(cacheKey, lambda: self.readPayload(key, encoding))
+        payload = self._payloads[cacheKey]
+        if payload is None and encoding is None:
+            return encodePayload(emptyPayload(key))
+        return payload
+
+
+    def encodings(self, key):
+        """Returns the encodings this payload key was precompressed with"""
+        return [encoding for encoding in ENCODING_EXTENSIONS
+                if self.payload(key, encoding) is not None]
+
+
+    def isVersion(self, publishedVersion):
+        return (self.version, self.builtAt) == publishedVersion
+
+
+    def readPayload(self, key, encoding = None):
+        path = payloadPath(self.directory, self.version, key, encoding)
+        try: #? Versions never change once published, so even missing files are cached
+            with open(path, "rb") as file:
+                self._payloads[(key, encoding)] = file.read()
+        except FileNotFoundError:
+            self._payloads[(key, encoding)] = None
+        return self._payloads[(key, encoding)]
+
+
+#! Payload Keys
+def monthPayloadKey(year, month):
+    return f"{year}/{month_name[month].lower()}" #? i.e. 2025/april
+
+def dayPayloadKey(year, month, day):
+    return f"{monthPayloadKey(year, month)}/{day}" #? i.e. 2025/april/3
+
+def teamPayloadKey(abbreviation, key):
+    return f"teams/{abbreviation}/{key}" #? i.e. teams/LAD/2025/april
+
+def normalizedPayloadKey(key):
+    return f"{NORMALIZED_KEY_PREFIX}/{key}" #? i.e. normalized/teams/LAD/fullSchedule
+
+def emptyPayload(key):
+    isNormalized = key.startswith(f"{NORMALIZED_KEY_PREFIX}/")
+    return normalizeGames([]) if isNormalized else []
+
+
+#! Snapshot Building
+def buildScheduleSnapshot():
+    """Publishes a new snapshot version, THEN serializes the full season, every month
+    and every day into its own JSON files, both league-wide AND per team.
+    Returns the new version number
+    """
+    snapshotDir = scheduleSnapshotDir()
+    #? Published 1st, so any version's payloads are never older than the version itself
+    publishedVersion = publishSnapshotVersion()
+    #? Held while writing so a worker's cold build + a command's rebuild never race
+    with snapshotBuildLock(snapshotDir):
+        if readSnapshotVersion(snapshotDir) != publishedVersion:
+            writeScheduleSnapshot(snapshotDir, publishedVersion)
+    return publishedVersion[0]
+
+
+def buildMissingSnapshot(snapshotDir, publishedVersion):
+    """Builds this container's copy of the published version, BUT ONLY in 1 worker. The
+    rest wait for the lock, THEN find its files so they skip building their own
+    """
+    with snapshotBuildLock(snapshotDir):
+        if readSnapshotVersion(snapshotDir) != publishedVersion:
+            writeScheduleSnapshot(snapshotDir, publishedVersion)
+
+
+def snapshotBuildLock(snapshotDir):
+    if not app.config.get("SCHEDULE_SNAPSHOT_FILE_LOCK", True):
+        return nullcontext()
+    return fileLock(os.path.join(snapshotDir, BUILD_LOCK_FILENAME))
+
+
+def writeScheduleSnapshot(snapshotDir, publishedVersion):
+    version, builtAt = publishedVersion
+    previousVersion = (readSnapshotVersion(snapshotDir) or (None, None))[0]
+    print(f"Building schedule snapshot version {version}")
+
+    payloads = { FULL_SCHEDULE_KEY: [] }
+    #? Serialized straight from selected columns, skipping ORM objects entirely
+    for gameDate, gameDict in serializeGamesWithDates():
+        #? Serialize each game ONCE then reuse in every bucket
+        payloads[FULL_SCHEDULE_KEY].append(gameDict)
+        #? `gameDate` is the local date, so bucketed by the ballpark's date, even in PST
+        monthKey = monthPayloadKey(gameDate.year, gameDate.month)
+        payloads.setdefault(monthKey, []).append(gameDict)
+        dayKey = dayPayloadKey(gameDate.year, gameDate.month, gameDate.day)
+        payloads.setdefault(dayKey, []).append(gameDict)
+        #? Both teams get the game in their own buckets for the API's `?team=` filter
+        for team in (gameDict["homeTeam"], gameDict["awayTeam"]):
+            for key in (FULL_SCHEDULE_KEY, monthKey, dayKey):
+                teamKey = teamPayloadKey(team["abbreviation"], key)
+                payloads.setdefault(teamKey, []).append(gameDict)
+    #? Every payload ALSO gets a normalized copy that lists each of its teams only ONCE
+    payloads.update({ normalizedPayloadKey(key): normalizeGames(games)
+                      for key, games in list(payloads.items()) })
+
+    #? Write into a temp dir THEN rename so readers never see a half-written version
+    versionDir = os.path.join(snapshotDir, f"v{version}")
+    tempDir = f"{versionDir}.tmp"
+    shutil.rmtree(tempDir, ignore_errors=True)
+    for key, payload in payloads.items():
+        path = os.path.join(tempDir, f"{key}.json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        encodedPayload = encodePayload(payload)
+        with open(path, "wb") as file:
+            file.write(encodedPayload)
+        for encoding, compressedPayload in compressVariants(encodedPayload).items():
+            with open(f"{path}{ENCODING_EXTENSIONS[encoding]}", "wb") as file:
+                file.write(compressedPayload)
+    shutil.rmtree(versionDir, ignore_errors=True)
+    os.replace(tempDir, versionDir)
+
+    writeSnapshotVersion(snapshotDir, version, builtAt)
+    removeOldSnapshots(snapshotDir, { version, previousVersion })
+    print(f"Schedule snapshot version {version} built with {len(payloads)} payloads")
+    return version
+
+
+def encodePayload(payload):
+    #? Mirrors `jsonify()` BUT always compact since these bytes are served as is
+    return app.json.dumpBytes(payload) + b"\n"
+
+
+def removeOldSnapshots(snapshotDir, keptVersions):
+    #? Keep the previous version around for any worker still mid-read of its files.
+    #? ANY other version goes, even a higher one left behind by a DB reset
+    for entry in os.listdir(snapshotDir):
+        if not entry.startswith("v") or not entry[1:].isdigit():
+            continue
+        if int(entry[1:]) not in keptVersions:
+            shutil.rmtree(os.path.join(snapshotDir, entry), ignore_errors=True)
+
+
+#! Snapshot Reading
+def currentScheduleSnapshot():
+    """Returns the latest published ScheduleSnapshot, building this container's copy of
+    it if it hasn't yet. Only 1 primary key lookup is needed when it hasn't changed
+    """
+    snapshotDir = scheduleSnapshotDir()
+    publishedVersion = readPublishedVersion()
+    loadedSnapshot = app.extensions.get(SNAPSHOT_EXTENSION_KEY)
+    if loadedSnapshot is not None and loadedSnapshot.isVersion(publishedVersion):
+        return loadedSnapshot
+
+    #? i.e. a fresh deploy OR a command in another container published a new version
+    if readSnapshotVersion(snapshotDir) != publishedVersion:
+        #? A burst of requests all land here, BUT only 1 of them runs the build
+        buildFlight.do(snapshotDir,
+                       lambda: buildMissingSnapshot(snapshotDir, publishedVersion))
+
+    version, builtAt = readSnapshotVersion(snapshotDir)
+    snapshot = ScheduleSnapshot(snapshotDir, version, builtAt)
+    app.extensions[SNAPSHOT_EXTENSION_KEY] = snapshot
+    return snapshot
+
+
+def scheduleSnapshotDir():
+    snapshotDir = app.config.get("SCHEDULE_SNAPSHOT_DIR") \
+        or os.path.join(app.instance_path, "schedule_snapshot")
+    os.makedirs(snapshotDir, exist_ok=True)
+    return snapshotDir
+
+
+def payloadPath(snapshotDir, version, key, encoding = None):
+    extension = ENCODING_EXTENSIONS[encoding] if encoding is not None else ""
+    return os.path.join(snapshotDir, f"v{version}", f"{key}.json{extension}")
+
+
+def readSnapshotVersion(snapshotDir):
+    """Returns the `(version, builtAt)` of the snapshot files in this container's dir,
+    OR None if none were built yet
+    """
+    try:
+        with open(os.path.join(snapshotDir, VERSION_FILENAME)) as file:
+            versionInfo = json.load(file)
+    except FileNotFoundError:
+        return None
+    return (versionInfo["version"], datetime.fromisoformat(versionInfo["builtAt"]))
+
+
+def writeSnapshotVersion(snapshotDir, version, builtAt):
+    versionPath = os.path.join(snapshotDir, VERSION_FILENAME)
+    with open(f"{versionPath}.tmp", "w") as file:
+        json.dump({ "version": version, "builtAt": builtAt.isoformat() }, file)
+    os.replace(f"{versionPath}.tmp", versionPath) #? Atomic swap, even across processes
+
+
+#! Published Version Tracking
+#? Each container, i.e. the web + scheduler services on Railway, writes snapshots to
+#? its own disk, so the latest version is kept in the DB instead, THEN every request
+#? compares it to the loaded snapshot's
+def publishSnapshotVersion():
+    """Bumps the published version in its own transaction, so every process sees it
+    Returns: The new `(version, builtAt)`
+    """
+    versionTable = ScheduleVersion.__table__
+    statement = insertFirstVersion()
+    statement = statement.on_conflict_do_update(
+        index_elements=["id"],
+        set_={ "version": versionTable.c.version + 1,
+               "changed_at": statement.excluded.changed_at }
+    ).returning(versionTable.c.version, versionTable.c.changed_at)
+    with db.engine.begin() as connection:
+        return asPublishedVersion(connection.execute(statement).one())
+
+
+def readPublishedVersion():
+    """Returns the latest published `(version, builtAt)`, publishing version 1 if none
+    was yet, i.e. a fresh DB
+    """
+    query = db.select(ScheduleVersion.version, ScheduleVersion.changed_at) \
+        .where(ScheduleVersion.id == SCHEDULE_VERSION_ID)
+    if (row := db.session.execute(query).one_or_none()) is not None:
+        return asPublishedVersion(row)
+
+    #? Another worker may win the race, so keep its version rather than bumping it
+    statement = insertFirstVersion().on_conflict_do_nothing(index_elements=["id"])
+    with db.engine.begin() as connection:
+        connection.execute(statement)
+    return asPublishedVersion(db.session.execute(query).one())
+
+
+def insertFirstVersion():
+    #? Whole seconds, like the `If-Modified-Since` headers it's compared to
+    return upsert(ScheduleVersion.__table__).values(
+        id=SCHEDULE_VERSION_ID, version=1, changed_at=utcNow().replace(microsecond=0)
+    )
+
+
+def asPublishedVersion(row):
+    version, changedAt = row
+    return (version, changedAt.replace(tzinfo=UTC)) #? Aware, like `Last-Modified` needs
+
+
+#! Write Tracking + Invalidation
+#? Listening on the base `Session` class covers Flask-SQLAlchemy's scoped session
+@event.listens_for(Session, "after_flush")
+def markFlushedWrites(session, flush_context):
+    session.info[PENDING_WRITES_KEY] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def markBulkWrites(orm_execute_state): #? Bulk `insert()`, `update()` & `delete()` calls
+    if orm_execute_state.is_insert or orm_execute_state.is_update \
+            or orm_execute_state.is_delete:
+        orm_execute_state.session.info[PENDING_WRITES_KEY] = True
+
+@event.listens_for(Session, "after_commit")
+def markCommittedWrites(session):
+    if session.info.pop(PENDING_WRITES_KEY, False):
+        session.info[COMMITTED_WRITES_KEY] = True
+
+@event.listens_for(Session, "after_rollback")
+def clearPendingWrites(session):
+    session.info.pop(PENDING_WRITES_KEY, None)
+
+
+def refreshesScheduleSnapshot(command):
+    """Decorates a write command so a new snapshot is built once it finishes, but ONLY
+    if it actually committed a change. Nested commands, like the seeder running the
+    standings updater, consume the flag so the outermost command doesn't rebuild twice
+    """
+    @wraps(command)
+    def wrapper(*args, **kwargs):
+        try:
+            return command(*args, **kwargs)
+        finally:
+            if has_app_context() and db.session.info.pop(COMMITTED_WRITES_KEY, False):
+                buildScheduleSnapshot()
+    return wrapper
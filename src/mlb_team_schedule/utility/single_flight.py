@@ -0,0 +1,76 @@
+from contextlib import contextmanager
+from threading import Event, Lock
+try: #? `fcntl` is Unix only, so elsewhere just the in-process SingleFlight coalesces
+    import fcntl
+except ImportError:
+    fcntl = None
+
+#! Request Coalescing
+#? Under gunicorn, a burst of identical requests right after a deploy would otherwise
+#? each run the same expensive query + serialization. Within 1 worker, SingleFlight
+#? lets the 1st caller run it while the rest wait for its result. Across workers,
+#? `fileLock()` makes the others wait until the 1st finishes writing to disk
+
+
+class InFlightCall:
+    """The pending result of 1 SingleFlight call, shared by every caller waiting on it"""
+    def __init__(self):
+        self.finished = Event()
+        self.result = None
+        self.error = None
+
+
+    def wait(self):
+        self.finished.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Coalesces concurrent calls sharing a key, so only 1 runs while the others wait
+    for, then return, its result. Once it finishes, the next call runs it again
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.calls = {}
+
+
+    def do(self, key, func):
+        """Runs `func()`, OR waits for the call already running for the same `key`
+        Returns: The result of `func()`, raising its exception for EVERY waiting caller
+        """
+        with self.lock:
+            call = self.calls.get(key)
+            isLeader = call is None
+            if isLeader:
+                call = self.calls[key] = InFlightCall()
+        if not isLeader:
+            return call.wait()
+
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.finished.set()
+        return call.result
+
+
+@contextmanager
+def fileLock(path):
+    """Holds an exclusive `flock()` on the file at `path`, shared by every process on
+    this machine, blocking until any other holder releases it
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as lockFile:
+        fcntl.flock(lockFile, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lockFile, fcntl.LOCK_UN)
@@ -1,4 +1,5 @@
-from flask import current_app as app
+from flask import current_app as app, has_app_context
+from zoneinfo import ZoneInfo
 
 # A slightly more dynamic approach would be using the team's full name to query the DB
 # for a matching BaseballTeam obj, then returning the found Team's ID
@@ -37,6 +38,22 @@ TEAM_TO_ID_MAP = {
     "milwaukee brewers": 158,
 }
 
+#? Each team's home ballpark timezone by team ID, so game times are converted with the
+#? correct standard OR daylight savings offset for that date, never a fixed offset
+DEFAULT_TIMEZONE = "America/Los_Angeles"
+TEAM_TIMEZONE_MAP = {
+    108: "America/Los_Angeles", 109: "America/Phoenix", 110: "America/New_York",
+    111: "America/New_York", 112: "America/Chicago", 113: "America/New_York",
+    114: "America/New_York", 115: "America/Denver", 116: "America/Detroit",
+    117: "America/Chicago", 118: "America/Chicago", 119: "America/Los_Angeles",
+    120: "America/New_York", 121: "America/New_York", 133: "America/Los_Angeles",
+    134: "America/New_York", 135: "America/Los_Angeles", 136: "America/Los_Angeles",
+    137: "America/Los_Angeles", 138: "America/Chicago", 139: "America/New_York",
+    140: "America/Chicago", 141: "America/Toronto", 142: "America/Chicago",
+    143: "America/New_York", 144: "America/New_York", 145: "America/Chicago",
+    146: "America/New_York", 147: "America/New_York", 158: "America/Chicago",
+}
+
 
 # Using get() ensures None is returned if improper team set
 #TODO: BUT maybe better to let KeyError immediately be raised in case user misspells team?
@@ -51,3 +68,32 @@ def getTeamIdFromName(name: str):
 def getTeamID():
     return getTeamIdFromName(app.config.get("TEAM_FULL_NAME"))
 
+
+
+# `TRACKED_TEAMS` lists every team whose schedule gets seeded, i.e. "New York Mets,
+# New York Yankees", OR "all" for every team, falling back to just `TEAM_FULL_NAME`
+def getTrackedTeamIDs():
+    trackedTeams = app.config.get("TRACKED_TEAMS", "").strip()
+    if trackedTeams.lower() == "all":
+        return frozenset(TEAM_TO_ID_MAP.values())
+
+    teamIDs = set()
+    for teamName in filter(None, (name.strip() for name in trackedTeams.split(","))):
+        if (teamID := getTeamIdFromName(teamName)) is None:
+            print(f"Unknown team in TRACKED_TEAMS: {teamName}, so skipping it")
+        else:
+            teamIDs.add(teamID)
+    #? Like `createEndpoint()`, default to the LA Dodgers if the team name is misspelled
+    return frozenset(teamIDs or { getTeamID() or 119 })
+
+
+# Unknown teams, i.e. from a misspelled name OR an unexpected logo URL, use Pacific Time
+def getTeamTimezone(teamID):
+    return ZoneInfo(TEAM_TIMEZONE_MAP.get(teamID, DEFAULT_TIMEZONE))
+
+
+# Game times are displayed in 1 timezone, Pacific Time unless `DISPLAY_TIMEZONE` is set,
+# since the client prints them as-is without any timezone label
+def getDisplayTimezone():
+    displayTimezone = app.config.get("DISPLAY_TIMEZONE") if has_app_context() else None
+    return ZoneInfo(displayTimezone or DEFAULT_TIMEZONE)
@@ -0,0 +1,51 @@
+from .. import db
+from ..models import BaseballTeam
+
+#! Per-Run Team Identity Cache
+#? With only 30 teams, it's far cheaper to load every team in 1 query, THEN look each
+#? up in memory than to run a `SELECT` per game day or per standings record, especially
+#? since the `fullName` hybrid concatenates 2 columns, which no index can help with
+
+
+class TeamRegistry:
+    """In-memory lookup of BaseballTeams by MLB team ID, club name, and full name.
+    Teams are lazily loaded on the 1st lookup, so creating a registry is free
+    """
+    def __init__(self):
+        self.teamsByMlbId = {}
+        self.teamsByClubName = {}
+        self.teamsByFullName = {}
+        self.loaded = False
+
+
+    def load(self):
+        [self.add(team) for team in db.session.scalars(db.select(BaseballTeam))]
+        self.loaded = True
+
+
+    def add(self, team):
+        """Registers a team, i.e. one just created, so later lookups can find it"""
+        if (mlbId := mlbTeamId(team)) is not None:
+            self.teamsByMlbId[mlbId] = team
+        self.teamsByClubName[team.team_name.lower()] = team
+        self.teamsByFullName[team.fullName.lower()] = team
+
+
+    def find(self, mlbId = None, clubName = None, fullName = None):
+        """Returns the 1st team matching the MLB team ID, club name OR full name"""
+        if not self.loaded:
+            self.load()
+        team = self.teamsByMlbId.get(mlbId)
+        if team is None and clubName:
+            team = self.teamsByClubName.get(clubName.lower())
+        if team is None and fullName:
+            team = self.teamsByFullName.get(fullName.lower())
+        return team
+
+
+def mlbTeamId(team):
+    """Gets the MLB team ID from the team's logo URL, i.e. '.../team-logos/119.svg'"""
+    try:
+        return int(team.espnID)
+    except (IndexError, ValueError): # Logo URL isn't in the expected format
+        return None
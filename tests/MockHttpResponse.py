@@ -1,11 +1,24 @@
 """Useful for mocking out the `requests` library's get() and json() funcs"""
+import json
 
 
 class MockHttpResponse:
-    def __init__(self, status_code, jsonResponse=None):
+    def __init__(self, status_code, jsonResponse=None, headers=None):
         self.status_code = status_code
         #? Name MUST be "jsonResponse" or Python confuses the method & prop
         self.jsonResponse = jsonResponse or {}
+        self.headers = headers or {}
+
+    @property #? The raw body bytes that get saved into the response cache
+    def content(self):
+        return json.dumps(self.jsonResponse).encode()
+
+    def iter_content(self, chunk_size=1): #? Mimics streaming the body in chunks
+        body = self.content
+        return (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+
+    def close(self):
+        pass
 
     #? Passing `self` in json() def makes it an instance method, similar to other
     #? languages that implicitly get a reference to `self`/`this`
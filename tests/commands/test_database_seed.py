@@ -0,0 +1,152 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.commands.database_seed import seedDB
+from mlb_team_schedule.models import BaseballGame, BaseballTeam
+
+import pytest
+import copy
+
+
+#! Fixtures
+@pytest.fixture(autouse=True)
+def mockStandings(monkeypatch):
+    #? The seeder fetches standings alongside the schedule, so skip fetching them
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchTeamRecords",
+                        lambda **kwargs: [])
+
+@pytest.fixture
+def mockSchedule(monkeypatch, scheduleJSON):
+    def mock_schedule(**kwargs):
+        return (len(scheduleJSON), copy.deepcopy(scheduleJSON), "2021-03-01")
+    monkeypatch.setattr(
+        "mlb_team_schedule.utility.mlb_api.fetchThisYearsSchedule", mock_schedule
+    )
+
+@pytest.fixture
+def scheduleJSON():
+    return [
+        createGameDateJSON(1, "2021-05-10T02:10:00Z", 1, [{ "name": "Hat" }]),
+        createGameDateJSON(2, "2021-05-11T02:10:00Z", 2, []),
+        createGameDateJSON(3, "2021-05-12T02:10:00Z", 3, [{ "name": "Bobblehead" }]),
+    ]
+
+
+#! Helpers
+def createTeamJSON(teamId, clubName, franchiseName, abbreviation):
+    return {
+        "team": { "id": teamId, "clubName": clubName, "franchiseName": franchiseName,
+                  "abbreviation": abbreviation },
+        "leagueRecord": { "wins": 1, "losses": 1 }
+    }
+
+def createGameDateJSON(gamePk, gameDate, seriesGameNumber, promotions,
+                       homeTeam = None, awayTeam = None):
+    return { "date": gameDate[:10], "games": [{
+        "gamePk": gamePk, "gameDate": gameDate,
+        "seriesGameNumber": seriesGameNumber, "gamesInSeries": 3,
+        "teams": {
+            "home": homeTeam or createTeamJSON(119, "Dodgers", "Los Angeles", "LAD"),
+            "away": awayTeam or createTeamJSON(147, "Yankees", "New York", "NYY")
+        },
+        "promotions": promotions
+    }]}
+
+def gamesByKey():
+    games = db.session.scalars(db.select(BaseballGame)).all()
+    return { game.gameKey: game for game in games }
+
+
+#! Tests
+def test_seedDB(app, mockSchedule, scheduleJSON):
+    with app.app_context():
+        #* WHEN the DB is empty
+        summary = seedDB()
+        #* THEN every game, team and promo is created
+        assert summary["created"] == 3
+        assert summary["promosCreated"] == 2
+        assert len(db.session.scalars(db.select(BaseballTeam)).all()) == 2
+        games = gamesByKey()
+        assert [promo.name for promo in games[1].promos] == ["Hat"]
+        assert all(game.content_digest is not None for game in games.values())
+
+        #* WHEN the schedule hasn't changed THEN each matching digest skips its game
+        summary = seedDB()
+        assert set(summary.values()) == { 0 }
+
+        #* WHEN a game is rescheduled, another game is cancelled, and promos change
+        rescheduledGame = scheduleJSON[1]["games"][0]
+        rescheduledGame["gameDate"] = "2021-05-13T02:10:00Z"
+        scheduleJSON[2]["games"][0]["promotions"] = [{ "name": "Jersey" }]
+        scheduleJSON.pop(0)
+        summary = seedDB()
+        #* THEN the rescheduled game is updated in place by its gameKey
+        assert summary["updated"] == 1
+        assert summary["deleted"] == 1
+        games = gamesByKey()
+        assert 1 not in games
+        assert games[2].readableDate == "Wed May 12 2021 at 07:10 PM"
+        assert [promo.name for promo in games[3].promos] == ["Jersey"]
+        #* AND the changed games get new digests matching their latest JSON
+        summary = seedDB()
+        assert set(summary.values()) == { 0 }
+
+
+def test_seedDBSuspendedGame(app, mockSchedule, scheduleJSON):
+    #* WHEN a suspended game is listed again on the day it's resumed
+    resumedGame = copy.deepcopy(scheduleJSON[0]["games"][0])
+    resumedGame["resumedFrom"] = resumedGame["gameDate"]
+    resumedGame["gameDate"] = "2021-05-11T00:10:00Z"
+    scheduleJSON[1]["games"].insert(0, resumedGame)
+    with app.app_context():
+        summary = seedDB()
+        #* THEN only its original listing is saved
+        assert summary["created"] == 3
+        assert gamesByKey()[1].readableDate == "Sun May 09 2021 at 07:10 PM"
+
+
+def test_seedDBManyTeams(app, mockSchedule, scheduleJSON):
+    #* WHEN many teams are tracked AND a date lists games between different teams
+    mets = createTeamJSON(121, "Mets", "New York", "NYM")
+    yankees = createTeamJSON(147, "Yankees", "New York", "NYY")
+    metsGameDate = createGameDateJSON(4, "2021-05-10T23:10:00Z", 1, [{ "name": "Cap" }],
+                                      homeTeam=mets, awayTeam=yankees)
+    scheduleJSON[0]["games"].append(metsGameDate["games"][0])
+    with app.app_context():
+        summary = seedDB(teamIds={ 119, 147 })
+        #* THEN each game is saved with its own home + away teams
+        assert summary["created"] == 4
+        assert len(db.session.scalars(db.select(BaseballTeam)).all()) == 3
+        metsGame = gamesByKey()[4]
+        assert metsGame.home_team.abbreviation == "NYM"
+        assert metsGame.away_team.abbreviation == "NYY"
+        #* BUT promos are ONLY saved for the tracked teams' home games
+        assert metsGame.promos == []
+        assert summary["promosCreated"] == 2
+
+
+def test_seedDBTeamsSeparately(app, monkeypatch, scheduleJSON):
+    mets = createTeamJSON(121, "Mets", "New York", "NYM")
+    dodgers = createTeamJSON(119, "Dodgers", "Los Angeles", "LAD")
+    metsSchedule = [createGameDateJSON(4, "2021-05-13T23:10:00Z", 1, [],
+                                       homeTeam=mets, awayTeam=dodgers),
+                    createGameDateJSON(5, "2021-05-14T23:10:00Z", 2, [],
+                                       homeTeam=mets)]
+    #? Like the league-wide schedule filtered down to the tracked teams' games
+    def mock_schedule(teamIds = None, **kwargs):
+        gameDates = [gameDate for gameDate in scheduleJSON + metsSchedule
+                     if gameDate["games"][0]["teams"]["home"]["team"]["id"] in teamIds
+                     or gameDate["games"][0]["teams"]["away"]["team"]["id"] in teamIds]
+        return (len(gameDates), copy.deepcopy(gameDates), "2021-03-01")
+    monkeypatch.setattr(
+        "mlb_team_schedule.utility.mlb_api.fetchThisYearsSchedule", mock_schedule
+    )
+    with app.app_context():
+        #* WHEN 2 teams are seeded in separate runs, i.e. via `--team`
+        seedDB(teamIds={ 119 })
+        summary = seedDB(teamIds={ 121 })
+        #* THEN the 2nd run never deletes the 1st team's games it didn't list
+        assert summary["deleted"] == 0
+        assert sorted(gamesByKey()) == [1, 2, 3, 4, 5]
+        #* AND re-seeding the 1st team keeps the 2nd team's games too
+        summary = seedDB(teamIds={ 119 })
+        assert summary["deleted"] == 0
+        assert sorted(gamesByKey()) == [1, 2, 3, 4, 5]
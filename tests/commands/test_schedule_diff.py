@@ -0,0 +1,150 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.commands.schedule_diff import (
+    GameIndex, ScheduleDiff, gameContentDigest,
+)
+from mlb_team_schedule.models import BaseballGame, BaseballTeam, Promo
+from mlb_team_schedule.utility.database_helpers import saveToDb
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+
+#! Fixtures
+@pytest.fixture
+def gameDbSetup(app):
+    dodgers = BaseballTeam(team_name="Dodgers", city_name="Los Angeles", team_logo="A",
+                           abbreviation="LAD", wins=2, losses=1)
+    yankees = BaseballTeam(team_name="Yankees", city_name="New York", team_logo="B",
+                           abbreviation="NYY", wins=1, losses=2)
+    with app.app_context():
+        saveToDb(dodgers)
+        saveToDb(yankees)
+        game = createGame(1, datetime(2021, 5, 10, 2, 10))
+        game.promos = [Promo(name="Hat", thumbnail_url="C", offer_type="")]
+        saveToDb(game)
+
+
+#! Helpers
+def createGame(gameKey, date, seriesGameNumber = 1):
+    game = BaseballGame(gameKey=gameKey, date=date, seriesGameNumber=seriesGameNumber,
+                        seriesGameCount=3, home_team_id=1, away_team_id=2)
+    game.localize(ZoneInfo("America/Los_Angeles")) #? Like the seeder does for API games
+    return game
+
+def createPromo(name):
+    return Promo(name=name, thumbnail_url="D", offer_type="Giveaway")
+
+
+#! Tests
+def test_gameContentDigest():
+    game = { "gameDate": "2021-05-10T02:10:00Z", "seriesGameNumber": 1,
+             "gamesInSeries": 3, "teams": { "home": { "team": { "id": 119 } },
+                                            "away": { "team": { "id": 147 } } } }
+    digest = gameContentDigest(game, [createPromo("Hat"), createPromo("Cap")])
+    assert len(digest) == 32
+    #* WHEN the same promos are listed in a different order THEN the digest is the same
+    assert gameContentDigest(game, [createPromo("Cap"), createPromo("Hat")]) == digest
+
+    #* WHEN a promo OR the game's date changes THEN so does the digest
+    assert gameContentDigest(game, [createPromo("Hat")]) != digest
+    movedGame = { **game, "gameDate": "2021-05-11T02:10:00Z" }
+    assert gameContentDigest(movedGame, [createPromo("Cap"), createPromo("Hat")]) \
+        != digest
+
+    #* WHEN the JSON is missing a hashed field THEN there's no digest to compare
+    assert gameContentDigest({ "gameDate": "2021-05-10T02:10:00Z" }, []) is None
+
+
+def test_GameIndex():
+    movedGame = createGame(1, datetime(2021, 5, 10, 2, 10))
+    legacyGame = createGame(-1, datetime(2021, 5, 11, 2, 10)) #* Saved w/out a gamePk
+    removedGame = createGame(3, datetime(2021, 5, 12, 2, 10))
+    gameIndex = GameIndex([movedGame, legacyGame, removedGame])
+
+    #* WHEN an API game shares a DB game's gameKey, even if its date changed
+    apiGame = createGame(1, datetime(2021, 5, 20, 2, 10))
+    #* THEN the DB game is matched by its gameKey
+    assert gameIndex.match(apiGame) is movedGame
+    #* AND can't be matched a 2nd time
+    assert gameIndex.match(apiGame) is None
+
+    #* WHEN an API game has a new gameKey BUT the same date + teams as a DB game
+    #* THEN the DB game is matched as a fallback
+    assert gameIndex.match(createGame(2, datetime(2021, 5, 11, 3, 10))) is legacyGame
+
+    #* WHEN an API game matches nothing THEN None is returned
+    assert gameIndex.match(createGame(4, datetime(2021, 6, 1, 2, 10))) is None
+    #* AND any DB games never matched are left over to delete
+    assert gameIndex.unmatchedGames() == [removedGame]
+
+    #* WHEN a gamePk is listed twice, like a suspended game THEN the copy is caught
+    assert not gameIndex.alreadyReconciled(5)
+    assert gameIndex.alreadyReconciled(5)
+
+
+def test_apply(app, gameDbSetup):
+    with app.app_context():
+        #* WHEN the diff is empty THEN nothing is written
+        summary = ScheduleDiff().apply()
+        assert summary["created"] == summary["updated"] == summary["deleted"] == 0
+
+        #* WHEN new games are upserted alongside an existing game's gameKey
+        scheduleDiff = ScheduleDiff()
+        scheduleDiff.upsertGame(createGame(1, datetime(2021, 5, 10, 3, 10)),
+                                [createPromo("Bobblehead")])
+        scheduleDiff.upsertGame(createGame(2, datetime(2021, 5, 11, 2, 10), 2),
+                                [createPromo("Jersey"), createPromo("Cap")])
+        statements = []
+        def countStatement(*args, **kwargs):
+            statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", countStatement)
+        summary = scheduleDiff.apply()
+        event.remove(db.engine, "before_cursor_execute", countStatement)
+
+        #* THEN the existing game is updated in place, and the new game is created
+        assert summary["created"] == 1
+        assert summary["updated"] == 1
+        assert summary["promosDeleted"] == 1
+        assert summary["promosCreated"] == 3
+        #* AND it's done via a few batched statements, NOT 1 per game or promo
+        assert len(statements) <= 3
+        games = db.session.scalars(
+            db.select(BaseballGame).order_by(BaseballGame.gameKey)
+        ).all()
+        assert [game.gameKey for game in games] == [1, 2]
+        assert games[0].id == 1 #* Game 1 kept its ID, while the serial the new game
+        #* gets isn't checked since Postgres uses up 1 per conflicting row in the upsert
+        assert games[0].date == datetime(2021, 5, 10, 3, 10)
+        assert [promo.name for promo in games[0].promos] == ["Bobblehead"]
+        assert len(games[1].promos) == 2
+
+        #* WHEN a game is deleted
+        scheduleDiff = ScheduleDiff()
+        scheduleDiff.deleteGame(games[1])
+        summary = scheduleDiff.apply()
+        #* THEN it and its promos are removed
+        assert summary["deleted"] == 1
+        assert summary["promosDeleted"] == 2
+        assert len(db.session.scalars(db.select(BaseballGame)).all()) == 1
+
+
+def test_applyRollsBack(app, gameDbSetup):
+    with app.app_context():
+        scheduleDiff = ScheduleDiff()
+        scheduleDiff.upsertGame(createGame(2, datetime(2021, 5, 11, 2, 10)), [])
+        badGame = createGame(3, datetime(2021, 5, 12, 2, 10))
+        badGame.home_team_id = 123 #* No team with this ID exists, so the FK fails
+        scheduleDiff.upsertGame(badGame, [])
+        game = db.session.get(BaseballGame, 1)
+        scheduleDiff.replacePromos(game, [createPromo("Bobblehead")])
+
+        #* WHEN any statement fails
+        with pytest.raises(IntegrityError):
+            scheduleDiff.apply()
+        #* THEN none of the diff's changes are saved
+        assert len(db.session.scalars(db.select(BaseballGame)).all()) == 1
+        promos = db.session.scalars(db.select(Promo)).all()
+        assert [promo.name for promo in promos] == ["Hat"]
@@ -4,6 +4,7 @@ from mlb_team_schedule import db
 from mlb_team_schedule.commands.update_promotions import (
     updateAllPromotions,
     updateEachGamesPromotions,
+    updateHomeGamesPromotions,
 )
 from mlb_team_schedule.models import BaseballGame, BaseballTeam
 from mlb_team_schedule.utility.api_helpers import ClientErrorStatusCodeException
@@ -12,6 +13,7 @@ from mlb_team_schedule.utility.datetime_helpers import ISO_FORMAT, strToDatetime
 
 import pytest
 import requests
+from sqlalchemy import event
 #? Std-Lib Lists/Dicts/Sets create shallow copies via their constructors
 import copy #? So this deep copies them to avoid propagating changes by ref to new copies
 
@@ -51,7 +53,7 @@ def gameDatesJSON(gameJSON): #? MUST set 'totalGames' or fetchSchedule fails in
 def gameJSON(promoJSON):
     return {
         "teams": { "home": { "team": { "name": "Los Angeles Dodgers" } } },
-        "gameDate": "2021-05-10T02:10:35Z", "promotions": [promoJSON]
+        "gamePk": 1, "gameDate": "2021-05-10T02:10:35Z", "promotions": [promoJSON]
     }
 @pytest.fixture
 def promoJSON():
@@ -67,7 +69,7 @@ def test_updateAllPromotions(app, monkeypatch, gameDatesJSON):
     mockResponse = MockHttpResponse(404)
     def mock_JSON(*args, **kwargs):
         return mockResponse
-    monkeypatch.setattr(requests, "get", mock_JSON)
+    monkeypatch.setattr(requests.Session, "get", mock_JSON)
     with app.app_context(): #* THEN no changes to the promotions in the DB
         with pytest.raises(ClientErrorStatusCodeException): #* Due to ClientError raised
             updateAllPromotions()
@@ -140,13 +142,11 @@ def test_updateEachGamesPromotions(app, gameJSON):
         updateEachGamesPromotions(gameMissingDate)
         checkDefaultPromotions()
 
-    #* WHEN game JSON's date DOESN'T match any game in the DB
-    gameUnexpectedDate = copy.deepcopy(gameJSON)
-    gameUnexpectedDate.pop("promotions")
-    #* Promos CAN find the wrong game if date is incorrect BUT not likely in real data
-    gameUnexpectedDate["gameDate"] = "2021-06-10T02:10:35Z"
+    #* WHEN game JSON's gamePk DOESN'T match any game in the DB, even if its date does
+    gameUnexpectedKey = copy.deepcopy(gameJSON)
+    gameUnexpectedKey["gamePk"] = 3
     with app.app_context(): #* THEN promotions remain the same in the DB
-        updateEachGamesPromotions(gameUnexpectedDate)
+        updateEachGamesPromotions(gameUnexpectedKey)
         checkDefaultPromotions()
 
     #* WHEN promotions don't match
@@ -166,6 +166,102 @@ def test_updateEachGamesPromotions(app, gameJSON):
         checkDefaultPromotions() #* SO empty promos list resets Game to default value
 
 
+def test_updateHomeGamesPromotionsDelta(app, gameJSON, promoJSON):
+    gameJSON["gamePk"] = 1
+    gameJSON["promotions"] = [promoJSON, { "name": "Cap", "imageUrl": "cap.jpg" }]
+    with app.app_context():
+        updateHomeGamesPromotions([gameJSON], { 119 })
+        hatId = next(promo.id for promo in findGame(1).promos if promo.name == "Hat")
+        writes = []
+        def countWrite(conn, cursor, statement, *args):
+            if not statement.lstrip().upper().startswith("SELECT"):
+                writes.append(statement)
+        event.listen(db.engine, "before_cursor_execute", countWrite)
+        try:
+            #* WHEN the promos haven't changed THEN nothing is written at all
+            summary = updateHomeGamesPromotions([gameJSON], { 119 })
+            assert set(summary.values()) == { 0 }
+            assert writes == []
+
+            #* WHEN 1 promo's thumbnail changes AND another is removed
+            gameJSON["promotions"] = [{ **promoJSON, "imageUrl": "new.jpg" }]
+            summary = updateHomeGamesPromotions([gameJSON], { 119 })
+        finally:
+            event.remove(db.engine, "before_cursor_execute", countWrite)
+        #* THEN ONLY that delta is written, updating the kept promo in place
+        assert summary == { "promosCreated": 0, "promosUpdated": 1, "promosDeleted": 1 }
+        assert [(promo.id, promo.thumbnail_url) for promo in findGame(1).promos] \
+            == [(hatId, "new.jpg")]
+
+
+def test_updateHomeGamesPromotionsMatching(app, gameJSON):
+    with app.app_context():
+        #* WHEN a game is found by its `gamePk`, even if its date changed since seeding
+        movedGame = copy.deepcopy(gameJSON)
+        movedGame["gamePk"] = 1
+        movedGame["gameDate"] = "2021-05-11T02:10:35Z"
+        #* AND the games are streamed 1 at a time, i.e. by `updateAllPromotions()`
+        updateHomeGamesPromotions(iter([movedGame]), { 119 })
+        #* THEN its promos are still updated
+        assert [promo.name for promo in findGame(1).promos] == ["Hat"]
+
+        #* WHEN another game starts at the same UTC time, i.e. on another team's schedule
+        game1 = findGame(1)
+        saveToDb(BaseballGame(gameKey=3, date=game1.date, seriesGameNumber=2,
+                              seriesGameCount=3, home_team_id=game1.home_team_id,
+                              away_team_id=game1.away_team_id))
+        sameTimeGame = copy.deepcopy(gameJSON)
+        sameTimeGame["gamePk"] = 3
+        sameTimeGame["promotions"] = [{ "name": "Cap" }]
+        updateHomeGamesPromotions([sameTimeGame], { 119 })
+        #* THEN ONLY the game with its `gamePk` gets its promos
+        assert [promo.name for promo in findGame(3).promos] == ["Cap"]
+        assert [promo.name for promo in findGame(1).promos] == ["Hat"]
+
+        #* WHEN a game has no `gamePk` THEN it's never matched by its date alone
+        gameJSON.pop("gamePk")
+        gameJSON["gameDate"] = "2021-05-10T02:10:35Z"
+        gameJSON["promotions"] = []
+        updateHomeGamesPromotions([gameJSON], { 119 })
+        assert [promo.name for promo in findGame(1).promos] == ["Hat"]
+
+
+def test_updateHomeGamesPromotionsDigest(app, gameJSON):
+    gameJSON.update({ "gamePk": 1, "seriesGameNumber": 1, "gamesInSeries": 3 })
+    gameJSON["teams"]["home"]["team"]["id"] = 119
+    gameJSON["teams"]["away"] = { "team": { "id": 147 } }
+    with app.app_context():
+        #* WHEN a game's promos are diffed THEN its digest is saved alongside them
+        updateHomeGamesPromotions([gameJSON], { 119 })
+        assert findGame(1).content_digest is not None
+        db.session.expire_all()
+        statements = []
+        def countStatement(conn, cursor, statement, *args):
+            statements.append(statement)
+        event.listen(db.engine, "before_cursor_execute", countStatement)
+        try:
+            #* WHEN the game hasn't changed since THEN 1 digest query skips it
+            summary = updateHomeGamesPromotions([gameJSON], { 119 })
+        finally:
+            event.remove(db.engine, "before_cursor_execute", countStatement)
+        assert set(summary.values()) == { 0 }
+        assertHasLengthOf(statements, 1)
+
+        #* WHEN the game moved BUT the seeder hasn't saved its new date yet
+        gameJSON["gameDate"] = "2021-05-11T02:10:35Z"
+        gameJSON["promotions"] = []
+        digest = findGame(1).content_digest
+        updateHomeGamesPromotions([gameJSON], { 119 })
+        #* THEN its promos are updated BUT its digest is left for the seeder to update
+        assertIsEmpty(findGame(1).promos)
+        assert findGame(1).content_digest == digest
+
+
+#! Helpers
+def findGame(gameKey):
+    return db.session.scalars(db.select(BaseballGame).filter_by(gameKey=gameKey)).one()
+
+
 #! Assertion Methods
 def checkDefaultPromotions():
     games = db.session.scalars(db.select(BaseballGame)).all()
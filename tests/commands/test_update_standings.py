@@ -1,6 +1,7 @@
 from ..MockHttpResponse import MockHttpResponse
 from mlb_team_schedule import db
 from mlb_team_schedule.commands.update_standings import (
+    applyTeamRecords,
     updateAllTeamRecords,
     updateEachDivision,
     updateTeamRecord,
@@ -56,7 +57,7 @@ def test_updateAllTeamRecords(app, monkeypatch, mock_404_response, standingsJSON
     mockResponse = MockHttpResponse(200)
     def mock_JSON(*args, **kwargs):
         return mockResponse
-    monkeypatch.setattr(requests, "get", mock_JSON)
+    monkeypatch.setattr(requests.Session, "get", mock_JSON)
     updateAllTeamRecords() #* WHEN 200 status code BUT empty JSON dict used
     with app.app_context():
         checkTeamDefaultVals() #* THEN no changes
@@ -70,14 +71,16 @@ def test_updateAllTeamRecords(app, monkeypatch, mock_404_response, standingsJSON
         originalTeam, originalWins, originalLosses = checkTeamDefaultVals()
         #* WHEN a filled records list is used
         mockResponse.jsonResponse = standingsJSON
-        updateAllTeamRecords()
+        assert updateAllTeamRecords() == 1
         #* THEN matching teams found update their win-loss to the JSON values
         checkUpdatedWinLossRecord(originalTeam, originalWins, originalLosses)
+        #* WHEN the standings haven't changed THEN no rows are updated
+        assert updateAllTeamRecords() == 0
 
 
 def test_updateEachDivision(app, divisionJSON):
     missingDivisionInfo = { } #* WHEN ALL division info is empty
-    updateEachDivision(missingDivisionInfo)
+    assert updateEachDivision(missingDivisionInfo) == []
     with app.app_context():
         checkTeamDefaultVals() #* THEN no changes to DB
 
@@ -100,14 +103,16 @@ def test_updateEachDivision(app, divisionJSON):
     with app.app_context():
         originalTeam, originalWins, originalLosses = checkTeamDefaultVals()
         #* WHEN divisions have filled team records
-        updateEachDivision(divisionJSON)
+        teamRecords = updateEachDivision(divisionJSON)
+        assert teamRecords == [(originalTeam.id, 123, 321)]
+        assert applyTeamRecords(teamRecords) == 1
         #* THEN any matching teams found will change to match the JSON win-loss
         checkUpdatedWinLossRecord(originalTeam, originalWins, originalLosses)
 
 
 def test_updateTeamRecord(app, teamJSON):
     teamMissingInfo = { } #* WHEN team info is missing
-    updateTeamRecord(teamMissingInfo)
+    assert updateTeamRecord(teamMissingInfo) is None
     with app.app_context():
         checkTeamDefaultVals() #* THEN no changes
 
@@ -135,17 +140,23 @@ def test_updateTeamRecord(app, teamJSON):
         teamNotFoundByName = copy.deepcopy(teamJSON)
         teamNotFoundByName["team"]["name"] = "Foobar"
         #* THEN no DB changes, so the upcoming checkTeamDefaultValues() works fine
-        updateTeamRecord(teamNotFoundByName)
+        assert updateTeamRecord(teamNotFoundByName) is None
 
         originalTeam, originalWins, originalLosses = checkTeamDefaultVals()
         #* WHEN team with matching name found AND the JSON contains a win-loss record
-        updateTeamRecord(teamJSON)
-        #* THEN team found will update its win-loss columns in DB
+        teamRecord = updateTeamRecord(teamJSON)
+        #* THEN its new record is returned WITHOUT writing it to the DB yet
+        assert teamRecord == (originalTeam.id, 123, 321)
+        checkTeamDefaultVals()
+        #* WHEN the record is applied THEN team found will update its win-loss in the DB
+        assert applyTeamRecords([teamRecord]) == 1
         checkUpdatedWinLossRecord(originalTeam, originalWins, originalLosses)
+        #* WHEN the team's record hasn't changed THEN it's skipped
+        assert updateTeamRecord(teamJSON) is None
 
         #* Interesting edge case if wins & losses == 0 (like in the beginning of a season)
         teamJSON["wins"], teamJSON["losses"] = 0, 0
-        updateTeamRecord(teamJSON)
+        applyTeamRecords([updateTeamRecord(teamJSON)])
         #* BEFORE: No wins or losses key found, so default val of 0 causes early return
         #* NOW Default is None, so team CAN begin season with expected 0-0 win-loss record
         assert originalTeam.wins == 0
@@ -46,11 +46,14 @@ def database():
         db.execute(statement)
 
 @pytest.fixture
-def app(database):
+def app(database, tmp_path):
     # db_fd, db_path = tempfile.mkstemp() #? db_path links to temp db file
 
     environ["SECRET_KEY"] = token_hex(16) # Defaults to 32, a good default in prod
-    app = create_app({ }) #* Passing an empty Dictionary ensures the TestConfig is used
+    #* Passing a Dictionary ensures the TestConfig is used, and each test gets its own
+    #* snapshot + response cache dirs via `tmp_path` so no test sees another's data
+    app = create_app({ "SCHEDULE_SNAPSHOT_DIR": str(tmp_path / "schedule_snapshot"),
+                       "MLB_API_CACHE_DIR": str(tmp_path / "mlb_api_cache") })
     app.config.from_mapping({"SECRET_KEY": environ["SECRET_KEY"]})
 
     with app.app_context():
@@ -88,5 +91,5 @@ def mock_404_response(monkeypatch):
     def mock_get(*args, **kwargs):
         return MockHttpResponse(404)
 
-    monkeypatch.setattr(requests, "get", mock_get)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
 
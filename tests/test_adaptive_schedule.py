@@ -0,0 +1,82 @@
+from mlb_team_schedule.adaptive_schedule import (
+    GAME_LENGTH, PROMOTIONS_JOB, REFRESH_COMMANDS, STANDINGS_JOB, RequestBudget,
+    planRefreshes, runRefresh,
+)
+from mlb_team_schedule.utility.api_helpers import addSentRequests
+
+from datetime import datetime, timedelta
+
+
+#! Tests
+def test_planRefreshes():
+    now = datetime(2021, 5, 9, 7, 0) #* Midnight in LA
+    homeGame = datetime(2021, 5, 10, 2, 10) #* A 7:10 PM home game
+    #* WHEN a double header's away games start 3 hours apart AND the home game + the
+    #* game after it end within the same 30 minutes
+    games = [(homeGame, True), (datetime(2021, 5, 9, 17, 5), False),
+             (datetime(2021, 5, 9, 20, 5), False), (datetime(2021, 5, 10, 2, 30), False)]
+    runs = planRefreshes(games, now, maxDailyRequests=12)
+    #* THEN standings refresh after each game ends, with close ones merged into 1
+    assert [runAt for runAt, jobName in runs if jobName == STANDINGS_JOB] == [
+        games[1][0] + GAME_LENGTH, games[2][0] + GAME_LENGTH, games[3][0] + GAME_LENGTH
+    ]
+    #* AND promos refresh before the home game, skipping lead times already passed
+    assert [runAt for runAt, jobName in runs if jobName == PROMOTIONS_JOB] == [
+        homeGame - timedelta(hours=3)
+    ]
+    assert runs == sorted(runs)
+
+    #* WHEN a home game is 3 days away THEN its 1st promos refresh is planned
+    laterHomeGame = now + timedelta(days=3, hours=2)
+    assert planRefreshes([(laterHomeGame, True)], now, maxDailyRequests=12) \
+        == [(now + timedelta(hours=2), PROMOTIONS_JOB)]
+
+    #* WHEN there are no games THEN nothing is planned
+    assert planRefreshes([], now, maxDailyRequests=12) == []
+
+
+def test_planRefreshesDailyCap():
+    now = datetime(2021, 5, 9, 7, 0)
+    games = [(datetime(2021, 5, 9, 17, 0) + timedelta(hours=hour), hour == 8)
+             for hour in range(0, 10, 2)]
+    #* WHEN a day has more refreshes than the cap allows
+    runs = planRefreshes(games, now, maxDailyRequests=3)
+    #* THEN promos are dropped 1st, THEN the earliest standings refreshes
+    assert runs == [(gameStart + GAME_LENGTH, STANDINGS_JOB)
+                    for gameStart, _ in games[-3:]]
+
+
+def test_RequestBudget():
+    budget = RequestBudget(3)
+    morning = datetime(2021, 5, 9, 15, 0)
+    #* WHEN requests are left THEN a run can start, charging the requests it sent
+    assert budget.hasRequestsLeft(morning)
+    budget.use(morning, 2)
+    assert budget.hasRequestsLeft(morning)
+    #* WHEN the day's requests are used up, even by a run sending more than were left
+    budget.use(morning, 2)
+    #* THEN no more runs can start
+    assert not budget.hasRequestsLeft(morning + timedelta(hours=6))
+    #* WHEN the next day starts in LA THEN the budget resets
+    assert budget.hasRequestsLeft(datetime(2021, 5, 10, 7, 30))
+
+
+def test_runRefresh(app, monkeypatch):
+    sentRequests = []
+    def refresh(): #? Stands in for a command, sending the next number of requests
+        addSentRequests(sentRequests.pop(0))
+    monkeypatch.setitem(REFRESH_COMMANDS, STANDINGS_JOB, refresh)
+    monkeypatch.setattr("mlb_team_schedule.adaptive_schedule.printStaleness",
+                        lambda: None)
+    budget = RequestBudget(3)
+    #* WHEN a run is skipped, i.e. since another job holds its locks, THEN it's free
+    sentRequests.extend([0, 2, 2, 1])
+    runRefresh(STANDINGS_JOB, budget)
+    assert budget.used == 0
+    #* WHEN runs send requests THEN each is charged for every request it sent
+    runRefresh(STANDINGS_JOB, budget)
+    runRefresh(STANDINGS_JOB, budget)
+    assert budget.used == 4
+    #* WHEN the cap is reached THEN the next run never starts
+    runRefresh(STANDINGS_JOB, budget)
+    assert sentRequests == [1]
@@ -0,0 +1,223 @@
+from mlb_team_schedule.models import BaseballGame, BaseballTeam
+from mlb_team_schedule.utility.database_helpers import saveToDb
+from mlb_team_schedule.utility.refresh_tracking import markRefreshed
+from mlb_team_schedule.utility.schedule_snapshot import buildScheduleSnapshot
+
+import pytest
+import gzip
+from datetime import datetime
+
+
+JSON_HEADERS = { "Accept": "application/json" }
+
+
+#! Fixtures
+@pytest.fixture(autouse=True)
+def gameDbSetup(app):
+    dodgers = BaseballTeam(team_name="Dodgers", city_name="Los Angeles", team_logo="A",
+                           abbreviation="LAD", wins=2, losses=1)
+    yankees = BaseballTeam(team_name="Yankees", city_name="New York", team_logo="B",
+                           abbreviation="NYY", wins=1, losses=2)
+    mets = BaseballTeam(team_name="Mets", city_name="New York", team_logo="C",
+                        abbreviation="NYM", wins=1, losses=1)
+    with app.app_context():
+        saveToDb(dodgers)
+        saveToDb(yankees)
+        saveToDb(mets)
+        game = BaseballGame(gameKey=1, date=datetime(2021, 5, 10, 2, 10),
+                            seriesGameNumber=1, seriesGameCount=3,
+                            home_team_id=dodgers.id, away_team_id=yankees.id)
+        saveToDb(game)
+        metsGame = BaseballGame(gameKey=2, date=datetime(2021, 5, 11, 23, 10),
+                                seriesGameNumber=1, seriesGameCount=3,
+                                home_team_id=mets.id, away_team_id=yankees.id)
+        saveToDb(metsGame)
+        buildScheduleSnapshot()
+
+
+#! Tests
+def test_conditionalRequests(app, client):
+    #* WHEN the full schedule is requested the 1st time
+    response = client.get("/api/fullSchedule", headers=JSON_HEADERS)
+    #* THEN the full body is sent with its validators + a must-revalidate Cache-Control
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
+    etag, lastModified = response.headers["ETag"], response.headers["Last-Modified"]
+    assert not etag.startswith("W/") #? Strong ETag
+    assert "no-cache" in response.headers["Cache-Control"]
+
+    #* WHEN the client revalidates with its ETag
+    response = client.get("/api/fullSchedule",
+                          headers={ **JSON_HEADERS, "If-None-Match": etag })
+    #* THEN a bodiless 304 is sent
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    #* WHEN the client revalidates with only its Last-Modified date THEN a 304 is sent
+    response = client.get("/api/fullSchedule",
+                          headers={ **JSON_HEADERS, "If-Modified-Since": lastModified })
+    assert response.status_code == 304
+
+    #* WHEN the data changes, bumping the snapshot version
+    with app.app_context():
+        buildScheduleSnapshot()
+    response = client.get("/api/fullSchedule",
+                          headers={ **JSON_HEADERS, "If-None-Match": etag })
+    #* THEN the old ETag no longer matches so the full body is sent with a new ETag
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_conditionalRequestsPerRoute(client):
+    fullSchedule = client.get("/api/fullSchedule", headers=JSON_HEADERS)
+    month = client.get("/api/may", headers=JSON_HEADERS)
+    day = client.get("/api/may/9", headers=JSON_HEADERS)
+    #* WHEN different routes are requested THEN each gets its own ETag
+    etags = { fullSchedule.headers["ETag"], month.headers["ETag"], day.headers["ETag"] }
+    assert len(etags) == 3
+
+    #* WHEN an ETag from a different route is sent THEN it doesn't match
+    response = client.get("/api/may", headers={
+        **JSON_HEADERS, "If-None-Match": fullSchedule.headers["ETag"]
+    })
+    assert response.status_code == 200
+
+
+def test_teamFilter(client):
+    def homeTeams(response):
+        return [game["homeTeam"]["abbreviation"] for game in response.get_json()]
+
+    #* WHEN a team is requested THEN ONLY its home + away games are sent
+    response = client.get("/api/fullSchedule?team=nyy", headers=JSON_HEADERS)
+    assert homeTeams(response) == ["LAD", "NYM"]
+    response = client.get("/api/fullSchedule?team=LAD", headers=JSON_HEADERS)
+    assert homeTeams(response) == ["LAD"]
+    #* AND each team's payload gets its own ETag, even for the month + day routes
+    response = client.get("/api/may/11?team=NYM", headers=JSON_HEADERS)
+    assert response.headers["ETag"] != client.get("/api/may/11", headers=JSON_HEADERS) \
+        .headers["ETag"]
+
+    #* WHEN a team has no games THEN an empty list is sent
+    response = client.get("/api/may?team=SF", headers=JSON_HEADERS)
+    assert response.get_json() == []
+    #* WHEN the team isn't a valid abbreviation THEN a 404 is sent
+    response = client.get("/api/fullSchedule?team=../LAD", headers=JSON_HEADERS)
+    assert response.status_code == 404
+
+
+def test_gamesPagination(client):
+    def gameIds(response):
+        return [game["id"] for game in response.get_json()["games"]]
+
+    #* WHEN the 1st page is requested
+    response = client.get("/api/games?limit=1", headers=JSON_HEADERS)
+    firstPage = response.get_json()
+    #* THEN only `limit` games are sent, in date order, with a cursor to the next page
+    assert [game["homeTeam"]["abbreviation"] for game in firstPage["games"]] == ["LAD"]
+    assert firstPage["nextCursor"] is not None
+    #* WHEN the next page is requested with that cursor
+    response = client.get(f"/api/games?limit=1&after={firstPage['nextCursor']}",
+                          headers=JSON_HEADERS)
+    #* THEN the following game is sent AND no cursor since it's the last page
+    assert response.get_json()["games"][0]["homeTeam"]["abbreviation"] == "NYM"
+    assert response.get_json()["nextCursor"] is None
+    #* WHEN no limit is given THEN every game fits on 1 page
+    assert len(gameIds(client.get("/api/games", headers=JSON_HEADERS))) == 2
+
+    #* WHEN a past season's date range is requested THEN ONLY its games are sent
+    response = client.get("/api/games?start=2021-05-10&end=2021-06-01",
+                          headers=JSON_HEADERS)
+    assert gameIds(response) == gameIds(client.get("/api/games?after=" +
+                                                   firstPage["nextCursor"],
+                                                   headers=JSON_HEADERS))
+    #* Game 1 is on May 9th at the ballpark, even though it's the 10th in UTC
+    response = client.get("/api/games?end=2021-05-10", headers=JSON_HEADERS)
+    assert gameIds(response) == gameIds(client.get("/api/games?limit=1",
+                                                   headers=JSON_HEADERS))
+
+    #* WHEN the normalized format is requested THEN teams are listed once by id
+    response = client.get("/api/games?format=normalized", headers=JSON_HEADERS)
+    assert len(response.get_json()["teams"]) == 3
+    assert response.get_json()["nextCursor"] is None
+
+    #* WHEN a team is requested THEN ONLY the games it plays, home OR away, are sent
+    response = client.get("/api/games?team=nym", headers=JSON_HEADERS)
+    assert [game["homeTeam"]["abbreviation"] for game in response.get_json()["games"]] \
+        == ["NYM"]
+    response = client.get("/api/games?team=LAD&limit=1", headers=JSON_HEADERS)
+    assert response.get_json()["games"][0]["homeTeam"]["abbreviation"] == "LAD"
+    assert response.get_json()["nextCursor"] is None #? NYM's game isn't LAD's next page
+    assert len(gameIds(client.get("/api/games?team=NYY", headers=JSON_HEADERS))) == 2
+    assert gameIds(client.get("/api/games?team=SF", headers=JSON_HEADERS)) == []
+
+    #* WHEN a param is invalid THEN a 400 is sent
+    for query in ("limit=0", "limit=501", "limit=ten", "start=May 1", "after=nope",
+                  "team=L4D", "team=DODGERS"):
+        response = client.get(f"/api/games?{query}", headers=JSON_HEADERS)
+        assert response.status_code == 400
+        assert "error" in response.get_json()
+
+
+def test_normalizedFormat(client):
+    fullSchedule = client.get("/api/fullSchedule", headers=JSON_HEADERS).get_json()
+    #* WHEN the normalized format is requested
+    response = client.get("/api/fullSchedule?format=normalized", headers=JSON_HEADERS)
+    normalized = response.get_json()
+    #* THEN each team is listed ONCE, with games referencing their teams by id
+    assert sorted(team["abbreviation"] for team in normalized["teams"].values()) \
+        == ["LAD", "NYM", "NYY"]
+    for game, normalizedGame in zip(fullSchedule, normalized["games"]):
+        homeTeam = normalized["teams"][str(normalizedGame.pop("homeTeamId"))]
+        awayTeam = normalized["teams"][str(normalizedGame.pop("awayTeamId"))]
+        #* AND hydrating each game's teams rebuilds the regular payload exactly
+        assert { **normalizedGame, "homeTeam": homeTeam, "awayTeam": awayTeam } == game
+    #* AND it combines with the team filter under its own ETag
+    response = client.get("/api/fullSchedule?team=LAD&format=normalized",
+                          headers=JSON_HEADERS)
+    assert len(response.get_json()["games"]) == 1
+    assert response.headers["ETag"] != client.get(
+        "/api/fullSchedule?team=LAD", headers=JSON_HEADERS
+    ).headers["ETag"]
+
+    #* WHEN a route has no games THEN empty teams + games are sent
+    response = client.get("/api/october?format=normalized", headers=JSON_HEADERS)
+    assert response.get_json() == { "teams": {}, "games": [] }
+    #* WHEN the format isn't known THEN a 404 is sent
+    response = client.get("/api/fullSchedule?format=xml", headers=JSON_HEADERS)
+    assert response.status_code == 404
+
+
+def test_compressedResponses(app, client, monkeypatch):
+    monkeypatch.setattr("mlb_team_schedule.utility.compression.MIN_COMPRESS_SIZE", 0)
+    with app.app_context():
+        buildScheduleSnapshot() #? Rebuild so even the tiny test payloads get compressed
+    plainResponse = client.get("/api/fullSchedule", headers=JSON_HEADERS)
+    #* WHEN the client accepts gzip
+    headers = { **JSON_HEADERS, "Accept-Encoding": "gzip" }
+    response = client.get("/api/fullSchedule", headers=headers)
+    #* THEN the precompressed payload is sent with its own ETag
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == plainResponse.data
+    assert response.headers["ETag"] != plainResponse.headers["ETag"]
+    assert "Content-Encoding" not in plainResponse.headers
+
+    #* WHEN the client revalidates its gzipped copy THEN a 304 is sent
+    response = client.get("/api/fullSchedule", headers={
+        **headers, "If-None-Match": response.headers["ETag"]
+    })
+    assert response.status_code == 304
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+
+def test_freshness(app, client):
+    #* WHEN no table has been refreshed yet THEN there's nothing to report
+    assert client.get("/api/freshness").get_json() == {}
+
+    #* WHEN a command has refreshed a table THEN how stale it is gets reported
+    with app.app_context():
+        markRefreshed(["baseball_teams"], datetime(2021, 5, 9, 12, 0))
+    freshness = client.get("/api/freshness").get_json()
+    assert freshness["baseball_teams"]["refreshedAt"] == "2021-05-09T12:00:00Z"
+    assert freshness["baseball_teams"]["staleSeconds"] > 0
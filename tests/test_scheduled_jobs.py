@@ -0,0 +1,25 @@
+from mlb_team_schedule import scheduler
+from mlb_team_schedule.scheduled_jobs import SCHEDULER_LOCK_NAME, runScheduler
+from mlb_team_schedule.utility.advisory_lock import advisoryLock
+
+from threading import Event
+
+
+#! Tests
+def test_createAppSkipsScheduler(app):
+    #* WHEN the app is created for a web worker THEN no scheduler threads are started
+    assert not scheduler.running
+
+
+def test_runScheduler(app):
+    stopEvent = Event()
+    stopEvent.set() #? So the scheduler stops as soon as it starts
+    with app.app_context():
+        #* WHEN no other process is running the scheduler THEN this one runs its jobs
+        assert runScheduler(stopEvent) is True
+        assert not scheduler.running
+
+        #* WHEN another process already holds the scheduler lock THEN this one exits
+        with advisoryLock(SCHEDULER_LOCK_NAME) as acquired:
+            assert acquired
+            assert runScheduler(stopEvent) is False
@@ -0,0 +1,32 @@
+from mlb_team_schedule.utility.advisory_lock import advisoryLock, advisoryLockKey
+
+
+#! Tests
+def test_advisoryLockKey():
+    #* WHEN a lock name is hashed THEN it's always the same signed 64-bit key
+    key = advisoryLockKey("scheduler")
+    assert key == advisoryLockKey("scheduler")
+    assert -2**63 <= key < 2**63
+    assert key != advisoryLockKey("seeder")
+
+
+def test_advisoryLock(app):
+    with app.app_context():
+        with advisoryLock("scheduler") as acquired:
+            #* WHEN the lock is free THEN it's acquired
+            assert acquired
+            #* WHEN another connection tries to take the same lock THEN it doesn't wait
+            with advisoryLock("scheduler") as acquiredAgain:
+                assert not acquiredAgain
+            #* BUT a different lock is still free
+            with advisoryLock("seeder") as acquiredOther:
+                assert acquiredOther
+            #* WHEN many locks are taken at once BUT 1 of them is already held
+            with advisoryLock("seeder", "scheduler") as acquiredBoth:
+                #* THEN none of them are kept
+                assert not acquiredBoth
+            with advisoryLock("seeder") as acquiredOther:
+                assert acquiredOther
+        #* WHEN the lock is released THEN it can be acquired again
+        with advisoryLock("scheduler") as acquired:
+            assert acquired
@@ -1,19 +1,32 @@
-from ..common_assertions import assertIsNotNone
+from ..common_assertions import assertIsNone, assertIsNotNone
 from ..MockHttpResponse import MockHttpResponse
 from mlb_team_schedule.utility.api_helpers import (
-    ClientErrorStatusCodeException, ServerErrorStatusCodeException,
-    UnexpectedHttpResponseStatusCodeException, fetch,
+    DEFAULT_CLIENT_CONFIG, ApiClient, ClientErrorStatusCodeException,
+    ServerErrorStatusCodeException, ServerUnreachableException,
+    UnexpectedHttpResponseStatusCodeException, apiClient, fetch, fetchJSONStream,
+    popFetchedBytes, popSentRequests,
 )
+from mlb_team_schedule.utility.response_cache import processesResponses
 
 import pytest
 import requests
 
 
-def test_fetch(monkeypatch):
+#! Fixtures
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records each backoff delay rather than actually sleeping"""
+    delays = []
+    monkeypatch.setattr("mlb_team_schedule.utility.api_helpers.sleep", delays.append)
+    return delays
+
+
+#! Tests
+def test_fetch(monkeypatch, sleeps):
     mockResponse = MockHttpResponse(404)
     def mock_JSON(*args, **kwargs):
         return mockResponse
-    monkeypatch.setattr(requests, "get", mock_JSON)
+    monkeypatch.setattr(requests.Session, "get", mock_JSON)
 
     #? Sanity check, Python lets funcs get called w/out args
     with pytest.raises(TypeError): # BUT will raise an error if wrong
@@ -27,6 +40,8 @@ def test_fetch(monkeypatch):
     mockResponse.status_code = 500 #? Internal Server Error
     with pytest.raises(ServerErrorStatusCodeException):
         fetch("/foobar") #* THEN ServerErrorStatusCodeException is raised
+    #* AFTER backing off before each retry
+    assert len(sleeps) == DEFAULT_CLIENT_CONFIG["MLB_API_MAX_RETRIES"]
 
     #* WHEN a status code that is NOT 200 is found
     mockResponse.status_code = 301 #? Permanently moved
@@ -42,3 +57,117 @@ def test_fetch(monkeypatch):
     jsonResponse = fetch("/foobar") #* THEN the proper JSON response is received
     assertIsNotNone(jsonResponse)
     assert jsonResponse["foo"] == "bar"
+
+
+def test_ApiClientRetries(monkeypatch, sleeps):
+    responses = [requests.ConnectionError("Reset"), MockHttpResponse(503),
+                 MockHttpResponse(200, { "foo": "bar" })]
+    requestKwargs = []
+    def mock_get(session, url, **kwargs):
+        requestKwargs.append(kwargs)
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    client = ApiClient(connectTimeout=1, readTimeout=2, maxRetries=2, backoffSeconds=1,
+                       poolSize=1)
+    #* WHEN the connection fails, THEN the API returns a 5xx, THEN a 200
+    response = client.get("/foobar")
+    #* THEN the 200 is returned after 2 retries
+    assert response.status_code == 200
+    #* AND every request used the timeouts
+    assert [kwargs["timeout"] for kwargs in requestKwargs] == [(1, 2)] * 3
+    #* AND each retry waited a jittered delay, at most double the last retry's cap
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 1
+    assert 0 <= sleeps[1] <= 2
+
+    #* WHEN the connection keeps failing
+    def mock_timeout(*args, **kwargs):
+        raise requests.Timeout("Too slow")
+    monkeypatch.setattr(requests.Session, "get", mock_timeout)
+    #* THEN a ServerErrorStatusCodeException subclass is raised after the last retry
+    with pytest.raises(ServerUnreachableException):
+        client.get("/foobar")
+    assert len(sleeps) == 4
+
+
+def test_apiClient(app):
+    app.config.update({ "MLB_API_READ_TIMEOUT": 5, "MLB_API_MAX_RETRIES": 1 })
+    with app.app_context():
+        #* WHEN the client is used in an app context THEN it's built from the config
+        client = apiClient()
+        assert client.timeout == (3.05, 5.0)
+        assert client.maxRetries == 1
+        assert client.session.headers["Accept-Encoding"] == "gzip, deflate"
+        #* AND the same pooled session is reused by every fetch
+        assert apiClient() is client
+
+
+def test_fetchWithCache(app, monkeypatch):
+    responses = [MockHttpResponse(200, { "foo": "bar" }, { "ETag": '"v1"' }),
+                 MockHttpResponse(304)]
+    requestHeaders = []
+    def mock_get(session, url, headers = None, **kwargs):
+        requestHeaders.append(headers)
+        return responses.pop(0)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+    @processesResponses
+    def command():
+        return fetch("/foobar", skipUnchangedFor="standings")
+
+    with app.app_context():
+        #* WHEN a URL is fetched for the 1st time by a command THEN a plain GET is sent
+        assert command() == { "foo": "bar" }
+        assertIsNone(requestHeaders[0])
+        #* AND the downloaded body is counted for the job running the fetch
+        assert popFetchedBytes() == len(b'{"foo": "bar"}')
+        #* WHEN a cached response is still fresh THEN no request is sent at all
+        assert fetch("/foobar", maxAge=60) == { "foo": "bar" }
+        assert len(requestHeaders) == 1
+
+        #* WHEN the cached response is stale THEN it's revalidated via its ETag
+        #* AND a 304 Not Modified reuses the cached body
+        assert fetch("/foobar") == { "foo": "bar" }
+        assert requestHeaders[1] == { "If-None-Match": '"v1"' }
+        assert popFetchedBytes() == 0 #? Nothing was downloaded for the cached body
+        #* AND ONLY the 2 requests actually sent are counted, NOT the fresh cache hit
+        assert popSentRequests() == 2
+
+    with app.app_context():
+        #* WHEN the command succeeded on this exact body THEN None is returned
+        assertIsNone(fetch("/foobar", maxAge=60, skipUnchangedFor="standings"))
+
+
+def test_fetchJSONStream(app, monkeypatch):
+    schedule = { "totalGames": 2, "dates": [{ "date": "2021-05-01" }, { "date": "2"}] }
+    responses = [MockHttpResponse(200, schedule, { "ETag": '"v1"' }),
+                 MockHttpResponse(304)]
+    requestKwargs = []
+    def mock_get(session, url, **kwargs):
+        requestKwargs.append(kwargs)
+        return responses.pop(0)
+    monkeypatch.setattr(requests.Session, "get", mock_get)
+
+    @processesResponses #? Marks the streamed body as processed once it's fully read
+    def seeder():
+        scheduleStream = fetchJSONStream("/foobar", "dates", skipUnchangedFor="seeder")
+        assert scheduleStream.header == { "totalGames": 2 }
+        return list(scheduleStream)
+
+    with app.app_context():
+        #* WHEN a URL is streamed THEN the body is requested as a stream
+        #* AND parsed as it arrives
+        assert seeder() == schedule["dates"]
+        assert requestKwargs[0]["stream"]
+
+        #* WHEN the response is not modified THEN the cached body is streamed instead
+        assert list(fetchJSONStream("/foobar", "dates")) == schedule["dates"]
+        assert requestKwargs[1]["headers"] == { "If-None-Match": '"v1"' }
+
+    with app.app_context():
+        #* WHEN the fully streamed body was already processed THEN None is returned
+        assertIsNone(fetchJSONStream("/foobar", "dates", maxAge=60,
+                                     skipUnchangedFor="seeder"))
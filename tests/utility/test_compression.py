@@ -0,0 +1,99 @@
+from mlb_team_schedule.utility import compression
+from mlb_team_schedule.utility.compression import (
+    compressVariants, negotiateEncoding, sendPrecompressedStatic,
+)
+
+import pytest
+import gzip
+from flask import Flask
+from werkzeug.datastructures import Accept
+from werkzeug.http import parse_accept_header
+
+
+#! Fixtures
+@pytest.fixture
+def staticApp(tmp_path): #? A bare app since serving static files doesn't need the DB
+    app = Flask(__name__, static_folder=str(tmp_path), static_url_path="/static")
+    app.view_functions["static"] = sendPrecompressedStatic
+    (tmp_path / "index.js").write_bytes(b"console.log('Dodgers');" * 100)
+    (tmp_path / "index.js.gz").write_bytes(b"gzipped")
+    (tmp_path / "index.js.br").write_bytes(b"brotlied")
+    (tmp_path / "global.css").write_bytes(b"body {}")
+    return app
+
+
+#! Helpers
+def acceptEncodings(header):
+    return parse_accept_header(header, Accept)
+
+
+#! Tests
+def test_compressVariants(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    payload = b'[{"homeTeam":{"abbreviation":"LAD"}}]' * 100
+    #* WHEN a payload is compressed THEN the gzip copy decompresses back to it
+    variants = compressVariants(payload)
+    assert list(variants) == ["gzip"] #? Brotli is ONLY added if installed
+    assert gzip.decompress(variants["gzip"]) == payload
+    assert len(variants["gzip"]) < len(payload)
+    #* AND compressing it again writes the exact same bytes
+    assert compressVariants(payload) == variants
+
+    #* WHEN the payload is too small to be worth it THEN nothing is compressed
+    assert compressVariants(b"[]") == {}
+
+
+def test_compressVariantsBrotli(monkeypatch):
+    qualities = []
+    class MockBrotli:
+        MODE_TEXT = 1
+        @staticmethod
+        def compress(data, mode, quality):
+            qualities.append(quality)
+            return data[:10]
+    monkeypatch.setattr(compression, "brotli", MockBrotli)
+    payload = b'[{"homeTeam":{"abbreviation":"LAD"}}]' * 100
+    #* WHEN Brotli is installed THEN a Brotli copy is added alongside the gzip one
+    assert list(compressVariants(payload)) == ["gzip", "br"]
+    #* AND snapshot payloads use a fast quality, NOT the slow max that `vite build` uses
+    assert qualities == [compression.SNAPSHOT_BROTLI_QUALITY]
+    assert compression.SNAPSHOT_BROTLI_QUALITY < 11
+
+
+def test_negotiateEncoding():
+    available = ["br", "gzip"]
+    #* WHEN the client accepts both encodings equally THEN Brotli is preferred
+    assert negotiateEncoding(acceptEncodings("gzip, deflate, br"), available) == "br"
+    #* WHEN the client ranks gzip higher OR only accepts gzip THEN gzip is sent
+    assert negotiateEncoding(acceptEncodings("br;q=0.5, gzip"), available) == "gzip"
+    assert negotiateEncoding(acceptEncodings("gzip"), available) == "gzip"
+    assert negotiateEncoding(acceptEncodings("*"), ["gzip"]) == "gzip"
+    #* WHEN no accepted encoding is available THEN the uncompressed bytes are sent
+    assert negotiateEncoding(acceptEncodings("br"), ["gzip"]) is None
+    assert negotiateEncoding(acceptEncodings("gzip;q=0"), available) is None
+    assert negotiateEncoding(acceptEncodings(""), available) is None
+
+
+def test_sendPrecompressedStatic(staticApp):
+    client = staticApp.test_client()
+    #* WHEN a static file has precompressed copies AND the client accepts them
+    response = client.get("/static/index.js", headers={ "Accept-Encoding": "gzip, br" })
+    #* THEN the preferred copy is sent with the ORIGINAL file's Content-Type
+    assert response.data == b"brotlied"
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.mimetype == "text/javascript"
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    #* WHEN the client doesn't accept compression THEN the original file is sent
+    response = client.get("/static/index.js")
+    assert response.data.startswith(b"console.log")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.headers["Vary"]
+
+    #* WHEN a file has no compressed copies THEN it's sent as is
+    response = client.get("/static/global.css", headers={ "Accept-Encoding": "gzip" })
+    assert response.data == b"body {}"
+    assert "Content-Encoding" not in response.headers
+    #* WHEN a path escapes the static folder THEN it's still a 404
+    response = client.get("/static/../index.js", headers={ "Accept-Encoding": "gzip" })
+    assert response.status_code == 404
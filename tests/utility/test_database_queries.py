@@ -0,0 +1,115 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.models import BaseballGame, BaseballTeam, Promo
+from mlb_team_schedule.utility.database_helpers import saveToDb
+from mlb_team_schedule.utility.database_queries import (
+    queryScheduledGames, selectScheduledGames
+)
+from mlb_team_schedule.utility.schedule_serializer import selectGameRows
+
+import pytest
+from sqlalchemy import event, text
+from datetime import datetime, timedelta
+
+
+#! Fixtures
+@pytest.fixture
+def teams(app):
+    dodgers = BaseballTeam(team_name="Dodgers", city_name="Los Angeles", team_logo="A",
+                           abbreviation="LAD", wins=2, losses=1)
+    yankees = BaseballTeam(team_name="Yankees", city_name="New York", team_logo="B",
+                           abbreviation="NYY", wins=1, losses=2)
+    with app.app_context():
+        saveToDb(dodgers)
+        saveToDb(yankees)
+        return (dodgers.id, yankees.id)
+
+
+#! Helpers
+def addGamesWithPromos(startingKey, numOfGames, homeTeamId, awayTeamId):
+    firstDate = datetime(2021, 5, 10, 2, 10)
+    for gameKey in range(startingKey, startingKey + numOfGames):
+        game = BaseballGame(gameKey=gameKey, date=firstDate + timedelta(days=gameKey),
+                            seriesGameNumber=1, seriesGameCount=3,
+                            home_team_id=homeTeamId, away_team_id=awayTeamId)
+        game.promos = [Promo(name=f"Promo {gameKey}", thumbnail_url="C", offer_type="")]
+        db.session.add(game)
+    db.session.commit()
+
+def countStatementsWhileSerializing():
+    statements = []
+    def countStatement(*args, **kwargs):
+        statements.append(args[2]) #? `before_cursor_execute` gets the SQL string 3rd
+    event.listen(db.engine, "before_cursor_execute", countStatement)
+    try:
+        db.session.expunge_all() #? Empty the identity map so nothing is already loaded
+        games = [game.asDict for game in queryScheduledGames()]
+    finally:
+        event.remove(db.engine, "before_cursor_execute", countStatement)
+    return (games, len(statements))
+
+def explain(query):
+    #? A handful of rows are cheaper to seq scan, so Postgres must be told to avoid it
+    db.session.execute(text("SET LOCAL enable_seqscan = off"))
+    statement = query.compile(db.engine, compile_kwargs={ "literal_binds": True })
+    plan = db.session.execute(text(f"EXPLAIN {statement}")).scalars().all()
+    return "\n".join(plan)
+
+
+#! Tests
+def test_queryScheduledGames(app, teams):
+    dodgersId, yankeesId = teams
+    with app.app_context():
+        #* WHEN only 1 game is in the DB
+        addGamesWithPromos(1, 1, dodgersId, yankeesId)
+        games, fewGamesStatementCount = countStatementsWhileSerializing()
+        assert len(games) == 1
+        #* THEN 1 statement loads the games + teams, and 1 more loads ALL of the promos
+        assert fewGamesStatementCount == 2
+
+        #* WHEN the number of games grows
+        addGamesWithPromos(2, 24, yankeesId, dodgersId)
+        games, manyGamesStatementCount = countStatementsWhileSerializing()
+        assert len(games) == 25
+        #* THEN the number of statements run stays the same
+        assert manyGamesStatementCount == fewGamesStatementCount
+        #* AND the fully serialized games still include their teams and promos
+        assert games[0]["homeTeam"]["abbreviation"] == "LAD"
+        assert games[-1]["homeTeam"]["abbreviation"] == "NYY"
+        assert all(len(game["promos"]) == 1 for game in games)
+
+
+def test_queryScheduledGamesByDate(app, teams):
+    dodgersId, yankeesId = teams
+    with app.app_context():
+        addGamesWithPromos(1, 5, dodgersId, yankeesId)
+        #* WHEN a date range is used
+        start, end = datetime(2021, 5, 11), datetime(2021, 5, 13)
+        games = queryScheduledGames(start, end)
+        #* THEN only games in that range are found, ordered by date
+        assert [game.gameKey for game in games] == [2, 3]
+
+
+def test_queryScheduledGamesUsesIndexes(app, teams):
+    dodgersId, yankeesId = teams
+    with app.app_context():
+        addGamesWithPromos(1, 5, dodgersId, yankeesId)
+        #* WHEN a date range is queried
+        start, end = datetime(2021, 5, 11), datetime(2021, 5, 13)
+        plan = explain(selectScheduledGames(start, end))
+        #* THEN the stored `local_date` index is used rather than scanning every game
+        assert "ix_baseball_games_local_date" in plan
+        assert "Seq Scan on baseball_games" not in plan
+
+        #* WHEN a team's games OR a game's promos are found THEN the FK's index is used
+        teamGamesPlan = explain(db.select(BaseballGame.id).where(
+            BaseballGame.away_team_id == yankeesId
+        ))
+        assert "ix_baseball_games_away_team_id" in teamGamesPlan
+        promosPlan = explain(db.select(Promo.id).where(Promo.baseball_game_id == 1))
+        assert "ix_promos_baseball_game_id" in promosPlan
+
+        #* WHEN a page of games is found after a `(date, id)` keyset
+        pagePlan = explain(selectGameRows(after=(datetime(2021, 5, 12), 2), limit=2))
+        #* THEN the composite keyset index is used, so no page ever scans + sorts
+        assert "ix_baseball_games_date_id" in pagePlan
+        db.session.rollback() # Resets `enable_seqscan`
@@ -1,9 +1,10 @@
 from mlb_team_schedule.utility.datetime_helpers import (
-    dateToday, dateToStr, isDatetime, strToDatetime,
+    dateToday, dateToStr, isDatetime, strToDatetime, utcToLocalDatetime,
 )
 
 import pytest
 from datetime import UTC, date, datetime
+from zoneinfo import ZoneInfo
 
 
 def test_dateToday():
@@ -67,3 +68,20 @@ def test_strToDatetime():
         strToDatetime(date_str, "%Y/%m/%d")
         #* THEN the string ISN'T converted into datetime, throwing ValueError
         #* SINCE strToDateTime is basically a `datetime.strptime` alias
+
+
+def test_utcToLocalDatetime():
+    pacificTime = ZoneInfo("America/Los_Angeles")
+    #* WHEN a UTC datetime during daylight savings is converted THEN it's shifted 7 hours
+    assert utcToLocalDatetime(datetime(2021, 5, 10, 2, 10), pacificTime) \
+        == datetime(2021, 5, 9, 19, 10)
+    #* WHEN a UTC datetime during standard time is converted THEN it's shifted 8 hours
+    assert utcToLocalDatetime(datetime(2021, 3, 10, 7, 30), pacificTime) \
+        == datetime(2021, 3, 9, 23, 30)
+    #* WHEN a different timezone is used THEN its own offset is used
+    easternTime = ZoneInfo("America/New_York")
+    assert utcToLocalDatetime(datetime(2021, 5, 10, 2, 10), easternTime) \
+        == datetime(2021, 5, 9, 22, 10)
+    #* WHEN a plain date is converted THEN it's treated as midnight UTC
+    assert utcToLocalDatetime(date(2021, 5, 10), pacificTime) \
+        == datetime(2021, 5, 9, 17, 0)
@@ -0,0 +1,69 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.models import JobRun
+from mlb_team_schedule.utility.advisory_lock import advisoryLock
+from mlb_team_schedule.utility.api_helpers import addFetchedBytes
+from mlb_team_schedule.utility.job_runs import (
+    TABLE_LOCK_PREFIX, countRowsTouched, runsAsJob,
+)
+
+import pytest
+
+
+#! Helpers
+def jobRuns():
+    return db.session.scalars(db.select(JobRun).order_by(JobRun.id)).all()
+
+
+#! Tests
+def test_runsAsJob(app):
+    @runsAsJob("standings", ("baseball_teams",))
+    def updateStandings():
+        addFetchedBytes(2048)
+        return 3
+
+    @runsAsJob("seed", ("baseball_games", "baseball_teams"))
+    def seed():
+        updateStandings() #? Nested, so it's part of the seed job
+        return { "created": 2, "updated": 1, "deleted": 0 }
+
+    with app.app_context():
+        #* WHEN a job finishes THEN its run is recorded with what it did
+        assert seed() == { "created": 2, "updated": 1, "deleted": 0 }
+        [seedRun] = jobRuns()
+        assert (seedRun.job_name, seedRun.status) == ("seed", "succeeded")
+        assert seedRun.rows_touched == 3
+        assert seedRun.bytes_fetched == 2048
+        assert seedRun.duration_ms >= 0
+        assert seedRun.finished_at >= seedRun.started_at
+
+        #* WHEN another job holds the lock on one of the job's tables
+        with advisoryLock(TABLE_LOCK_PREFIX + "baseball_teams") as acquired:
+            assert acquired
+            #* THEN the job is skipped + recorded as skipped
+            assert updateStandings() is None
+        assert [(run.job_name, run.status) for run in jobRuns()[1:]] \
+            == [("standings", "skipped")]
+        #* WHEN no other job holds it anymore THEN the job runs again
+        assert updateStandings() == 3
+        assert jobRuns()[-1].status == "succeeded"
+
+
+def test_runsAsJobFailure(app):
+    @runsAsJob("promotions", ("promos",))
+    def updatePromotions():
+        raise ValueError("MLB API is down")
+
+    with app.app_context():
+        #* WHEN a job raises THEN the error is re-raised AND its run marked failed
+        with pytest.raises(ValueError):
+            updatePromotions()
+        [failedRun] = jobRuns()
+        assert failedRun.status == "failed"
+        assert failedRun.finished_at is not None
+        assert failedRun.rows_touched == 0
+
+
+def test_countRowsTouched():
+    assert countRowsTouched(4) == 4
+    assert countRowsTouched({ "promosCreated": 2, "promosDeleted": 1 }) == 3
+    assert countRowsTouched(None) == 0
@@ -0,0 +1,100 @@
+from mlb_team_schedule.utility import json_provider
+from mlb_team_schedule.utility.json_provider import FastJSONProvider, PreEncodedJSON
+
+import pytest
+import json
+from flask import Flask
+from datetime import datetime
+from os import environ
+from time import perf_counter
+
+
+#! Fixtures
+@pytest.fixture
+def jsonApp(): #? A bare app since encoding JSON doesn't need the DB
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+@pytest.fixture
+def stdlibOnly(monkeypatch):
+    monkeypatch.setattr(json_provider, "orjson", None)
+
+
+#! Helpers
+def createPayload(numOfGames):
+    """A full schedule-like payload, shaped like each game's `asDict`"""
+    return [{
+        "id": gameNum, "date": "Sun May 09 2021 at 07:10 PM", "gameNumInSeries": 1,
+        "gamesInSeries": 3, "promos": [
+            { "id": gameNum * 2 + promoNum, "name": f"Promo {promoNum} – Café",
+              "thumbnailUrl": "https://img.mlbstatic.com/thumb.png" }
+            for promoNum in range(2)
+        ],
+        "homeTeam": { "id": 1, "teamName": "Dodgers", "cityName": "Los Angeles",
+                      "abbreviation": "LAD", "wins": 10, "losses": 5 },
+        "awayTeam": { "id": 2, "teamName": "Yankees", "cityName": "New York",
+                      "abbreviation": "NYY", "wins": 5, "losses": 10 }
+    } for gameNum in range(numOfGames)]
+
+def timeIt(encode, runs = 5):
+    bestTime = None
+    for _ in range(runs):
+        startTime = perf_counter()
+        encode()
+        elapsed = perf_counter() - startTime
+        bestTime = elapsed if bestTime is None else min(bestTime, elapsed)
+    return bestTime
+
+
+#! Tests
+def test_stdlibFallback(jsonApp, stdlibOnly):
+    payload = { "b": [1, 2], "a": "Café", "when": datetime(2021, 5, 9, 19, 10) }
+    with jsonApp.app_context():
+        #* WHEN `orjson` isn't installed THEN the stdlib encodes with sorted keys
+        assert jsonApp.json.dumps(payload) == json.dumps(
+            payload, default=jsonApp.json.default, sort_keys=True, ensure_ascii=False
+        )
+        #* AND `dumpBytes` is compact UTF-8
+        encoded = jsonApp.json.dumpBytes(payload)
+        assert encoded.startswith(b'{"a":"Caf\xc3\xa9","b":[1,2],"when":')
+        assert jsonApp.json.loads(encoded) \
+            == jsonApp.json.loads(jsonApp.json.dumps(payload))
+
+
+def test_preEncodedResponse(jsonApp):
+    payload = b'[{"id":1}]\n'
+    with jsonApp.app_context():
+        #* WHEN the payload is already encoded THEN its bytes are sent as is
+        response = jsonApp.json.response(PreEncodedJSON(payload))
+        assert response.get_data() == payload
+        assert response.mimetype == "application/json"
+        #* WHEN anything else is sent THEN it's encoded like `jsonify()`
+        assert jsonApp.json.response({ "id": 1 }).get_json() == { "id": 1 }
+
+
+def test_orjsonMatchesStdlib(jsonApp, monkeypatch):
+    pytest.importorskip("orjson")
+    payload = { "b": [1, { "d": None, "c": 1.5 }], "a": "Café",
+                "when": datetime(2021, 5, 9, 19, 10) }
+    with jsonApp.app_context():
+        fastCompact = jsonApp.json.dumpBytes(payload)
+        fastIndented = jsonApp.json.dumps(payload, indent=2)
+        monkeypatch.setattr(json_provider, "orjson", None)
+        #* WHEN `orjson` encodes THEN its output is byte for byte the stdlib's
+        assert fastCompact == jsonApp.json.dumpBytes(payload)
+        assert fastIndented == jsonApp.json.dumps(payload, indent=2)
+
+
+#? Opt-in since it's slow: `RUN_BENCHMARKS=1 pytest -s -k benchmark`
+@pytest.mark.skipif(not environ.get("RUN_BENCHMARKS"), reason="Set RUN_BENCHMARKS=1")
+def test_encodingBenchmark(jsonApp):
+    payload = createPayload(2430) #? The league's full season
+    with jsonApp.app_context():
+        stdlibTime = timeIt(lambda: json.dumps(payload, sort_keys=True,
+                                               separators=(",", ":")).encode())
+        providerTime = timeIt(lambda: jsonApp.json.dumpBytes(payload))
+        backend = "orjson" if json_provider.orjson else "stdlib"
+        print(f"\n2430 games: stdlib = {stdlibTime * 1000:.1f}ms, "
+              f"provider ({backend}) = {providerTime * 1000:.1f}ms "
+              f"({stdlibTime / providerTime:.1f}x faster)")
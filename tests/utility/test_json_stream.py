@@ -0,0 +1,44 @@
+from mlb_team_schedule.utility.json_stream import JSONArrayStream, JSONStreamError
+
+import pytest
+import json
+
+
+#! Helpers
+def chunked(body, chunkSize):
+    return [body[i:i + chunkSize] for i in range(0, len(body), chunkSize)]
+
+
+#! Tests
+def test_JSONArrayStream():
+    schedule = { "copyright": "© MLB", "totalGames": 162,
+                 "dates": [{ "date": "2021-05-01", "games": [{ "gamePk": 1 }] },
+                           { "date": "2021-05-02", "games": [] }],
+                 "wait": 10 }
+    body = json.dumps(schedule, indent=2).encode()
+    #? Even 1 byte chunks split keys, numbers + multi-byte characters
+    for chunkSize in (1, 7, len(body)):
+        scheduleStream = JSONArrayStream(chunked(body, chunkSize), "dates")
+        #* WHEN the stream is created THEN only the keys before the array are parsed
+        assert scheduleStream.header == { "copyright": "© MLB", "totalGames": 162 }
+        #* WHEN iterated THEN each date is yielded in order
+        assert list(scheduleStream) == schedule["dates"]
+        #* AND any keys after the array are added to the header
+        assert scheduleStream.header["wait"] == 10
+
+    #* WHEN the array is empty THEN nothing is yielded
+    assert list(JSONArrayStream([b'{"totalGames": 0, "dates": []}'], "dates")) == []
+    #* WHEN the array is missing THEN nothing is yielded
+    emptyStream = JSONArrayStream([b'{"totalGames": 0}'], "dates")
+    assert not emptyStream.foundArray
+    assert list(emptyStream) == []
+
+
+def test_JSONArrayStreamErrors():
+    #* WHEN the body isn't a JSON object THEN a JSONStreamError is raised
+    with pytest.raises(JSONStreamError):
+        JSONArrayStream([b"[1, 2]"], "dates")
+    #* WHEN the body is cut off THEN a JSONStreamError is raised once the end is reached
+    truncatedStream = JSONArrayStream([b'{"dates": [{"date": 1}, '], "dates")
+    with pytest.raises(JSONStreamError):
+        list(truncatedStream)
@@ -1,10 +1,15 @@
 from ..common_assertions import assertIsNone
 from mlb_team_schedule.utility.datetime_helpers import YMD_FORMAT, dateToday, dateToStr
+from mlb_team_schedule.utility.json_stream import JSONArrayStream
 from mlb_team_schedule.utility.mlb_api import (
-    createEndpoint, fetchRemainingSchedule, fetchThisYearsSchedule,
+    EXTRA_SEASON_FETCHERS, createEndpoint, createScheduleEndpoint, fetchConcurrently,
+    fetchRemainingSchedule, fetchScheduleTotals, fetchSeasonData, fetchThisYearsSchedule,
     getScheduleTotals, scheduleDates,
 )
 
+import pytest
+from threading import Barrier
+
 
 def test_fetchThisYearsSchedule(app, monkeypatch):
     mockResponse = { }
@@ -36,7 +41,8 @@ def test_fetchRemainingSchedule(app, monkeypatch):
     mockResponse = { } #? Can use a lambda to inject this value via monkeypatch!
     #? Python Lambdas are 1-line expressions that can implicitly return referenced vars
     #? Lambdas also typically accepts args, and the following one NEEDS it to pass test
-    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetch", lambda _: mockResponse)
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetch",
+                        lambda _, **options: mockResponse)
     with app.app_context():
         #* WHEN the response is empty
         totalGames, teamGameDates, scheduleStartPoint = fetchRemainingSchedule()
@@ -57,6 +63,97 @@ def test_fetchRemainingSchedule(app, monkeypatch):
         assert scheduleStartPoint == expectedDate #* This date won't change
 
 
+def test_fetchScheduleTotalsStreamed(monkeypatch):
+    body = b'{"totalGames": 2, "dates": [{"date": "2021-05-01"}, {"date": "2021-05-02"}]}'
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchJSONStream",
+                        lambda *args, **kwargs: JSONArrayStream([body], "dates"))
+    #* WHEN the schedule is streamed
+    totalGames, teamGameDates = fetchScheduleTotals("/foobar", stream=True)
+    #* THEN the total is parsed 1st AND the dates are yielded 1 by 1
+    assert totalGames == 2
+    assert next(teamGameDates) == { "date": "2021-05-01" }
+    assert list(teamGameDates) == [{ "date": "2021-05-02" }]
+
+    #* WHEN the body lists the total after the dates
+    body = b'{"dates": [{"date": "2021-05-01"}], "totalGames": 1}'
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchJSONStream",
+                        lambda *args, **kwargs: JSONArrayStream([body], "dates"))
+    totalGames, teamGameDates = fetchScheduleTotals("/foobar", stream=True)
+    #* THEN the dates are still streamed, with the total unknown until they're read
+    assertIsNone(totalGames)
+    assert list(teamGameDates) == [{ "date": "2021-05-01" }]
+
+    #* WHEN the body is missing the dates OR was already processed THEN None is returned
+    chunks = iter([b'{"totalGames": ', b"0}", b"\n"])
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchJSONStream",
+                        lambda *args, **kwargs: JSONArrayStream(chunks, "dates"))
+    assert fetchScheduleTotals("/foobar", stream=True) == (None, None)
+    assertIsNone(next(chunks, None)) #* AND the rest of the body is still drained
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchJSONStream",
+                        lambda *args, **kwargs: None)
+    assert fetchScheduleTotals("/foobar", stream=True) == (None, None)
+
+
+def test_fetchScheduleTotalsForManyTeams(monkeypatch):
+    def gameJSON(homeTeamId, awayTeamId):
+        return { "teams": { "home": { "team": { "id": homeTeamId } },
+                            "away": { "team": { "id": awayTeamId } } } }
+    schedule = { "totalGames": 3, "dates": [
+        { "date": "2021-05-01", "games": [gameJSON(119, 147), gameJSON(137, 135)] },
+        { "date": "2021-05-02", "games": [gameJSON(121, 147)] },
+        { "date": "2021-05-03", "games": [gameJSON(137, 135)] }
+    ] }
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetch",
+                        lambda _, **options: schedule)
+    #* WHEN many teams are tracked
+    totalGames, teamGameDates = fetchScheduleTotals("/foobar", teamIds={ 119, 147 })
+    #* THEN the league-wide dates ONLY keep games played by a tracked team
+    assert totalGames == 3
+    assert teamGameDates == [
+        { "date": "2021-05-01", "games": [gameJSON(119, 147)] },
+        { "date": "2021-05-02", "games": [gameJSON(121, 147)] }
+    ] #* AND dates without any of their games are dropped
+
+    #* WHEN only 1 team is tracked THEN its own schedule is kept as is
+    assert fetchScheduleTotals("/foobar", teamIds={ 119 }) == (3, schedule["dates"])
+
+
+def test_fetchConcurrently():
+    #? Each fetcher waits for the other at the barrier, so running them 1 at a time
+    #? would time out and break it
+    barrier = Barrier(2, timeout=5)
+    def fetcher(result):
+        def fetch():
+            barrier.wait()
+            return result
+        return fetch
+    #* WHEN multiple fetchers are run
+    results = fetchConcurrently({ "foo": fetcher(1), "bar": fetcher(2) })
+    #* THEN they ran at the same time AND each result is returned by its name
+    assert results == { "foo": 1, "bar": 2 }
+
+    #* WHEN any fetcher fails THEN its error is re-raised
+    def failingFetcher():
+        raise ValueError("Failed")
+    with pytest.raises(ValueError):
+        fetchConcurrently({ "foo": lambda: 1, "bar": failingFetcher }, maxConcurrency=1)
+
+
+def test_fetchSeasonData(app, monkeypatch):
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchThisYearsSchedule",
+                        lambda **kwargs: (1, [], "2021-03-01"))
+    monkeypatch.setattr("mlb_team_schedule.utility.mlb_api.fetchTeamRecords",
+                        lambda **kwargs: [{ "division": { "id": 203 } }])
+    monkeypatch.setitem(EXTRA_SEASON_FETCHERS, "playoffs", lambda: (None, None))
+    with app.app_context():
+        #* WHEN the season's data is fetched with extras
+        seasonData = fetchSeasonData(extras=("playoffs",))
+        #* THEN every response is combined into 1 dict
+        assert seasonData == { "schedule": (1, [], "2021-03-01"),
+                               "standings": [{ "division": { "id": 203 } }],
+                               "playoffs": (None, None) }
+
+
 def test_getScheduleTotals():
     #* WHEN the schedule JSON is empty
     totalGames, teamGameDates = getScheduleTotals({ })
@@ -189,3 +286,20 @@ def test_createEndpoint(app):
                                              "&season=1234&startDate=03-01-2021&endDate=11-30-2020"
                                              "&teamId=someId&gameType=R&scheduleTypes=games")
         assert endpointWithUnformattedVals == completelyPoorlyFormattedEndpoint
+
+
+def test_createScheduleEndpoint(app):
+    with app.app_context():
+        #* WHEN 1 OR no teams are tracked THEN that team's own endpoint is used
+        assert createScheduleEndpoint("2021-03-01", "2021-11-30", "2021", { 147 }) \
+            == createEndpoint("2021-03-01", "2021-11-30", "2021", 147)
+        assert createScheduleEndpoint("2021-03-01", "2021-11-30", "2021") \
+            == createEndpoint("2021-03-01", "2021-11-30", "2021")
+
+        #* WHEN many teams are tracked THEN 1 league-wide endpoint without a team is used
+        leagueEndpoint = createScheduleEndpoint("2021-03-01", "2021-11-30", "2021",
+                                                { 119, 147 })
+        assert "teamId" not in leagueEndpoint
+        assert "season=2021&startDate=2021-03-01&endDate=2021-11-30" in leagueEndpoint
+        #* BUT any missing date values still return None
+        assertIsNone(createScheduleEndpoint(None, "2021-11-30", "2021", { 119, 147 }))
@@ -0,0 +1,45 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.utility.refresh_tracking import (
+    markRefreshed, queryStaleness, recordsRefreshOf,
+)
+
+import pytest
+from datetime import datetime
+
+
+#! Tests
+def test_markRefreshed(app):
+    with app.app_context():
+        #* WHEN tables are refreshed THEN their staleness is measured from then
+        markRefreshed(["promos", "baseball_teams"], datetime(2021, 5, 9, 12, 0))
+        staleness = queryStaleness(now=datetime(2021, 5, 9, 12, 5))
+        assert staleness["promos"] == { "refreshedAt": "2021-05-09T12:00:00Z",
+                                        "staleSeconds": 300 }
+        assert list(staleness) == ["baseball_teams", "promos"]
+
+        #* WHEN a table is refreshed again THEN its 1 row is updated
+        markRefreshed(["promos"], datetime(2021, 5, 9, 12, 5))
+        staleness = queryStaleness(now=datetime(2021, 5, 9, 12, 5))
+        assert staleness["promos"]["staleSeconds"] == 0
+        assert staleness["baseball_teams"]["staleSeconds"] == 300
+        #* AND the session never sees the write, so no snapshot rebuild is triggered
+        assert not db.session.info
+
+
+def test_recordsRefreshOf(app):
+    @recordsRefreshOf("promos")
+    def failingCommand():
+        raise ValueError("MLB API is down")
+
+    @recordsRefreshOf("promos")
+    def command():
+        return 1
+
+    with app.app_context():
+        #* WHEN the command fails THEN its table isn't marked as refreshed
+        with pytest.raises(ValueError):
+            failingCommand()
+        assert queryStaleness() == {}
+        #* WHEN the command finishes THEN it is
+        assert command() == 1
+        assert queryStaleness()["promos"]["staleSeconds"] <= 1
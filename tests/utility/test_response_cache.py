@@ -0,0 +1,78 @@
+from ..common_assertions import assertIsNone
+from mlb_team_schedule.utility.response_cache import (
+    PRUNE_AFTER_SECONDS, ResponseCache, markPendingProcessed, processesResponses,
+    responseCache,
+)
+
+import pytest
+import os
+import time
+
+URL = "https://statsapi.mlb.com/api/v1/standings"
+
+
+#! Tests
+def test_ResponseCache(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    #* WHEN a URL was never cached THEN nothing is found
+    assertIsNone(cache.lookup(URL))
+
+    #* WHEN a response is stored
+    cache.store(URL, b'{"records":[]}', { "ETag": '"abc"' })
+    cachedResponse = cache.lookup(URL)
+    #* THEN its body and validators are found by its URL
+    assert cachedResponse.body() == b'{"records":[]}'
+    assert cachedResponse.validators() == { "If-None-Match": '"abc"' }
+    #* AND it's fresh for a max-age, but always revalidated without one
+    assert cachedResponse.isFresh(60)
+    assert not cachedResponse.isFresh(0)
+
+    #* WHEN a command processes the body
+    cache.markProcessed(URL, "standings", cachedResponse.digest)
+    #* THEN storing the same bytes again is recognized as already processed
+    cachedResponse = cache.store(URL, b'{"records":[]}', {})
+    assert cachedResponse.alreadyProcessedBy("standings")
+    assert not cachedResponse.alreadyProcessedBy("promotions")
+    #* BUT a changed body is not
+    cachedResponse = cache.store(URL, b'{"records":[{}]}', {})
+    assert not cachedResponse.alreadyProcessedBy("standings")
+
+
+def test_ResponseCachePrune(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    oldTime = time.time() - PRUNE_AFTER_SECONDS - 60
+    #* WHEN an entry's body is old BUT a 304 just revalidated it
+    entry = cache.store(URL, b"{}", {})
+    entry.fetchedAt = oldTime
+    cache.revalidate(entry)
+    [os.utime(path, (oldTime, oldTime)) for path in cache.entryPaths(URL)]
+    cache.store("https://statsapi.mlb.com/api/v1/teams", b"{}", {})
+    #* THEN it's kept, body included
+    assert cache.lookup(URL).body() == b"{}"
+
+    #* WHEN an entry hasn't been fetched OR revalidated in a while
+    entry.fetchedAt = oldTime
+    cache.saveMetadata(entry)
+    cache.store("https://statsapi.mlb.com/api/v1/teams", b"{}", {})
+    #* THEN it's pruned once another response is stored, along with its body
+    assertIsNone(cache.lookup(URL))
+    assert not any(os.path.exists(path) for path in cache.entryPaths(URL))
+
+
+def test_processesResponses(app):
+    @processesResponses
+    def command(shouldFail):
+        cachedResponse = responseCache().lookup(URL)
+        markPendingProcessed(cachedResponse, "standings")
+        if shouldFail:
+            raise ValueError("Failed to process")
+
+    with app.app_context():
+        responseCache().store(URL, b"{}", {})
+        #* WHEN the command fails THEN its response isn't marked as processed
+        with pytest.raises(ValueError):
+            command(True)
+        assert not responseCache().lookup(URL).alreadyProcessedBy("standings")
+        #* WHEN the command succeeds THEN its response is marked as processed
+        command(False)
+        assert responseCache().lookup(URL).alreadyProcessedBy("standings")
@@ -0,0 +1,158 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.models import BaseballGame, BaseballTeam, Promo
+from mlb_team_schedule.utility.database_queries import queryScheduledGames
+from mlb_team_schedule.utility.schedule_serializer import (
+    formatReadableDates, normalizeGames, serializeGamesPage, serializeGamesWithDates,
+    serializeScheduledGames,
+)
+from mlb_team_schedule.utility.team_map import TEAM_TO_ID_MAP
+
+import pytest
+from sqlalchemy import event, insert
+from datetime import datetime, timedelta
+from os import environ
+from time import perf_counter
+
+
+#! Helpers
+def addTeams(numOfTeams):
+    teams = [BaseballTeam(team_name=f"Team {teamId}", city_name="City",
+                          team_logo=f"https://www.mlbstatic.com/team-logos/{teamId}.svg",
+                          abbreviation=f"T{index}", wins=1, losses=1)
+             for index, teamId in enumerate(list(TEAM_TO_ID_MAP.values())[:numOfTeams])]
+    db.session.add_all(teams)
+    db.session.commit()
+    return [team.id for team in teams]
+
+def addGames(numOfGames, teamIds, promosPerGame = 2):
+    """Bulk inserts games spread across every team, each with a few promos"""
+    firstDate = datetime(2021, 4, 1, 2, 10)
+    gameRows = []
+    for gameKey in range(1, numOfGames + 1):
+        date = firstDate + timedelta(hours=gameKey * 2)
+        gameRows.append({
+            "gameKey": gameKey, "date": date, "local_datetime": date - timedelta(hours=7),
+            "local_date": (date - timedelta(hours=7)).date(), "seriesGameNumber": 1,
+            "seriesGameCount": 3, "home_team_id": teamIds[gameKey % len(teamIds)],
+            "away_team_id": teamIds[(gameKey + 1) % len(teamIds)]
+        })
+    gameIds = db.session.scalars(insert(BaseballGame).returning(BaseballGame.id),
+                                 gameRows).all()
+    db.session.execute(insert(Promo), [
+        { "name": f"Promo {promoNum}", "thumbnail_url": "C", "offer_type": "",
+          "baseball_game_id": gameId }
+        for gameId in gameIds for promoNum in range(promosPerGame)
+    ])
+    db.session.commit()
+
+def ormSerialize():
+    db.session.expunge_all() #? Empty the identity map so nothing is already loaded
+    return [game.asDict for game in queryScheduledGames()]
+
+def timeIt(serialize, runs = 5):
+    bestTime = None
+    for _ in range(runs):
+        startTime = perf_counter()
+        serialize()
+        elapsed = perf_counter() - startTime
+        bestTime = elapsed if bestTime is None else min(bestTime, elapsed)
+    return bestTime
+
+
+#! Tests
+def test_serializeScheduledGames(app):
+    with app.app_context():
+        addGames(30, addTeams(4))
+        db.session.expunge_all()
+        statements = []
+        def countStatement(*args, **kwargs):
+            statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", countStatement)
+        try:
+            games = serializeScheduledGames()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", countStatement)
+        #* WHEN the schedule is serialized from columns THEN it matches `asDict` exactly
+        assert games == ormSerialize()
+        #* AND it always takes 2 statements, 1 for the games + teams, 1 for the promos
+        assert len(statements) == 2
+
+        #* WHEN a date range is used THEN only games in that range are serialized
+        datedGames = serializeGamesWithDates(datetime(2021, 4, 2), datetime(2021, 4, 3))
+        assert [localDate.day for localDate, _ in datedGames] == [2] * len(datedGames)
+        assert [game for _, game in datedGames] == [
+            game.asDict for game in queryScheduledGames(datetime(2021, 4, 2),
+                                                        datetime(2021, 4, 3))
+        ]
+
+
+def test_serializeGamesPage(app):
+    with app.app_context():
+        addGames(30, addTeams(4))
+        pages, after = [], None
+        while True: #? Follow each page's keyset like a client following cursors
+            games, after = serializeGamesPage(after=after, limit=7)
+            pages.append(games)
+            if after is None:
+                break
+        #* WHEN paging through every game THEN each page holds up to `limit` games
+        assert [len(games) for games in pages] == [7, 7, 7, 7, 2]
+        #* AND together, the pages match the full schedule in order, promos included
+        assert [game for games in pages for game in games] == serializeScheduledGames()
+
+        #* WHEN the games fill exactly 1 page THEN no next page is offered
+        assert serializeGamesPage(limit=30)[1] is None
+        #* WHEN a date range is paged THEN ONLY its games are included
+        start, end = datetime(2021, 4, 2), datetime(2021, 4, 3)
+        games, after = serializeGamesPage(start, end)
+        assert games == serializeScheduledGames(start, end)
+
+
+def test_formatReadableDates(app):
+    dates = [datetime(2021, 5, 10, 2, 10), datetime(2021, 5, 10, 2, 10),
+             datetime(2021, 5, 10, 20, 5)]
+    #* WHEN UTC dates are formatted in bulk THEN each matches the `readableDate` format
+    #* AND is shown in Pacific Time by default, whichever ballpark the game is at
+    assert formatReadableDates(dates) == ["Sun May 09 2021 at 07:10 PM"] * 2 \
+        + ["Mon May 10 2021 at 01:05 PM"]
+
+    #* WHEN another display timezone is configured THEN it's used instead
+    app.config.update({ "DISPLAY_TIMEZONE": "America/New_York" })
+    with app.app_context():
+        assert formatReadableDates(dates[:1]) == ["Sun May 09 2021 at 10:10 PM"]
+
+
+def test_normalizeGames():
+    dodgers = { "id": 1, "abbreviation": "LAD" }
+    yankees = { "id": 2, "abbreviation": "NYY" }
+    games = [
+        { "id": gameId, "date": "Sun May 09 2021 at 07:10 PM", "promos": [],
+          "seriesGameNumber": 1, "seriesGameCount": 3,
+          "homeTeam": homeTeam, "awayTeam": awayTeam }
+        for gameId, homeTeam, awayTeam in ((1, dodgers, yankees), (2, yankees, dodgers))
+    ]
+    normalized = normalizeGames(games)
+    #* WHEN games are normalized THEN each team is listed ONCE by its id
+    assert normalized["teams"] == { "1": dodgers, "2": yankees }
+    #* AND each game only references its teams' ids, keeping every other field
+    assert normalized["games"][1] == {
+        "id": 2, "date": "Sun May 09 2021 at 07:10 PM", "promos": [],
+        "seriesGameNumber": 1, "seriesGameCount": 3, "homeTeamId": 2, "awayTeamId": 1
+    }
+    #* WHEN there aren't any games THEN both are empty
+    assert normalizeGames([]) == { "teams": {}, "games": [] }
+
+
+#? Opt-in since it's slow: `RUN_BENCHMARKS=1 pytest -s -k benchmark`
+@pytest.mark.skipif(not environ.get("RUN_BENCHMARKS"), reason="Set RUN_BENCHMARKS=1")
+@pytest.mark.parametrize("numOfGames", [162, 2430]) #? 1 team's season vs the league's
+def test_serializationBenchmark(app, numOfGames):
+    with app.app_context():
+        addGames(numOfGames, addTeams(30))
+        ormTime = timeIt(ormSerialize)
+        columnTime = timeIt(lambda: serializeScheduledGames())
+        print(f"\n{numOfGames} games: ORM asDict = {ormTime * 1000:.1f}ms, "
+              f"column-projected = {columnTime * 1000:.1f}ms "
+              f"({ormTime / columnTime:.1f}x faster)")
+        #* WHEN the same schedule is serialized both ways THEN the output is the same
+        assert serializeScheduledGames() == ormSerialize()
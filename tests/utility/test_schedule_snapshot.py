@@ -0,0 +1,204 @@
+from mlb_team_schedule import db
+from mlb_team_schedule.models import BaseballGame, BaseballTeam, Promo
+from mlb_team_schedule.utility.database_helpers import finalizeDbUpdate, saveToDb
+from mlb_team_schedule.utility.schedule_snapshot import (
+    FULL_SCHEDULE_KEY, buildScheduleSnapshot, currentScheduleSnapshot, dayPayloadKey,
+    monthPayloadKey, readSnapshotVersion, refreshesScheduleSnapshot,
+)
+
+import pytest
+import gzip
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+#! Fixtures
+@pytest.fixture(autouse=True)
+def gameDbSetup(app):
+    dodgers = BaseballTeam(team_name="Dodgers", city_name="Los Angeles", team_logo="A",
+                           abbreviation="LAD", wins=2, losses=1)
+    yankees = BaseballTeam(team_name="Yankees", city_name="New York", team_logo="B",
+                           abbreviation="NYY", wins=1, losses=2)
+    with app.app_context():
+        saveToDb(dodgers)
+        saveToDb(yankees)
+        #* Game 1 = May 09 2021 7:10PM PDT, Game 2 = Aug 02 2021 4:15PM PDT
+        game1 = BaseballGame(gameKey=1, date=datetime(2021, 5, 10, 2, 10),
+                             seriesGameNumber=1, seriesGameCount=3,
+                             home_team_id=dodgers.id, away_team_id=yankees.id)
+        game1.promos = [Promo(name="Hat", thumbnail_url="C", offer_type="")]
+        game2 = BaseballGame(gameKey=2, date=datetime(2021, 8, 2, 23, 15),
+                             seriesGameNumber=1, seriesGameCount=3,
+                             home_team_id=yankees.id, away_team_id=dodgers.id)
+        saveToDb(game1)
+        saveToDb(game2)
+
+
+#! Tests
+def test_buildScheduleSnapshot(app):
+    with app.app_context():
+        #* WHEN the first snapshot is built
+        firstVersion = buildScheduleSnapshot()
+        snapshot = currentScheduleSnapshot()
+        #* THEN it's published as the current version
+        assert snapshot.version == firstVersion
+        #* AND the full schedule, each month, and each day get their own payload
+        fullSchedule = json.loads(snapshot.payload(FULL_SCHEDULE_KEY))
+        assert [game["id"] for game in fullSchedule] == [1, 2]
+        assert fullSchedule[0]["promos"][0]["name"] == "Hat"
+        mayGames = json.loads(snapshot.payload(monthPayloadKey(2021, 5)))
+        assert [game["id"] for game in mayGames] == [1]
+        #* Bucketed by the PDT date, so game 1 is on the 9th, NOT the UTC 10th
+        assert json.loads(snapshot.payload(dayPayloadKey(2021, 5, 9)))[0]["id"] == 1
+        #* WHEN a month or day without any games is requested THEN an empty list is sent
+        assert json.loads(snapshot.payload(dayPayloadKey(2021, 5, 10))) == []
+        assert json.loads(snapshot.payload(monthPayloadKey(2021, 6))) == []
+
+        #* WHEN the snapshot is rebuilt THEN its version is bumped
+        assert buildScheduleSnapshot() == firstVersion + 1
+        assert currentScheduleSnapshot().version == firstVersion + 1
+
+
+def test_buildScheduleSnapshotLocalDates(app):
+    with app.app_context():
+        #* WHEN a game is played during standard time, i.e. before daylight savings
+        yankees = db.session.scalars(
+            db.select(BaseballTeam).filter_by(abbreviation="NYY")
+        ).one()
+        yankees.team_logo = "https://www.mlbstatic.com/team-logos/147.svg"
+        yankeesId = yankees.id #? Read now since every commit expires it
+        game = BaseballGame(gameKey=3, date=datetime(2021, 3, 10, 7, 30),
+                            seriesGameNumber=1, seriesGameCount=3,
+                            home_team_id=1, away_team_id=yankeesId)
+        saveToDb(game)
+        #* THEN its local date + time are saved in its home team's timezone, i.e. PST
+        assert game.local_datetime == datetime(2021, 3, 9, 23, 30)
+        assert game.readableDate == "Tue March 09 2021 at 11:30 PM"
+        snapshot = currentScheduleSnapshot()
+        assert json.loads(snapshot.payload(dayPayloadKey(2021, 3, 9)))[0]["id"] == 3
+
+        #* WHEN a game's date changes for an Eastern Time home team
+        game.date = datetime(2021, 3, 12, 0, 5)
+        game.home_team_id = yankeesId
+        saveToDb(game)
+        #* THEN it's localized again using that team's timezone
+        assert game.local_datetime == datetime(2021, 3, 11, 19, 5)
+        assert str(game.local_date) == "2021-03-11"
+        #* BUT its readable time is still displayed in Pacific Time, i.e. 7:05 PM EST
+        assert game.readableDate == "Thu March 11 2021 at 04:05 PM"
+
+        #* WHEN ONLY its home team changes, even after its date change was flushed
+        game.date = datetime(2021, 3, 13, 0, 5)
+        db.session.flush()
+        game.home_team_id = 1
+        saveToDb(game)
+        #* THEN it's localized again in the new home team's timezone, i.e. PST
+        assert game.local_datetime == datetime(2021, 3, 12, 16, 5)
+
+
+def test_buildScheduleSnapshotCompressed(app, monkeypatch):
+    monkeypatch.setattr("mlb_team_schedule.utility.compression.MIN_COMPRESS_SIZE", 100)
+    with app.app_context():
+        buildScheduleSnapshot()
+        snapshot = currentScheduleSnapshot()
+        #* WHEN a payload is big enough THEN a gzipped copy of its bytes is written too
+        assert "gzip" in snapshot.encodings(FULL_SCHEDULE_KEY)
+        assert gzip.decompress(snapshot.payload(FULL_SCHEDULE_KEY, "gzip")) \
+            == snapshot.payload(FULL_SCHEDULE_KEY)
+        #* WHEN a payload is too small, like an empty day, THEN ONLY its JSON is sent
+        assert snapshot.encodings(dayPayloadKey(2021, 5, 10)) == []
+        assert snapshot.payload(dayPayloadKey(2021, 5, 10), "gzip") is None
+
+
+def test_currentScheduleSnapshot(app):
+    with app.app_context():
+        #* WHEN no snapshot has been built yet THEN one is built on demand
+        snapshot = currentScheduleSnapshot()
+        assert snapshot.version == 1
+        #* WHEN the version hasn't changed THEN the same in-memory snapshot is reused
+        assert currentScheduleSnapshot() is snapshot
+
+
+def test_currentScheduleSnapshotColdBuild(app, monkeypatch):
+    from mlb_team_schedule.utility import schedule_snapshot
+    builds = []
+    writeScheduleSnapshot = schedule_snapshot.writeScheduleSnapshot
+    def countBuild(snapshotDir, publishedVersion):
+        builds.append(snapshotDir)
+        return writeScheduleSnapshot(snapshotDir, publishedVersion)
+    monkeypatch.setattr(schedule_snapshot, "writeScheduleSnapshot", countBuild)
+
+    def firstRequest():
+        with app.app_context():
+            return currentScheduleSnapshot().version
+    #* WHEN a burst of 1st requests arrives before any snapshot exists
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        versions = list(executor.map(lambda _: firstRequest(), range(8)))
+    #* THEN only 1 snapshot is built AND every request serves it
+    assert len(builds) == 1
+    assert versions == [1] * 8
+
+
+def test_currentScheduleSnapshotAcrossContainers(app, tmp_path):
+    @refreshesScheduleSnapshot
+    def writeCommand():
+        team = db.session.scalars(db.select(BaseballTeam)).first()
+        team.wins += 1
+        finalizeDbUpdate()
+
+    with app.app_context():
+        webSnapshot = currentScheduleSnapshot()
+        webDir = app.config["SCHEDULE_SNAPSHOT_DIR"]
+        #* WHEN a command in another container with its own disk, i.e. the scheduler
+        #* service, commits a change
+        schedulerDir = str(tmp_path / "scheduler_snapshot")
+        app.config["SCHEDULE_SNAPSHOT_DIR"] = schedulerDir
+        writeCommand()
+        app.config["SCHEDULE_SNAPSHOT_DIR"] = webDir
+        #* THEN the web container's next request rebuilds its own copy of the new version
+        snapshot = currentScheduleSnapshot()
+        assert snapshot.directory == webDir
+        assert snapshot.version == webSnapshot.version + 1
+        fullSchedule = json.loads(snapshot.payload(FULL_SCHEDULE_KEY))
+        assert fullSchedule[0]["homeTeam"]["wins"] == 3
+        #* AND it's built at the same published time, so both send the same ETags
+        assert (snapshot.version, snapshot.builtAt) == readSnapshotVersion(schedulerDir)
+
+
+def test_refreshesScheduleSnapshot(app):
+    @refreshesScheduleSnapshot
+    def readOnlyCommand():
+        db.session.scalars(db.select(BaseballTeam)).all()
+        finalizeDbUpdate()
+
+    @refreshesScheduleSnapshot
+    def writeCommand():
+        team = db.session.scalars(db.select(BaseballTeam)).first()
+        team.wins += 1
+        finalizeDbUpdate()
+
+    with app.app_context():
+        version = buildScheduleSnapshot()
+        #* WHEN a command commits without changing any rows THEN no rebuild happens
+        readOnlyCommand()
+        assert currentScheduleSnapshot().version == version
+
+        #* WHEN a command commits a change THEN a new snapshot version is published
+        writeCommand()
+        snapshot = currentScheduleSnapshot()
+        assert snapshot.version == version + 1
+        fullSchedule = json.loads(snapshot.payload(FULL_SCHEDULE_KEY))
+        assert fullSchedule[0]["homeTeam"]["wins"] == 3
+
+
+def test_snapshotRoutes(app, client):
+    headers = { "Accept": "application/json" }
+    with app.app_context():
+        buildScheduleSnapshot()
+
+    #* WHEN the full schedule is requested THEN the snapshot's bytes are sent as is
+    response = client.get("/api/fullSchedule", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/json"
+    assert [game["id"] for game in response.get_json()] == [1, 2]
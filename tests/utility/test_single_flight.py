@@ -0,0 +1,74 @@
+from mlb_team_schedule.utility.single_flight import SingleFlight, fileLock
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+
+
+#! Tests
+def test_SingleFlight():
+    singleFlight = SingleFlight()
+    calls = []
+    started, release = Event(), Event()
+    def slowBuild():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "payload"
+
+    #* WHEN many identical calls arrive while the 1st is still running
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(singleFlight.do, "fullSchedule", slowBuild)
+        started.wait(5)
+        waiters = [executor.submit(singleFlight.do, "fullSchedule", slowBuild)
+                   for _ in range(3)]
+        release.set()
+        #* THEN they all get the same result from a single call
+        assert leader.result() == "payload"
+        assert [waiter.result() for waiter in waiters] == ["payload"] * 3
+    assert len(calls) <= 2 #? A waiter arriving after the leader finishes runs again
+
+    #* WHEN the call has finished THEN the next call runs it again
+    assert singleFlight.do("fullSchedule", lambda: "rebuilt") == "rebuilt"
+
+
+def test_SingleFlightErrors():
+    singleFlight = SingleFlight()
+    started, release = Event(), Event()
+    def failingBuild():
+        started.set()
+        release.wait(5)
+        raise ValueError("Failed to build")
+
+    #* WHEN the call fails while another caller is waiting on it
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(singleFlight.do, "fullSchedule", failingBuild)
+        started.wait(5)
+        waiter = executor.submit(singleFlight.do, "fullSchedule", failingBuild)
+        release.set()
+        #* THEN the error is raised for every caller
+        with pytest.raises(ValueError):
+            leader.result()
+        with pytest.raises(ValueError):
+            waiter.result()
+    #* AND the key is cleared so the next call isn't stuck
+    assert singleFlight.do("fullSchedule", lambda: 1) == 1
+
+
+def test_fileLock(tmp_path):
+    lockPath = str(tmp_path / "BUILD.lock")
+    order = []
+    holding = Event()
+    def holdLock():
+        with fileLock(lockPath):
+            holding.set()
+            order.append("first")
+    #* WHEN another holder already has the lock
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        with fileLock(lockPath):
+            future = executor.submit(holdLock)
+            #* THEN it waits until the lock is released
+            assert not holding.wait(0.2)
+            order.append("holder")
+        future.result()
+    assert order == ["holder", "first"]
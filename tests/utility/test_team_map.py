@@ -1,7 +1,9 @@
 from ..common_assertions import assertHasLengthOf, assertIsNone, assertIsNotNone
 from mlb_team_schedule.utility.team_map import (
-    TEAM_TO_ID_MAP, getTeamID, getTeamIdFromName
+    TEAM_TIMEZONE_MAP, TEAM_TO_ID_MAP, getTeamID, getTeamIdFromName, getTeamTimezone,
+    getTrackedTeamIDs,
 )
+from zoneinfo import ZoneInfo
 
 
 def test_team_to_id_map():
@@ -51,6 +53,16 @@ def test_team_to_id_map():
     assertIsNotNone(TEAM_TO_ID_MAP.get("miami marlins"))
 
 
+def test_getTeamTimezone():
+    #* WHEN every team is looked up THEN each has a timezone
+    assert set(TEAM_TIMEZONE_MAP.keys()) == set(TEAM_TO_ID_MAP.values())
+    #* WHEN a known team is looked up THEN its home ballpark's timezone is returned
+    assert getTeamTimezone(147) == ZoneInfo("America/New_York")
+    assert getTeamTimezone(109) == ZoneInfo("America/Phoenix") #? No daylight savings
+    #* WHEN an unknown team is looked up THEN Pacific Time is the default
+    assert getTeamTimezone(None) == ZoneInfo("America/Los_Angeles")
+
+
 def test_getTeamIdFromName():
     #* WHEN an unrecognized team is input THEN None is returned
     assertIsNone(getTeamIdFromName("foobar"))
@@ -108,3 +120,23 @@ def test_getTeamID(app):
         app.config["TEAM_FULL_NAME"] = "New York Mets"
         metsTeamID = getTeamID()
         assert metsTeamID == 121
+
+
+def test_getTrackedTeamIDs(app):
+    with app.app_context():
+        app.config["TEAM_FULL_NAME"] = "Los Angeles Dodgers"
+        #* WHEN no tracked teams are set THEN only the `TEAM_FULL_NAME` team is tracked
+        app.config["TRACKED_TEAMS"] = ""
+        assert getTrackedTeamIDs() == { 119 }
+
+        #* WHEN a list of teams is set THEN each recognized team is tracked
+        app.config["TRACKED_TEAMS"] = "New York Mets, new york yankees,Foobar Fizzes"
+        assert getTrackedTeamIDs() == { 121, 147 }
+
+        #* WHEN "all" is set THEN every team is tracked
+        app.config["TRACKED_TEAMS"] = "ALL"
+        assert getTrackedTeamIDs() == set(TEAM_TO_ID_MAP.values())
+
+        #* WHEN no team is recognized THEN it falls back to the `TEAM_FULL_NAME` team
+        app.config["TRACKED_TEAMS"] = "Foobar Fizzes"
+        assert getTrackedTeamIDs() == { 119 }
@@ -0,0 +1,66 @@
+from ..common_assertions import assertIsNone
+from mlb_team_schedule import db
+from mlb_team_schedule.models import BaseballTeam
+from mlb_team_schedule.utility.database_helpers import saveToDb
+from mlb_team_schedule.utility.team_registry import TeamRegistry, mlbTeamId
+
+import pytest
+from sqlalchemy import event
+
+
+#! Fixtures
+@pytest.fixture(autouse=True)
+def teamDbSetup(app):
+    dodgers = BaseballTeam(team_name="Dodgers", city_name="Los Angeles",
+                           team_logo="https://www.mlbstatic.com/team-logos/119.svg",
+                           abbreviation="LAD", wins=2, losses=1)
+    yankees = BaseballTeam(team_name="Yankees", city_name="New York", team_logo="Bar",
+                           abbreviation="NYY", wins=1, losses=2)
+    with app.app_context():
+        saveToDb(dodgers)
+        saveToDb(yankees)
+
+
+#! Tests
+def test_find(app):
+    with app.app_context():
+        statements = []
+        def countStatement(*args, **kwargs):
+            statements.append(args[2])
+        event.listen(db.engine, "before_cursor_execute", countStatement)
+
+        teamRegistry = TeamRegistry()
+        #* WHEN a team is found by its MLB team ID, club name or full name
+        assert teamRegistry.find(119).abbreviation == "LAD"
+        assert teamRegistry.find(clubName="yankees").abbreviation == "NYY"
+        assert teamRegistry.find(fullName="New York Yankees").abbreviation == "NYY"
+        #* WHEN the MLB team ID is unknown THEN the names are used as a fallback
+        assert teamRegistry.find(147, "Yankees").abbreviation == "NYY"
+        #* WHEN no team matches THEN None is returned
+        assertIsNone(teamRegistry.find(123, "Foo", "Bar Foo"))
+
+        event.remove(db.engine, "before_cursor_execute", countStatement)
+        #* THEN only 1 query loaded all of the teams
+        assert len(statements) == 1
+
+
+def test_add(app):
+    with app.app_context():
+        teamRegistry = TeamRegistry()
+        assertIsNone(teamRegistry.find(147))
+        #* WHEN a new team is added
+        yankees = BaseballTeam(team_name="Yankees", city_name="New York",
+                               team_logo="https://www.mlbstatic.com/team-logos/147.svg",
+                               abbreviation="NYY", wins=1, losses=2)
+        teamRegistry.add(yankees)
+        #* THEN it can be found by any of its keys
+        assert teamRegistry.find(147) is yankees
+
+
+def test_mlbTeamId():
+    #* WHEN the team logo is a proper MLB logo URL THEN the team's ID is parsed from it
+    team = BaseballTeam(team_logo="https://www.mlbstatic.com/team-logos/119.svg")
+    assert mlbTeamId(team) == 119
+    #* WHEN the team logo is in an unexpected format THEN None is returned
+    assertIsNone(mlbTeamId(BaseballTeam(team_logo="Foo")))
+    assertIsNone(mlbTeamId(BaseballTeam(team_logo="https://a.com/b/c/logo.svg")))
@@ -1,10 +1,13 @@
-import { defineConfig } from "vite";
+import { defineConfig, type Plugin } from "vite";
 import { svelte, vitePreprocess } from "@sveltejs/vite-plugin-svelte";
+import { readdirSync, readFileSync, rmSync, writeFileSync } from "node:fs";
+import { extname, join } from "node:path";
+import { brotliCompressSync, constants, gzipSync } from "node:zlib";
 
 export default defineConfig({
   plugins: [svelte({
     preprocess: vitePreprocess()
-  })],
+  }), precompressAssets()],
   server: {
     proxy: {
       "/api": {
@@ -23,3 +26,48 @@ export default defineConfig({
     }
   }
 });
+
+// Text files worth compressing. Images + fonts are already compressed
+const COMPRESSIBLE_EXTENSIONS = new Set([".js", ".css", ".html", ".svg", ".json", ".webmanifest", ".map"]);
+const MIN_COMPRESS_SIZE = 1024; // Matches `MIN_COMPRESS_SIZE` in Flask's `compression.py`
+
+// Writes a `.br` + `.gz` copy of each built text file ONCE, so Flask can serve them
+// as is rather than compressing every request. Any copy that doesn't shrink the file
+// is removed, so a `dev-build` rebuild never leaves a stale one behind
+function precompressAssets(): Plugin {
+  let outDir = "dist";
+  return {
+    name: "precompress-assets",
+    apply: "build",
+    configResolved(config) {
+      outDir = config.build.outDir;
+    },
+    closeBundle() {
+      for (const filePath of listFiles(outDir)) {
+        if (!COMPRESSIBLE_EXTENSIONS.has(extname(filePath))) { continue; }
+        const file = readFileSync(filePath);
+        const isLargeEnough = file.length >= MIN_COMPRESS_SIZE;
+        const gzipped = isLargeEnough ? gzipSync(file, { level: 9 }) : file;
+        const brotlied = isLargeEnough ? brotliCompressSync(file, { params: {
+          [constants.BROTLI_PARAM_MODE]: constants.BROTLI_MODE_TEXT,
+          [constants.BROTLI_PARAM_QUALITY]: constants.BROTLI_MAX_QUALITY,
+          [constants.BROTLI_PARAM_SIZE_HINT]: file.length
+        }}) : file;
+        writeSmallerCopy(`${filePath}.gz`, gzipped, file.length);
+        writeSmallerCopy(`${filePath}.br`, brotlied, file.length);
+      }
+    }
+  };
+}
+
+function listFiles(dir: string): string[] {
+  return readdirSync(dir, { withFileTypes: true }).flatMap(entry => {
+    const path = join(dir, entry.name);
+    return entry.isDirectory() ? listFiles(path) : [path];
+  });
+}
+
+function writeSmallerCopy(path: string, compressed: Buffer, originalSize: number) {
+  if (compressed.length < originalSize) { writeFileSync(path, compressed); }
+  else { rmSync(path, { force: true }); }
+}